@@ -18,20 +18,37 @@ async def get_auto_update_status():
         logger.error(f"자동 업데이트 상태 조회 실패: {e}")
         raise HTTPException(status_code=500, detail="상태 조회 중 오류가 발생했습니다.")
 
-@router.post("/force-update")
+@router.post("/force-update", status_code=202)
 async def force_update():
-    """강제로 업데이트를 실행합니다."""
+    """강제 업데이트 작업을 등록하고 작업 id를 바로 반환합니다. (진행 상황은 /jobs/{job_id}로 조회)"""
     try:
         service = get_auto_update_service()
-        service.force_update()
+        job = service.force_update()
         return {
-            "message": "강제 업데이트가 시작되었습니다.",
-            "status": "running"
+            "message": "강제 업데이트가 등록되었습니다.",
+            "status": job.status,
+            "job_id": job.id,
+            "job": job.to_dict()
         }
     except Exception as e:
         logger.error(f"강제 업데이트 실패: {e}")
         raise HTTPException(status_code=500, detail="강제 업데이트 중 오류가 발생했습니다.")
 
+@router.get("/jobs")
+async def list_jobs():
+    """최근 업데이트 작업 목록을 조회합니다. (최신순)"""
+    service = get_auto_update_service()
+    return {"jobs": [job.to_dict() for job in service.list_jobs()]}
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """업데이트 작업의 상태와 단계별 진행 상황/처리 시간을 조회합니다."""
+    service = get_auto_update_service()
+    job = service.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return {"job": job.to_dict()}
+
 @router.post("/start")
 async def start_auto_update():
     """자동 업데이트 서비스를 시작합니다."""
@@ -51,7 +68,8 @@ async def stop_auto_update():
     """자동 업데이트 서비스를 중지합니다."""
     try:
         service = get_auto_update_service()
-        service.stop()
+        # API 요청은 실행 중인 작업을 오래 기다리지 않음 (작업은 끝까지 실행되고 풀은 닫지 않음)
+        service.stop(timeout=5)
         return {
             "message": "자동 업데이트 서비스가 중지되었습니다.",
             "status": "stopped"
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Request
+from starlette.concurrency import run_in_threadpool
 from service.chat_service import get_ai_response
 from core.logger import logger
+from core.tracing import start_span
 
 router = APIRouter()
 
@@ -15,8 +17,12 @@ async def chat_endpoint(request: Request):
         if not user_message:
             return {"error": "message 파라미터가 필요합니다."}
         
-        # AI 응답 생성
-        response_text = get_ai_response(user_message, session_id)
+        # AI 응답 생성 (요청 하나가 트레이스 하나)
+        with start_span('chat_endpoint', session_id=session_id, language=language,
+                        message_length=len(user_message)) as span:
+            # 응답 생성은 블로킹이라 스레드 풀에서 실행 (이벤트 루프를 막지 않고, 같은 질문끼리 합쳐질 수 있도록)
+            response_text = await run_in_threadpool(get_ai_response, user_message, session_id)
+            span.set_attribute('response_length', len(response_text or ''))
         
         # 빈 응답 체크 개선
         if not response_text or not response_text.strip():
@@ -0,0 +1,25 @@
+from typing import Optional
+from fastapi import APIRouter, Query
+from core.tracing import get_slow_trace_ms, get_tracer
+
+router = APIRouter()
+
+@router.get("/traces")
+async def get_slow_traces(limit: int = Query(20, ge=1, le=200), min_ms: Optional[float] = None):
+    """
+    최근 느린 요청의 트레이스를 최근 것부터 반환합니다.
+    min_ms를 지정하지 않으면 TRACE_SLOW_MS(기본 2000ms) 이상 걸린 요청만 반환합니다. (0이면 전체)
+    """
+    threshold = get_slow_trace_ms() if min_ms is None else min_ms
+    traces = get_tracer().recent_traces(limit=limit, min_duration_ms=threshold)
+    return {
+        "min_ms": threshold,
+        "count": len(traces),
+        "traces": [trace.to_dict() for trace in traces]
+    }
+
+@router.get("/routes")
+async def get_route_stats():
+    """사전 라우터의 경로별 처리 수와 LLM 호출을 건너뛴 수를 반환합니다."""
+    from service.pre_router import get_pre_router
+    return get_pre_router().stats()
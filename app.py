@@ -1,8 +1,12 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from api.chat_api import router as chat_router
 from api.auto_update_api import router as auto_update_router
+from api.metrics_api import router as metrics_router
+from api.debug_api import router as debug_router
 from service.auto_update_service import start_auto_update, stop_auto_update, get_auto_update_service
+from core.db import close_db_pool
 
 app = FastAPI(title="한성대학교 챗봇 API", version="1.0.0")
 
@@ -17,6 +21,8 @@ app.add_middleware(
 # 라우터 등록
 app.include_router(chat_router, prefix="/api/chat", tags=["chat"])
 app.include_router(auto_update_router, prefix="/api/auto-update", tags=["auto-update"])
+app.include_router(metrics_router, tags=["metrics"])
+app.include_router(debug_router, prefix="/api/debug", tags=["debug"])
 
 @app.on_event("startup")
 async def startup_event():
@@ -29,5 +35,10 @@ async def startup_event():
 async def shutdown_event():
     """서버 종료 시 실행되는 이벤트"""
     print("서버를 종료합니다...")
-    stop_auto_update()
-    print("자동 업데이트 서비스가 중지되었습니다.")
\ No newline at end of file
+    # 실행 중인 수집/업로드 작업이 끝날 때까지(최대 AUTO_UPDATE_STOP_TIMEOUT_SECONDS) 기다린 뒤 커넥션 풀을 닫음
+    if await run_in_threadpool(stop_auto_update):
+        print("자동 업데이트 서비스가 중지되었습니다.")
+        close_db_pool()
+    else:
+        # 작업이 아직 커넥션을 쓰고 있으므로 풀을 닫지 않음 (트랜잭션 도중에 끊지 않도록)
+        print("실행 중인 업데이트 작업이 끝나지 않아 DB 커넥션 풀을 닫지 않고 종료합니다.")
\ No newline at end of file
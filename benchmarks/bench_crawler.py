@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+크롤러 벤치마크
+로컬 픽스처 서버를 대상으로 기존 순차 크롤링과 동시 크롤러(core.crawler)를 비교하고,
+변경이 없는 재실행(조건부 요청 + 첫 페이지 변경 감지)의 비용을 측정
+
+실행: python -m benchmarks.bench_crawler --pages 19 --latency 0.05
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import requests
+
+from benchmarks.fixture_server import FixtureServer
+from core.crawler import NoticeCrawler, parse_detail, parse_rss
+from core.crawl_state import CrawlState
+
+
+def run_sequential(server):
+    """기존 crawl_incremental 방식: RSS 페이지와 상세 페이지를 하나씩 요청"""
+    details = 0
+    for page_number in range(1, server.pages + 1):
+        page = requests.get(server.rss_url.format(page_number), timeout=10)
+        for item in parse_rss(page.text, server.base_url):
+            detail = requests.get(item.link, timeout=10)
+            parse_detail(detail.text)
+            details += 1
+    return details
+
+
+def run_concurrent(server, max_workers, per_host_limit):
+    """동시 크롤러: RSS 미리 가져오기 + 상세 페이지 동시 요청"""
+    details = 0
+    with NoticeCrawler(max_workers=max_workers, per_host_limit=per_host_limit,
+                       rss_url=server.rss_url, base_domain=server.base_url) as crawler:
+        for page in crawler.iter_rss_pages(range(1, server.pages + 1)):
+            for _ in crawler.iter_details(page.items or []):
+                details += 1
+    return details
+
+
+def run_unchanged(server, max_workers, per_host_limit):
+    """
+    변경 없는 재실행: 상태 파일을 채운 뒤, 첫 페이지만 조건부로 요청하고
+    지난 실행과 같으면 바로 종료하는 crawl_incremental 흐름을 재현
+    """
+    state = CrawlState(os.path.join(tempfile.mkdtemp(), "crawl_state.json"))
+    with NoticeCrawler(max_workers=max_workers, per_host_limit=per_host_limit,
+                       rss_url=server.rss_url, base_domain=server.base_url, state=state) as crawler:
+        first_page = next(iter(crawler.iter_rss_pages([1])))
+        crawler.commit_state([first_page.url])
+        state.latest_first_page = first_page.items_hash
+        state.mark_pipeline_complete()
+
+        start_requests = server.request_count
+        start = time.perf_counter()
+        page = next(iter(crawler.iter_rss_pages([1], conditional=True)))
+        unchanged = state.is_first_page_processed(page.items_hash)
+        elapsed = time.perf_counter() - start
+    requests_made = server.request_count - start_requests
+    print(f"{'unchanged':<12} {elapsed:8.2f}s  요청 {requests_made:4d}개  304 응답: {page.not_modified}  건너뛰기: {unchanged}")
+
+
+def measure(name, func, server, *args):
+    start_requests = server.request_count
+    start = time.perf_counter()
+    details = func(server, *args)
+    elapsed = time.perf_counter() - start
+    requests_made = server.request_count - start_requests
+    print(f"{name:<12} {elapsed:8.2f}s  요청 {requests_made:4d}개  상세 {details:4d}개  {requests_made / elapsed:7.1f} req/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="크롤러 벤치마크 (로컬 픽스처 서버)")
+    parser.add_argument("--pages", type=int, default=19, help="RSS 페이지 수")
+    parser.add_argument("--latency", type=float, default=0.05, help="응답 지연 (초)")
+    parser.add_argument("--workers", type=int, default=8, help="동시 크롤러 작업자 수")
+    parser.add_argument("--per-host", type=int, default=4, help="호스트별 동시 요청 제한")
+    args = parser.parse_args()
+
+    with FixtureServer(pages=args.pages, latency=args.latency) as server:
+        print(f"픽스처 서버: {server.base_url} (페이지 {args.pages}개, 지연 {args.latency * 1000:.0f}ms)")
+        sequential = measure("sequential", run_sequential, server)
+        concurrent = measure("concurrent", run_concurrent, server, args.workers, args.per_host)
+        print(f"속도 향상: {sequential / concurrent:.1f}x")
+        run_unchanged(server, args.workers, args.per_host)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+OCR 백엔드 벤치마크
+benchmarks/fixtures/ocr/manifest.json 의 공지사항 이미지로 백엔드별 처리량과 정확도(문자 단위)를 측정
+
+실행: python -m benchmarks.bench_ocr [--backend auto|vision|tesseract|all] [--repeat 3] [--tiling]
+--tiling: 긴 이미지를 타일로 나눠 인식했을 때와 원본 그대로 인식했을 때의 추출 글자 수와 정확도를 비교
+픽스처 이미지 렌더링: python -m benchmarks.bench_ocr --generate --font /path/NanumGothic.ttf
+"""
+
+import argparse
+import json
+import os
+import time
+
+from core.ocr import BACKENDS, OcrUnavailableError, create_ocr_backend
+from core.ocr.tiling import recognize_tiled
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "ocr")
+MANIFEST_PATH = os.path.join(FIXTURE_DIR, "manifest.json")
+
+
+def load_manifest():
+    with open(MANIFEST_PATH, encoding="utf-8") as f:
+        return json.load(f)["items"]
+
+
+def normalize(text):
+    """공백 차이는 정확도에 반영하지 않음"""
+    return "".join(text.split())
+
+
+def edit_distance(a, b):
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def char_accuracy(expected, recognized):
+    """1 - 문자 오류율(CER), 0 미만은 0으로 처리"""
+    expected, recognized = normalize(expected), normalize(recognized)
+    if not expected:
+        return 1.0 if not recognized else 0.0
+    return max(0.0, 1 - edit_distance(expected, recognized) / len(expected))
+
+
+def generate_fixtures(items, font_path, width=900, font_size=32):
+    """정답 텍스트를 공지 포스터 형태의 이미지로 렌더링합니다. (한글 글꼴 필요)"""
+    from PIL import Image, ImageDraw, ImageFont
+    font = ImageFont.truetype(font_path, font_size)
+    for item in items:
+        lines = item["text"].split("\n")
+        # line_height를 지정한 항목은 줄 간격을 넓혀 세로로 긴 포스터로 렌더링
+        line_height = item.get("line_height", int(font_size * 1.8))
+        # 세로로 긴 포스터를 흉내 내기 위해 위아래 여백을 충분히 둠
+        height = line_height * len(lines) + 400
+        image = Image.new("RGB", (width, height), "white")
+        draw = ImageDraw.Draw(image)
+        for i, line in enumerate(lines):
+            draw.text((60, 200 + i * line_height), line, font=font, fill="black")
+        path = os.path.join(FIXTURE_DIR, item["image"])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        image.save(path)
+        print(f"생성: {path}")
+
+
+def run_backend(name, fixtures, repeat, tiling=False):
+    try:
+        backend = create_ocr_backend(name)
+    except OcrUnavailableError as e:
+        print(f"{name:<10} 사용 불가: {e}")
+        return None
+
+    accuracies = []
+    chars = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for item, data in fixtures:
+            # 타일링을 끄면(aspect=0) 원본 이미지를 그대로 인식
+            lines = recognize_tiled(backend, data, aspect=None if tiling else 0)
+            recognized = " ".join(line.text for line in lines)
+            chars += len(normalize(recognized))
+            accuracies.append(char_accuracy(item["text"], recognized))
+    elapsed = time.perf_counter() - start
+    images = len(fixtures) * repeat
+    result = {
+        "backend": backend.name,
+        "version": backend.version,
+        "tiling": tiling,
+        "images": images,
+        "chars_per_image": round(chars / images, 1),
+        "seconds": round(elapsed, 3),
+        "images_per_minute": round(images / elapsed * 60, 1),
+        "ms_per_image": round(elapsed / images * 1000, 1),
+        "char_accuracy": round(sum(accuracies) / len(accuracies), 4),
+    }
+    label = f"{backend.name}{'+tile' if tiling else ''}"
+    print(f"{label:<15} {result['ms_per_image']:8.1f}ms/장  {result['images_per_minute']:8.1f}장/분  "
+          f"{result['chars_per_image']:7.1f}자/장  정확도 {result['char_accuracy'] * 100:5.1f}%  ({backend.version})")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR 백엔드 벤치마크 (공지사항 이미지 픽스처)")
+    parser.add_argument("--backend", default="auto", help="auto, vision, tesseract 또는 all")
+    parser.add_argument("--repeat", type=int, default=3, help="이미지별 반복 횟수")
+    parser.add_argument("--generate", action="store_true", help="정답 텍스트로 픽스처 이미지 렌더링")
+    parser.add_argument("--font", help="픽스처 렌더링에 사용할 한글 글꼴 (.ttf/.otf)")
+    parser.add_argument("--tiling", action="store_true", help="타일링 없이/타일링으로 각각 측정해 비교")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    items = load_manifest()
+    if args.generate:
+        if not args.font:
+            parser.error("--generate 에는 --font 가 필요합니다.")
+        generate_fixtures(items, args.font)
+
+    fixtures = []
+    for item in items:
+        path = os.path.join(FIXTURE_DIR, item["image"])
+        if not os.path.exists(path):
+            print(f"픽스처 이미지 없음 (건너뜀): {path}")
+            continue
+        with open(path, "rb") as f:
+            fixtures.append((item, f.read()))
+    if not fixtures:
+        print("측정할 픽스처 이미지가 없습니다. --generate --font 로 렌더링하거나 실제 공지 이미지를 저장하세요.")
+        return
+
+    print(f"픽스처 {len(fixtures)}장, 반복 {args.repeat}회")
+    names = list(BACKENDS) if args.backend == "all" else [args.backend]
+    results = []
+    for name in names:
+        for tiling in ((False, True) if args.tiling else (True,)):
+            result = run_backend(name, fixtures, args.repeat, tiling)
+            if result:
+                results.append(result)
+        if args.tiling and len(results) >= 2 and results[-1]["backend"] == results[-2]["backend"]:
+            untiled, tiled = results[-2], results[-1]
+            print(f"{tiled['backend']:<15} 타일링 효과: 글자 수 {tiled['chars_per_image'] - untiled['chars_per_image']:+.1f}자/장, "
+                  f"정확도 {(tiled['char_accuracy'] - untiled['char_accuracy']) * 100:+.1f}%p")
+
+    if args.json and results:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+검색 벤치마크
+benchmarks/fixtures/retrieval 의 공지사항 코퍼스와 정답이 달린 학생 질문으로
+검색 품질(recall@k, MRR, nDCG@k)과 지연 시간(p50/p95/p99), 단계별 CPU 시간을 함께 측정
+네트워크 없이 임시 디렉터리의 로컬 벡터스토어와 해시 임베딩(EMBEDDING_BACKEND=hashing)을 사용
+
+실행: python -m benchmarks.bench_retrieval [--target retriever|hybrid|vector|all] [--repeat 3] [--k 5]
+      [--embedding hashing|huggingface] [--json 결과.json] [--compare 이전결과.json]
+- retriever: service.rag_service.get_retriever (하이브리드 + 쿼리 확장 + 재순위화)
+- hybrid: HybridSearchEngine.search
+- vector: 벡터 검색만
+단계별 시간은 트레이스 span(core.tracing)으로 집계하며, 첫 번째 반복 전에 한 번 실행해 캐시를 데운 상태로 측정
+"""
+
+import argparse
+import json
+import math
+import os
+import subprocess
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "retrieval")
+CORPUS_PATH = os.path.join(FIXTURE_DIR, "corpus.json")
+QUERIES_PATH = os.path.join(FIXTURE_DIR, "queries.json")
+TARGETS = ("retriever", "hybrid", "vector")
+
+
+def load_fixtures():
+    with open(CORPUS_PATH, encoding="utf-8") as f:
+        notices = json.load(f)["notices"]
+    with open(QUERIES_PATH, encoding="utf-8") as f:
+        queries = json.load(f)["queries"]
+    return notices, queries
+
+
+def configure_environment(store_path, embedding):
+    """core 모듈이 픽스처 코퍼스만 보도록 설정합니다. (벡터스토어/코퍼스 모두 로컬)"""
+    os.environ["VECTORSTORE_BACKEND"] = "local"
+    os.environ["CORPUS_SOURCE"] = "local"
+    os.environ["LOCAL_VECTORSTORE_PATH"] = store_path
+    os.environ["EMBEDDING_BACKEND"] = embedding
+    os.environ["TRACING_ENABLED"] = "true"
+    os.environ["TRACE_FILE"] = ""
+
+
+def build_store(notices, path):
+    """픽스처 공지사항을 업로드와 같은 문서 형식으로 로컬 벡터스토어에 저장합니다."""
+    from core.corpus_export import format_notice_content
+    from core.embedding import get_embedding
+    from core.local_vectorstore import LocalVectorStore
+
+    texts = [format_notice_content(n["title"], n["link"], n["content"]) for n in notices]
+    metadatas = [
+        {"title": n["title"], "link": n["link"],
+         "expiry_date": int(time.mktime(datetime.strptime(n["date"], "%Y-%m-%d").timetuple()))}
+        for n in notices
+    ]
+    start = time.perf_counter()
+    LocalVectorStore.from_texts(texts, get_embedding(), metadatas=metadatas,
+                                ids=[n["id"] for n in notices], path=path)
+    return time.perf_counter() - start
+
+
+def make_search(target, k):
+    """질문을 받아 검색 결과의 메타데이터 목록을 순위대로 돌려주는 함수를 만듭니다."""
+    if target == "retriever":
+        from service.rag_service import get_retriever
+        return lambda question: [doc.metadata for doc in get_retriever(question)][:k]
+    if target == "hybrid":
+        from core.hybrid_search import get_hybrid_search_engine
+        engine = get_hybrid_search_engine()
+        return lambda question: [result["metadata"] for result in engine.search(question, top_k=k)]
+    from core.vectorstore import search_documents
+    return lambda question: [doc.metadata for doc in search_documents(question, k)]
+
+
+# 품질 지표 (정답 공지가 여러 개일 수 있으며 관련도는 0/1)
+def recall_at(ranked, expected, k):
+    return len(set(ranked[:k]) & set(expected)) / len(expected)
+
+
+def reciprocal_rank(ranked, expected, k):
+    for rank, notice_id in enumerate(ranked[:k], 1):
+        if notice_id in expected:
+            return 1.0 / rank
+    return 0.0
+
+
+def ndcg_at(ranked, expected, k):
+    dcg = sum(1.0 / math.log2(rank + 1) for rank, notice_id in enumerate(ranked[:k], 1) if notice_id in expected)
+    ideal = sum(1.0 / math.log2(rank + 1) for rank in range(1, min(len(expected), k) + 1))
+    return dcg / ideal if ideal else 0.0
+
+
+def percentile(values, p):
+    """nearest-rank 백분위수"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+class TraceCollector:
+    """벤치마크 질문 하나(루트 span)마다 끝난 트레이스를 모읍니다."""
+
+    def __init__(self):
+        self.traces = []
+
+    def export(self, trace):
+        self.traces.append(trace)
+
+
+def run_target(target, queries, link_to_id, k, repeat):
+    from core.tracing import cpu_ms, duration_ms, get_tracer, start_span
+
+    search = make_search(target, k)
+    # 캐시 데우기 (엔진 생성, 토크나이저 초기화 포함) - 측정에서 제외
+    for query in queries:
+        search(query["question"])
+
+    collector = TraceCollector()
+    tracer = get_tracer()
+    tracer.sinks.append(collector)
+    per_query = []
+    try:
+        for iteration in range(repeat):
+            for query in queries:
+                with start_span("benchmark.query", target=target, query_id=query["id"]):
+                    metadatas = search(query["question"])
+                if iteration == 0:
+                    ranked = []
+                    for metadata in metadatas:
+                        notice_id = link_to_id.get(metadata.get("link"))
+                        if notice_id and notice_id not in ranked:
+                            ranked.append(notice_id)
+                    per_query.append((query, ranked))
+    finally:
+        tracer.sinks.remove(collector)
+
+    latencies = [trace.duration_ms for trace in collector.traces]
+    stages = defaultdict(lambda: {"calls": 0, "wall_ms": 0.0, "cpu_ms": 0.0})
+    for trace in collector.traces:
+        for span in trace.spans:
+            if span is trace.root:
+                continue
+            stage = stages[span.name]
+            stage["calls"] += 1
+            stage["wall_ms"] += duration_ms(span)
+            stage["cpu_ms"] += cpu_ms(span)
+
+    runs = len(collector.traces) or 1
+    quality = {
+        f"recall@{n}": round(sum(recall_at(r, q["expected"], n) for q, r in per_query) / len(per_query), 4)
+        for n in sorted({1, 3, k})
+    }
+    quality["mrr"] = round(sum(reciprocal_rank(r, q["expected"], k) for q, r in per_query) / len(per_query), 4)
+    quality[f"ndcg@{k}"] = round(sum(ndcg_at(r, q["expected"], k) for q, r in per_query) / len(per_query), 4)
+
+    return {
+        "target": target,
+        "queries": len(queries),
+        "repeat": repeat,
+        "quality": quality,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "mean": round(sum(latencies) / runs, 3),
+            "cpu_mean": round(sum(cpu_ms(trace.root) for trace in collector.traces) / runs, 3),
+        },
+        # 질문 하나당 평균 (호출 수, 경과 시간, CPU 시간)
+        "stages": {
+            name: {
+                "calls_per_query": round(stage["calls"] / runs, 2),
+                "wall_ms": round(stage["wall_ms"] / runs, 3),
+                "cpu_ms": round(stage["cpu_ms"] / runs, 3),
+            }
+            for name, stage in sorted(stages.items(), key=lambda item: -item[1]["wall_ms"])
+        },
+        "misses": [q["id"] for q, r in per_query if not set(r[:k]) & set(q["expected"])],
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_result(result, k):
+    quality, latency = result["quality"], result["latency_ms"]
+    print(f"{result['target']:<10} recall@1 {quality['recall@1']:.3f}  recall@{k} {quality[f'recall@{k}']:.3f}  "
+          f"MRR {quality['mrr']:.3f}  nDCG@{k} {quality[f'ndcg@{k}']:.3f}  "
+          f"p50 {latency['p50']:8.1f}ms  p95 {latency['p95']:8.1f}ms  CPU {latency['cpu_mean']:7.1f}ms")
+    for name, stage in result["stages"].items():
+        print(f"    {name:<36} {stage['calls_per_query']:5.1f}회  {stage['wall_ms']:8.2f}ms  CPU {stage['cpu_ms']:8.2f}ms")
+    if result["misses"]:
+        print(f"    상위 {k}개에 정답이 없는 질문: {', '.join(result['misses'])}")
+
+
+def print_comparison(previous, results):
+    """이전 실행 결과와 지표별 차이를 출력합니다. (품질은 높을수록, 지연 시간은 낮을수록 좋음)"""
+    before = {result["target"]: result for result in previous["results"]}
+    print(f"\n이전 결과와 비교 ({previous['run'].get('revision')} {previous['run'].get('started_at')})")
+    for result in results:
+        old = before.get(result["target"])
+        if old is None:
+            continue
+        changes = [f"{name} {result['quality'][name] - value:+.3f}"
+                   for name, value in old["quality"].items() if name in result["quality"]]
+        changes += [f"{name} {result['latency_ms'][name] - value:+.1f}ms"
+                    for name, value in old["latency_ms"].items() if name in ("p50", "p95")]
+        print(f"{result['target']:<10} " + "  ".join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="검색 품질/지연 시간 벤치마크 (공지사항 픽스처, 오프라인)")
+    parser.add_argument("--target", default="all", help="retriever, hybrid, vector 또는 all")
+    parser.add_argument("--repeat", type=int, default=3, help="질문별 반복 횟수 (품질은 첫 반복으로 계산)")
+    parser.add_argument("--k", type=int, default=5, help="recall/MRR/nDCG를 계산할 상위 결과 수")
+    parser.add_argument("--embedding", default="hashing", help="hashing(오프라인) 또는 huggingface")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON 파일 경로")
+    args = parser.parse_args()
+
+    notices, queries = load_fixtures()
+    link_to_id = {notice["link"]: notice["id"] for notice in notices}
+    targets = list(TARGETS) if args.target == "all" else [args.target]
+
+    with tempfile.TemporaryDirectory(prefix="bench_retrieval_") as store_path:
+        configure_environment(store_path, args.embedding)
+        build_seconds = build_store(notices, store_path)
+        print(f"코퍼스 {len(notices)}건 (색인 {build_seconds:.2f}초), 질문 {len(queries)}개, "
+              f"반복 {args.repeat}회, 임베딩 {args.embedding}")
+
+        results = []
+        for target in targets:
+            result = run_target(target, queries, link_to_id, args.k, args.repeat)
+            print_result(result, args.k)
+            results.append(result)
+
+    report = {
+        "run": {
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "embedding": args.embedding,
+            "k": args.k,
+            "corpus": len(notices),
+            "index_seconds": round(build_seconds, 3),
+        },
+        "results": results,
+    }
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print_comparison(json.load(f), results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
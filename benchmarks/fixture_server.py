@@ -0,0 +1,120 @@
+"""
+크롤러 벤치마크용 로컬 HTTP 서버
+benchmarks/fixtures/crawler 의 RSS/상세 페이지를 네트워크 지연을 흉내 내며 제공
+(ETag와 If-None-Match 조건부 요청 지원)
+"""
+
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "crawler")
+RSS_PATH = "/bbs/hansung/143/rssList.do"
+ITEMS_PER_PAGE = 10
+
+
+def _read_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+class FixtureServer:
+    """
+    RSS 목록과 공지사항 상세 페이지를 제공하는 로컬 서버
+    - pages: RSS 페이지 수 (이후 페이지는 빈 목록)
+    - latency: 응답마다 추가되는 지연 시간 (초)
+    """
+
+    def __init__(self, pages=19, latency=0.05):
+        self.pages = pages
+        self.latency = latency
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._rss_page = _read_fixture("rss_page.xml")
+        self._rss_item = _read_fixture("rss_item.xml")
+        self._detail = _read_fixture("notice_detail.html")
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address
+        return f"http://{host}:{port}"
+
+    @property
+    def rss_url(self):
+        return self.base_url + RSS_PATH + "?page={}&category=학사"
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def render_rss(self, page_number):
+        if page_number > self.pages:
+            return self._rss_page.format(items="")
+        now = datetime(2025, 9, 1, 9, 0, 0)
+        items = []
+        for i in range(ITEMS_PER_PAGE):
+            article_id = page_number * 1000 + i
+            pub_date = (now - timedelta(hours=page_number * ITEMS_PER_PAGE + i)).strftime("%Y-%m-%d %H:%M:%S.0")
+            items.append(self._rss_item.format(
+                title=f"[학사] 2025학년도 공지사항 {article_id}",
+                article_id=article_id,
+                pub_date=pub_date
+            ))
+        return self._rss_page.format(items="\n".join(items))
+
+    def render_detail(self, article_id):
+        return self._detail.format(title=f"[학사] 2025학년도 공지사항 {article_id}", article_id=article_id)
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with server._lock:
+                    server.request_count += 1
+                if server.latency:
+                    time.sleep(server.latency)
+
+                parsed = urlparse(self.path)
+                if parsed.path == RSS_PATH:
+                    page_number = int(parse_qs(parsed.query).get("page", ["1"])[0])
+                    self._send(server.render_rss(page_number), "application/xml")
+                elif parsed.path.endswith("/artclView.do"):
+                    article_id = parsed.path.split("/")[-2]
+                    self._send(server.render_detail(article_id), "text/html")
+                else:
+                    self.send_error(404)
+
+            def _send(self, body, content_type):
+                data = body.encode("utf-8")
+                etag = '"%s"' % hashlib.md5(data).hexdigest()
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
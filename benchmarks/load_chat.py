@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+채팅 API 부하 테스트
+시험/수강신청 기간처럼 동시 요청이 몰릴 때를 가정해 /api/chat/ 에 질문을 동시에 보내고
+처리량, 지연 시간 백분위수, 세션 저장소 메모리 증가량, 이벤트 루프 블로킹 시간을 측정
+
+기본은 서버 프로세스 안(ASGI)에서 실행하며 OpenAI/Pinecone을 호출하지 않음
+- LLM: core.fake_llm.FakeChatModel (LLM_BACKEND=fake, --llm-latency-ms, --tokens-per-second)
+- 벡터스토어: 검색 벤치마크 픽스처 코퍼스로 만든 임시 로컬 벡터스토어 + 해시 임베딩
+
+실행: python -m benchmarks.load_chat [--concurrency 20] [--requests 200 | --duration 60] [--turns 3]
+      [--llm-latency-ms 800] [--tokens-per-second 50] [--output-tokens 200] [--json 결과.json]
+      [--url http://localhost:8000]  (실행 중인 서버에 보낼 때, 서버 내부 지표는 측정하지 않음)
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.bench_retrieval import build_store, configure_environment, load_fixtures, percentile
+
+CHAT_PATH = "/api/chat/"
+# 이벤트 루프 지연을 재는 주기 (초)
+LOOP_PROBE_INTERVAL = 0.01
+
+
+def deep_sizeof(obj, seen=None) -> int:
+    """객체와 그 안의 dict/list/객체 속성이 차지하는 메모리 근사값 (바이트)"""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, '__dict__'):
+        size += deep_sizeof(vars(obj), seen)
+    return size
+
+
+def rss_bytes():
+    """현재 프로세스의 RSS (Linux /proc, 없으면 None)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def chat_outcomes() -> dict:
+    """서버가 기록한 채팅 요청 결과별 누적 수 (answered, no_documents, empty, error)"""
+    from core.metrics import CHAT_REQUESTS
+    return {outcome: count for (outcome,), count in CHAT_REQUESTS.values().items()}
+
+
+def session_store_stats() -> dict:
+    """채팅 세션 저장소(chat_service.store)와 대화 맥락 저장소의 크기"""
+    from service.chat_service import store
+    from service.conversation_service import get_conversation_service
+    conversations = get_conversation_service().conversations
+    return {
+        "sessions": len(store),
+        "messages": sum(len(history.messages) for history in store.values()),
+        "conversation_sessions": len(conversations),
+        "bytes": deep_sizeof(store) + deep_sizeof(conversations),
+    }
+
+
+class LoopMonitor:
+    """짧게 잠들었다 깨어나는 작업으로 이벤트 루프가 막혀 있던 시간을 잽니다."""
+
+    def __init__(self, interval: float = LOOP_PROBE_INTERVAL):
+        self.interval = interval
+        self.lags = []
+        self._task = None
+        self._probe_started = None
+
+    async def _probe(self):
+        while True:
+            self._probe_started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, time.perf_counter() - self._probe_started - self.interval))
+
+    def start(self):
+        self._probe_started = time.perf_counter()
+        self._task = asyncio.get_running_loop().create_task(self._probe())
+
+    async def stop(self):
+        # 루프가 끝까지 막혀 있었다면 마지막 확인 작업이 깨어나지 못했으므로 그 지연도 포함
+        lag = time.perf_counter() - self._probe_started - self.interval
+        if lag > 0:
+            self.lags.append(lag)
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    def summary(self, elapsed: float) -> dict:
+        blocked = sum(self.lags)
+        return {
+            "blocked_seconds": round(blocked, 3),
+            "blocked_ratio": round(blocked / elapsed, 3) if elapsed else None,
+            "max_lag_ms": round(max(self.lags, default=0.0) * 1000, 1),
+            "p99_lag_ms": round((percentile(self.lags, 99) or 0.0) * 1000, 1),
+        }
+
+
+async def run_load(client, questions, concurrency, total_requests, duration, turns, seed):
+    rng = random.Random(seed)
+    latencies, errors, statuses = [], 0, {}
+    issued = 0
+    deadline = time.perf_counter() + duration if duration else None
+
+    def next_request():
+        nonlocal issued
+        if deadline is not None and time.perf_counter() >= deadline:
+            return False
+        if deadline is None and issued >= total_requests:
+            return False
+        issued += 1
+        return True
+
+    async def user(index):
+        nonlocal errors
+        session, sent = 0, 0
+        while next_request():
+            # turns개 질문마다 새 세션 (같은 학생이 이어서 묻는 대화)
+            if sent and sent % turns == 0:
+                session += 1
+            sent += 1
+            payload = {"message": rng.choice(questions), "session_id": f"load-{index}-{session}"}
+            start = time.perf_counter()
+            try:
+                response = await client.post(CHAT_PATH, json=payload)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                if response.status_code != 200 or "error" in response.json():
+                    errors += 1
+            except Exception:
+                statuses["exception"] = statuses.get("exception", 0) + 1
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(user(i) for i in range(concurrency)))
+    return latencies, errors, statuses
+
+
+async def main_async(args):
+    import httpx
+
+    notices, queries = load_fixtures()
+    questions = [query["question"] for query in queries]
+    in_process = not args.url
+
+    if in_process:
+        from app import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest",
+                                   timeout=args.timeout)
+    else:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+
+    async with client:
+        # 엔진/토크나이저 초기화는 측정에서 제외
+        await client.post(CHAT_PATH, json={"message": questions[0], "session_id": "load-warmup"})
+        before = session_store_stats() if in_process else None
+        outcomes_before = chat_outcomes() if in_process else None
+        rss_before = rss_bytes() if in_process else None
+
+        monitor = LoopMonitor()
+        monitor.start()
+        start = time.perf_counter()
+        latencies, errors, statuses = await run_load(
+            client, questions, args.concurrency, args.requests, args.duration, args.turns, args.seed)
+        elapsed = time.perf_counter() - start
+        await monitor.stop()
+
+    report = {
+        "run": {
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "target": args.url or "in-process",
+            "concurrency": args.concurrency,
+            "turns_per_session": args.turns,
+            "llm": None if args.url else {
+                "latency_ms": args.llm_latency_ms,
+                "tokens_per_second": args.tokens_per_second,
+                "output_tokens": args.output_tokens,
+            },
+        },
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": {str(k): v for k, v in statuses.items()},
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            name: round((percentile(latencies, p) or 0.0) * 1000, 1)
+            for name, p in (("p50", 50), ("p90", 90), ("p95", 95), ("p99", 99), ("max", 100))
+        },
+        # 클라이언트와 서버가 같은 루프를 쓰는 in-process 실행에서는 서버 처리 중 루프가 막힌 시간
+        "event_loop": monitor.summary(elapsed),
+    }
+    if in_process:
+        # 응답 생성 중 예외는 안내 문구로 바뀌어 HTTP로는 구분되지 않으므로 서버 쪽 결과로 집계
+        report["outcomes"] = {
+            outcome: count - outcomes_before.get(outcome, 0) for outcome, count in chat_outcomes().items()
+        }
+        after = session_store_stats()
+        rss_after = rss_bytes()
+        new_sessions = after["sessions"] - before["sessions"]
+        report["session_store"] = {
+            "before": before,
+            "after": after,
+            "growth_bytes": after["bytes"] - before["bytes"],
+            "bytes_per_session": round((after["bytes"] - before["bytes"]) / new_sessions) if new_sessions else None,
+        }
+        if rss_before is not None and rss_after is not None:
+            report["rss_growth_bytes"] = rss_after - rss_before
+    return report
+
+
+def print_report(report):
+    latency, loop = report["latency_ms"], report["event_loop"]
+    print(f"요청 {report['requests']}건 (오류 {report['errors']}건), {report['seconds']:.1f}초, "
+          f"처리량 {report['throughput_rps']:.2f} req/s")
+    if report.get("outcomes"):
+        print("응답 결과 " + ", ".join(f"{outcome} {count}건" for outcome, count in sorted(report["outcomes"].items())))
+    print(f"지연 시간 p50 {latency['p50']:.0f}ms  p95 {latency['p95']:.0f}ms  p99 {latency['p99']:.0f}ms  "
+          f"최대 {latency['max']:.0f}ms")
+    print(f"이벤트 루프 블로킹 {loop['blocked_seconds']:.2f}초 (실행 시간의 {loop['blocked_ratio'] * 100:.0f}%), "
+          f"최대 지연 {loop['max_lag_ms']:.0f}ms")
+    sessions = report.get("session_store")
+    if sessions:
+        print(f"세션 저장소 {sessions['before']['sessions']} -> {sessions['after']['sessions']}개 세션, "
+              f"메시지 {sessions['after']['messages']}개, +{sessions['growth_bytes'] / 1024:.1f}KB "
+              f"(세션당 {sessions['bytes_per_session'] or 0}B)")
+    if "rss_growth_bytes" in report:
+        print(f"프로세스 RSS 증가 {report['rss_growth_bytes'] / 1024 / 1024:+.1f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="채팅 API 부하 테스트 (가짜 LLM, 로컬 벡터스토어)")
+    parser.add_argument("--concurrency", type=int, default=20, help="동시 사용자 수")
+    parser.add_argument("--requests", type=int, default=200, help="보낼 요청 수 (--duration이 없을 때)")
+    parser.add_argument("--duration", type=float, help="이 시간(초) 동안 요청을 계속 보냄")
+    parser.add_argument("--turns", type=int, default=3, help="세션 하나에서 보내는 질문 수")
+    parser.add_argument("--llm-latency-ms", type=float, default=800, help="가짜 LLM 첫 토큰 지연 (ms)")
+    parser.add_argument("--tokens-per-second", type=float, default=50, help="가짜 LLM 토큰 생성 속도")
+    parser.add_argument("--output-tokens", type=int, default=200, help="가짜 LLM 응답 토큰 수")
+    parser.add_argument("--timeout", type=float, default=120, help="요청 타임아웃 (초)")
+    parser.add_argument("--seed", type=int, default=0, help="질문 선택 난수 시드")
+    parser.add_argument("--url", help="실행 중인 서버 주소 (지정하지 않으면 프로세스 안에서 실행)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="load_chat_") as store_path:
+        if not args.url:
+            configure_environment(store_path, "hashing")
+            os.environ["LLM_BACKEND"] = "fake"
+            os.environ["FAKE_LLM_LATENCY_MS"] = str(args.llm_latency_ms)
+            os.environ["FAKE_LLM_TOKENS_PER_SECOND"] = str(args.tokens_per_second)
+            os.environ["FAKE_LLM_OUTPUT_TOKENS"] = str(args.output_tokens)
+            notices, _ = load_fixtures()
+            build_store(notices, store_path)
+            print(f"프로세스 안에서 실행: 가짜 LLM ({args.llm_latency_ms:g}ms + "
+                  f"{args.output_tokens}토큰 / {args.tokens_per_second:g}토큰/초), 로컬 벡터스토어 {len(notices)}건")
+        report = asyncio.run(main_async(args))
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
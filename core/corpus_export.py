@@ -0,0 +1,139 @@
+"""
+코퍼스 내보내기
+원본 저장소(MySQL swpre 테이블, Pinecone, 로컬 벡터스토어)에서 문서를 페이지 단위로 스트리밍
+"""
+
+import os
+from typing import Iterator, List, Optional
+
+from langchain_core.documents import Document
+
+from core.db import connect_db, db_connection
+from core.logger import logger
+from core.vectorstore import get_vectorstore_backend, get_pinecone_index
+
+DEFAULT_PAGE_SIZE = 500
+PINECONE_LIST_LIMIT = 100     # Pinecone list 요청 1회당 최대 id 수
+
+
+def format_notice_content(title, link, content) -> str:
+    """업로드 시 사용하는 문서 본문 형식과 동일한 텍스트를 만듭니다."""
+    return f"Title: {title}\nLink: {link}\nContent: {content}"
+
+
+def get_corpus_source() -> str:
+    """
+    코퍼스 원본을 반환합니다. ('mysql', 'pinecone', 'local')
+    설정이 없으면 벡터스토어 백엔드와 같은 저장소를 사용합니다.
+    """
+    return os.getenv('CORPUS_SOURCE', get_vectorstore_backend()).lower()
+
+
+class CorpusExporter:
+    """
+    코퍼스 내보내기: 원본 저장소의 전체 문서를 페이지 단위 제너레이터로 제공
+    - iter_pages(): Document 리스트를 페이지 단위로 반환
+    - count(): 원본 저장소가 보고하는 전체 문서 수 (완전성 검증용)
+    count()는 iter_pages() 전에 호출합니다. 내보내는 동안 추가된 문서가 불일치로 보이지 않도록
+    MySQL은 센 시점의 마지막 id(max_id)까지만 내보냅니다.
+    """
+
+    def __init__(self, source: Optional[str] = None, page_size: int = DEFAULT_PAGE_SIZE):
+        self.source = source or get_corpus_source()
+        self.page_size = page_size
+        self.max_id: Optional[int] = None
+        if self.source not in ('mysql', 'pinecone', 'local'):
+            raise ValueError(f"지원하지 않는 코퍼스 원본입니다: {self.source}")
+
+    def iter_pages(self) -> Iterator[List[Document]]:
+        """원본 저장소의 문서를 페이지 단위로 반환합니다."""
+        if self.source == 'mysql':
+            return self._iter_mysql_pages()
+        if self.source == 'pinecone':
+            return self._iter_pinecone_pages()
+        return self._iter_local_pages()
+
+    def iter_documents(self) -> Iterator[Document]:
+        """원본 저장소의 문서를 하나씩 반환합니다."""
+        for page in self.iter_pages():
+            yield from page
+
+    def count(self) -> Optional[int]:
+        """원본 저장소의 전체 문서 수를 반환합니다. 확인할 수 없으면 None."""
+        try:
+            if self.source == 'mysql':
+                with db_connection() as db, db.cursor() as cursor:
+                    cursor.execute("SELECT COUNT(*), COALESCE(MAX(id), 0) FROM swpre")
+                    count, self.max_id = cursor.fetchone()
+                    return count
+            if self.source == 'pinecone':
+                stats = get_pinecone_index().describe_index_stats()
+                return stats.total_vector_count
+            from core.vectorstore import get_vectorstore
+            return len(get_vectorstore())
+        except Exception as e:
+            logger.error(f"코퍼스 문서 수 조회 실패 ({self.source}): {e}")
+            return None
+
+    # MySQL: id 기준 keyset 페이지네이션 (메타데이터는 업로드할 때와 같은 형식)
+    def _iter_mysql_pages(self) -> Iterator[List[Document]]:
+        from core.ingestion.records import NoticeRecord
+        db = connect_db()
+        try:
+            last_id = 0
+            # count()로 센 마지막 id까지만 (세지 않았으면 전체)
+            max_id = self.max_id if self.max_id is not None else 2 ** 63 - 1
+            while True:
+                with db.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT id, title, link, content, date FROM swpre WHERE id > %s AND id <= %s "
+                        "ORDER BY id LIMIT %s",
+                        (last_id, max_id, self.page_size)
+                    )
+                    rows = cursor.fetchall()
+                if not rows:
+                    break
+                records = [NoticeRecord(id, title, link, content, None, pub_date)
+                           for id, title, link, content, pub_date in rows]
+                yield [
+                    Document(
+                        page_content=record.to_text(),
+                        metadata=record.to_metadata() if record.pub_date is not None
+                        else {'title': record.title, 'link': record.link, 'content_hash': record.text_hash},
+                        id=str(record.id)
+                    )
+                    for record in records
+                ]
+                last_id = rows[-1][0]
+        finally:
+            db.close()
+
+    # Pinecone: list로 id를 나눠 받고 fetch로 메타데이터 조회
+    def _iter_pinecone_pages(self) -> Iterator[List[Document]]:
+        index = get_pinecone_index()
+        limit = min(self.page_size, PINECONE_LIST_LIMIT)
+        for ids in index.list(limit=limit):
+            if not ids:
+                continue
+            response = index.fetch(ids=list(ids))
+            page = []
+            for vector_id, vector in response.vectors.items():
+                metadata = dict(vector.metadata or {})
+                text = metadata.pop('text', None)
+                if text is None:
+                    continue
+                page.append(Document(page_content=text, metadata=metadata, id=vector_id))
+            yield page
+
+    # 로컬 벡터스토어: 저장된 문서 목록을 그대로 나눔
+    def _iter_local_pages(self) -> Iterator[List[Document]]:
+        from core.vectorstore import get_vectorstore
+        store = get_vectorstore()
+        ids = store.get_ids()
+        for start in range(0, len(ids), self.page_size):
+            yield store.get_by_ids(ids[start:start + self.page_size])
+
+
+def get_corpus_exporter(source: Optional[str] = None, page_size: int = DEFAULT_PAGE_SIZE) -> CorpusExporter:
+    """설정된 원본 저장소의 코퍼스 내보내기 인스턴스를 반환합니다."""
+    return CorpusExporter(source=source, page_size=page_size)
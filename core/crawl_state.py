@@ -0,0 +1,116 @@
+"""
+크롤링 상태 저장소
+RSS 페이지/상세 페이지별 ETag, Last-Modified, 내용 해시를 로컬 파일에 보관하여
+조건부 요청과 변경 감지에 사용
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Iterable, Optional
+
+from core.logger import logger
+
+# 첫 RSS 페이지가 지난 실행과 같아 파이프라인을 건너뛸 때 사용하는 종료 코드
+NO_CHANGES_EXIT_CODE = 3
+
+
+def get_crawl_state_path() -> str:
+    """크롤링 상태 파일 경로를 반환합니다."""
+    return os.getenv('CRAWL_STATE_PATH', 'data/crawl_state.json')
+
+
+def content_hash(text: str) -> str:
+    """응답 본문의 SHA-256 해시를 반환합니다."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def items_fingerprint(items: Iterable) -> str:
+    """RSS 항목 집합(링크, 게시일, 제목)의 순서와 무관한 해시를 반환합니다."""
+    keys = sorted(f"{item.link}|{item.pub_date}|{item.title}" for item in items)
+    return content_hash("\n".join(keys))
+
+
+class CrawlState:
+    """
+    크롤링 상태
+    - urls: URL별 {'etag', 'last_modified', 'hash', 'items_hash'}
+    - latest_first_page: 가장 최근 크롤링한 첫 RSS 페이지의 항목 해시
+    - completed_first_page: 파이프라인(크롤링 → OCR → 업로드)이 끝까지 처리한 첫 페이지 항목 해시
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or get_crawl_state_path()
+        self.urls: Dict[str, dict] = {}
+        self.latest_first_page: Optional[str] = None
+        self.completed_first_page: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "CrawlState":
+        """상태 파일을 읽습니다. 파일이 없거나 손상되었으면 빈 상태를 반환합니다."""
+        state = cls(path)
+        try:
+            with open(state.path, encoding='utf-8') as f:
+                data = json.load(f)
+            state.urls = data.get('urls', {})
+            state.latest_first_page = data.get('latest_first_page')
+            state.completed_first_page = data.get('completed_first_page')
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"크롤링 상태 파일을 읽을 수 없어 새로 시작합니다 ({state.path}): {e}")
+        return state
+
+    def save(self):
+        """상태를 임시 파일에 쓴 뒤 교체하여 저장합니다."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            data = {
+                'urls': self.urls,
+                'latest_first_page': self.latest_first_page,
+                'completed_first_page': self.completed_first_page,
+            }
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.path)
+
+    def get(self, url: str) -> dict:
+        with self._lock:
+            return dict(self.urls.get(url, {}))
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """저장된 ETag/Last-Modified로 조건부 요청 헤더를 만듭니다."""
+        entry = self.get(url)
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def is_changed(self, url: str, text_hash: str) -> bool:
+        """응답 내용 해시가 마지막으로 기록한 값과 다른지 확인합니다."""
+        with self._lock:
+            return self.urls.get(url, {}).get('hash') != text_hash
+
+    def record(self, url: str, validators: dict):
+        """
+        URL의 검증자(etag, last_modified), 내용 해시, RSS 항목 집합 해시를 기록합니다.
+        다음 실행에서 304로 건너뛰게 되므로, 그 페이지의 공지사항이 DB에 반영된 뒤에만 호출해야 합니다.
+        (NoticeCrawler.commit_state)
+        """
+        with self._lock:
+            self.urls.setdefault(url, {}).update(validators)
+
+    def is_first_page_processed(self, items_hash: Optional[str]) -> bool:
+        """첫 RSS 페이지 항목이 마지막으로 완료된 파이프라인 실행과 같은지 확인합니다."""
+        return items_hash is not None and items_hash == self.completed_first_page
+
+    def mark_pipeline_complete(self):
+        """가장 최근 크롤링한 첫 페이지까지 파이프라인 처리가 끝났음을 기록합니다."""
+        self.completed_first_page = self.latest_first_page
@@ -0,0 +1,296 @@
+"""
+공지사항 동시 크롤러
+커넥션 풀 세션, 호스트별 동시 요청 제한, 재시도/백오프, 가져오기와 파싱의 파이프라인 처리,
+크롤링 상태(core.crawl_state)를 이용한 조건부 요청
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from bs4 import BeautifulSoup as bs
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from core.crawl_state import CrawlState, content_hash, items_fingerprint
+from core.logger import logger
+
+BASE_DOMAIN = "https://www.hansung.ac.kr"
+RSS_URL = BASE_DOMAIN + "/bbs/hansung/143/rssList.do?page={}&category=학사"
+
+
+@dataclass
+class RssItem:
+    """RSS 목록의 공지사항 한 건"""
+    title: str
+    link: str
+    pub_date: str
+    category: str
+
+
+@dataclass
+class RssPage:
+    """
+    RSS 목록 페이지 한 장
+    - items: 로딩 실패 시 None, 304(변경 없음) 응답이면 빈 리스트
+    - not_modified: 서버가 304로 응답했는지 여부
+    - items_hash: 항목 집합 해시 (304이면 지난 실행에서 기록한 값)
+    """
+    page_number: int
+    url: str
+    items: Optional[List[RssItem]]
+    not_modified: bool = False
+    items_hash: Optional[str] = None
+
+
+def create_session(pool_size: int = 8, retries: int = 3, backoff: float = 0.5) -> requests.Session:
+    """
+    keep-alive 커넥션 풀과 재시도 정책이 설정된 세션을 만듭니다.
+    연결 오류와 429/5xx 응답은 지수 백오프로 재시도합니다.
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET", "HEAD"],
+        respect_retry_after_header=True
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def normalize_link(link: str, base_domain: str = BASE_DOMAIN) -> str:
+    """상대 경로 링크를 절대 URL로 바꿉니다."""
+    if link.startswith("/"):
+        return f"{base_domain}{link}"
+    return link
+
+
+def parse_rss(xml_text: str, base_domain: str = BASE_DOMAIN) -> List[RssItem]:
+    """RSS 목록 페이지를 파싱합니다."""
+    soup = bs(xml_text, 'xml')
+    items = []
+    for article in soup.find_all('item'):
+        title = article.find('title').get_text(strip=True) if article.find('title') else "No Title"
+        link = article.find('link').get_text() if article.find('link') else "No Link"
+        pub_date = article.find('pubDate').get_text(strip=True) if article.find('pubDate') else "No Date"
+        category = article.find('category').get_text(strip=True) if article.find('category') else ""
+        items.append(RssItem(title, normalize_link(link, base_domain), pub_date, category))
+    return items
+
+
+def parse_detail(html: str, base_domain: str = BASE_DOMAIN) -> Tuple[str, List[str]]:
+    """공지사항 상세 페이지에서 본문 텍스트와 본문에 있는 모든 이미지 URL(문서 순서, 중복 제거)을 추출합니다."""
+    soup = bs(html, 'html.parser')
+    view_con_div = soup.find('div', class_='view-con')
+    if not view_con_div:
+        return "No content found", []
+
+    content = view_con_div.get_text(strip=True)
+    image_urls = []
+    for image_tag in view_con_div.find_all('img'):
+        src = image_tag.get('src', '').strip()
+        if not src or src.startswith('data:'):
+            continue
+        src = normalize_link(src, base_domain)
+        if src not in image_urls:
+            image_urls.append(src)
+    return content, image_urls
+
+
+class HostLimiter:
+    """
+    호스트별 요청 제한
+    - 호스트마다 동시 요청 수 제한 (세마포어)
+    - 같은 호스트에 대한 요청 시작 사이 최소 간격 보장
+    """
+
+    def __init__(self, max_concurrent: int = 4, min_interval: float = 0.0):
+        self.max_concurrent = max_concurrent
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._semaphores = {}
+        self._next_start = {}
+
+    @contextmanager
+    def acquire(self, host: str):
+        with self._lock:
+            semaphore = self._semaphores.setdefault(host, threading.BoundedSemaphore(self.max_concurrent))
+        semaphore.acquire()
+        try:
+            if self.min_interval > 0:
+                with self._lock:
+                    now = time.monotonic()
+                    start = max(now, self._next_start.get(host, 0.0))
+                    self._next_start[host] = start + self.min_interval
+                if start > now:
+                    time.sleep(start - now)
+            yield
+        finally:
+            semaphore.release()
+
+
+class NoticeCrawler:
+    """
+    공지사항 동시 크롤러
+    1. RSS 페이지는 순서를 유지하면서 미리 가져오기(prefetch)
+    2. 상세 페이지는 제한된 동시성으로 가져오고, 도착하는 순서대로 파싱
+    3. 크롤링 상태가 주어지면 조건부 요청(If-None-Match/If-Modified-Since)을 보냄
+       응답의 검증자는 바로 기록하지 않고 보류했다가, 호출한 쪽이 그 페이지를 처리(DB 저장)한 뒤
+       commit_state로 기록 (미리 가져왔지만 처리하지 못한 페이지나 저장에 실패한 페이지는 다음 실행에서 다시 가져옴)
+    """
+
+    def __init__(self, max_workers: int = 8, per_host_limit: int = 4, min_interval: float = 0.0,
+                 retries: int = 3, backoff: float = 0.5, timeout: float = 10,
+                 rss_url: str = RSS_URL, base_domain: str = BASE_DOMAIN,
+                 state: Optional[CrawlState] = None):
+        self.max_workers = max_workers
+        self.state = state
+        self.timeout = timeout
+        self.rss_url = rss_url
+        self.base_domain = base_domain
+        self.session = create_session(pool_size=max_workers, retries=retries, backoff=backoff)
+        self.limiter = HostLimiter(max_concurrent=per_host_limit, min_interval=min_interval)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="crawler")
+        self._pending_state: Dict[str, dict] = {}   # URL -> 아직 기록하지 않은 검증자
+        self._pending_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self.session.close()
+
+    def fetch(self, url: str, conditional: bool = False) -> requests.Response:
+        """
+        호스트별 제한을 지키며 URL을 가져옵니다.
+        conditional이면 저장된 검증자로 조건부 요청을 보내며, 이 경우 304 응답이 반환될 수 있습니다.
+        """
+        headers = self.state.conditional_headers(url) if conditional and self.state else None
+        with self.limiter.acquire(urlparse(url).netloc):
+            response = self.session.get(url, timeout=self.timeout, headers=headers)
+        response.raise_for_status()
+        return response
+
+    def _fetch_text(self, url: str, conditional: bool = False) -> Tuple[Optional[str], bool]:
+        """
+        URL의 본문을 가져옵니다.
+        (본문, 변경 여부)를 반환하며, 304 응답이면 본문은 None입니다.
+        """
+        response = self.fetch(url, conditional)
+        if response.status_code == 304:
+            return None, False
+        text = response.text
+        if not self.state:
+            return text, True
+        text_hash = content_hash(text)
+        self._stage_state(url, {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'hash': text_hash,
+        })
+        return text, self.state.is_changed(url, text_hash)
+
+    def _stage_state(self, url: str, validators: dict):
+        with self._pending_lock:
+            self._pending_state.setdefault(url, {}).update(validators)
+
+    def commit_state(self, urls: Iterable[str]):
+        """처리가 끝난 URL(RSS 페이지, 상세 페이지)의 보류 중인 검증자를 크롤링 상태에 기록합니다."""
+        if not self.state:
+            return
+        for url in urls:
+            with self._pending_lock:
+                validators = self._pending_state.pop(url, None)
+            if validators:
+                self.state.record(url, validators)
+
+    def iter_rss_pages(self, page_numbers: Iterable[int], prefetch: Optional[int] = None,
+                       conditional: bool = False) -> Iterator[RssPage]:
+        """
+        RSS 페이지를 순서대로 반환하되, 다음 페이지들을 미리 가져옵니다.
+        로딩에 실패한 페이지는 items가 None인 RssPage로 반환합니다.
+        제너레이터를 닫으면 남은 요청은 취소됩니다.
+        """
+        page_numbers = iter(page_numbers)
+        prefetch = prefetch or self.max_workers
+        pending = deque()
+
+        def submit_next():
+            page_number = next(page_numbers, None)
+            if page_number is not None:
+                url = self.rss_url.format(page_number)
+                pending.append((page_number, url, self._executor.submit(self._fetch_text, url, conditional)))
+
+        for _ in range(prefetch):
+            submit_next()
+
+        try:
+            while pending:
+                page_number, url, future = pending.popleft()
+                submit_next()
+                try:
+                    text, _ = future.result()
+                except Exception as e:
+                    logger.error(f"RSS 페이지 {page_number} 로딩 오류: {e}")
+                    yield RssPage(page_number, url, None)
+                    continue
+
+                if text is None:
+                    previous = self.state.get(url) if self.state else {}
+                    yield RssPage(page_number, url, [], not_modified=True, items_hash=previous.get('items_hash'))
+                    continue
+
+                items = parse_rss(text, self.base_domain)
+                items_hash = items_fingerprint(items)
+                if self.state:
+                    self._stage_state(url, {'items_hash': items_hash})
+                yield RssPage(page_number, url, items, items_hash=items_hash)
+        finally:
+            for _, _, future in pending:
+                future.cancel()
+
+    def iter_details(self, items: Iterable[RssItem], conditional: bool = False) -> Iterator[Tuple[RssItem, str, List[str]]]:
+        """
+        상세 페이지를 동시에 가져오고, 먼저 도착한 페이지부터 파싱하여 반환합니다.
+        실패한 페이지는 기존 크롤러와 같이 "Error loading content"로 반환합니다.
+        conditional이면 304 응답이거나 내용 해시가 같은(변경 없는) 페이지는 반환하지 않습니다.
+        """
+        futures = {self._executor.submit(self._fetch_text, item.link, conditional): item for item in items}
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                text, changed = future.result()
+                if conditional and not changed:
+                    continue
+                content, image_urls = parse_detail(text, self.base_domain)
+            except Exception as e:
+                logger.error(f"내용 크롤링 오류 ({item.link}): {e}")
+                content, image_urls = "Error loading content", []
+            yield item, content, image_urls
+
+
+def get_crawler(**kwargs) -> NoticeCrawler:
+    """환경 설정에 맞는 크롤러를 생성합니다."""
+    options = {
+        'max_workers': int(os.getenv('CRAWLER_MAX_WORKERS', '8')),
+        'per_host_limit': int(os.getenv('CRAWLER_PER_HOST_LIMIT', '4')),
+        'min_interval': float(os.getenv('CRAWLER_MIN_INTERVAL', '0.1')),
+        'retries': int(os.getenv('CRAWLER_RETRIES', '3')),
+    }
+    options.update(kwargs)
+    return NoticeCrawler(**options)
@@ -0,0 +1,231 @@
+"""
+MySQL 데이터 접근 계층
+환경 변수(DB_*) 설정 한 곳, 스레드 안전한 커넥션 풀, 일괄 처리 도우미
+connect_db()는 풀에서 커넥션을 빌려 주며, close()하면 실제로 닫지 않고 풀에 반납
+"""
+
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+import pymysql
+from pymysql.constants import SERVER_STATUS
+
+from core.logger import logger
+
+# executemany/IN (...) 조회 한 번에 보내는 최대 행 수
+DEFAULT_BATCH_SIZE = 500
+
+_db_pool: Optional["ConnectionPool"] = None
+_db_pool_lock = threading.Lock()
+
+
+# 기본값 없이 반드시 설정해야 하는 환경 변수 (계정/비밀번호는 코드에 두지 않음)
+REQUIRED_DB_SETTINGS = ('DB_USER', 'DB_PASSWORD', 'DB_NAME')
+
+
+def get_db_config() -> dict:
+    """
+    환경 변수(DB_*)로 MySQL 연결 설정을 만듭니다.
+    DB_USER, DB_PASSWORD, DB_NAME이 없으면 ValueError를 발생시킵니다. (DB_HOST, DB_PORT는 기본값 사용)
+    """
+    missing = [name for name in REQUIRED_DB_SETTINGS if os.getenv(name) is None]
+    if missing:
+        raise ValueError(f"MySQL 연결 환경 변수가 설정되지 않았습니다: {', '.join(missing)} (.env 또는 환경 변수로 설정)")
+    return {
+        'host': os.getenv('DB_HOST', 'localhost'),
+        'user': os.getenv('DB_USER'),
+        'password': os.getenv('DB_PASSWORD'),
+        'database': os.getenv('DB_NAME'),
+        'port': int(os.getenv('DB_PORT', '3306')),
+        'charset': 'utf8mb4',
+    }
+
+
+class PooledConnection:
+    """
+    풀에서 빌린 커넥션
+    pymysql 커넥션과 같은 방식으로 사용하며, close()를 호출하면 풀에 반납합니다.
+    """
+
+    def __init__(self, pool: "ConnectionPool", raw):
+        self._pool = pool
+        self._raw = raw
+
+    def __getattr__(self, name):
+        if self._raw is None:
+            raise pymysql.err.InterfaceError("반납된 커넥션입니다.")
+        return getattr(self._raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None and self._raw is not None:
+            try:
+                self._raw.rollback()
+            except pymysql.err.Error:
+                pass
+        self.close()
+
+    def close(self):
+        if self._raw is not None:
+            raw, self._raw = self._raw, None
+            self._pool.release(raw)
+
+
+class ConnectionPool:
+    """
+    MySQL 커넥션 풀
+    - 최대 size개의 커넥션을 필요할 때 만들고, 반납된 커넥션을 최근 것부터 재사용
+    - ping_interval초 이상 쉬었던 커넥션은 빌려 주기 전에 ping(재연결)으로 확인
+    - 끝나지 않은 트랜잭션이 남은 채 반납되면 롤백하고, 오류가 난 커넥션은 버림
+    """
+
+    def __init__(self, size: int = 5, timeout: float = 30.0, ping_interval: float = 30.0, **config):
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        self.config = config or get_db_config()
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._last_used = {}
+        self._closed = False
+
+    def acquire(self) -> PooledConnection:
+        if self._closed:
+            raise pymysql.err.InterfaceError("커넥션 풀이 닫혔습니다.")
+        if not self._slots.acquire(timeout=self.timeout):
+            raise pymysql.err.OperationalError(f"{self.timeout}초 안에 DB 커넥션을 얻지 못했습니다. (풀 크기 {self.size})")
+        try:
+            raw = self._take_idle()
+            if raw is None:
+                raw = pymysql.connect(**self.config)
+        except Exception:
+            self._slots.release()
+            raise
+        return PooledConnection(self, raw)
+
+    def _take_idle(self):
+        while True:
+            try:
+                raw = self._idle.get_nowait()
+            except queue.Empty:
+                return None
+            idle_seconds = time.monotonic() - self._last_used.pop(id(raw), 0.0)
+            if idle_seconds < self.ping_interval:
+                return raw
+            try:
+                raw.ping(reconnect=True)
+                return raw
+            except pymysql.err.Error as e:
+                logger.warning(f"끊어진 DB 커넥션을 버립니다: {e}")
+                _close_quietly(raw)
+
+    def release(self, raw):
+        try:
+            if self._closed or not raw.open:
+                _close_quietly(raw)
+                return
+            if raw.server_status & SERVER_STATUS.SERVER_STATUS_IN_TRANS:
+                raw.rollback()
+            self._last_used[id(raw)] = time.monotonic()
+            self._idle.put(raw)
+        except pymysql.err.Error:
+            _close_quietly(raw)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self) -> Iterator[PooledConnection]:
+        """with 블록 동안 커넥션을 빌립니다. 예외가 나면 롤백 후 반납합니다."""
+        with self.acquire() as db:
+            yield db
+
+    def close(self):
+        """쉬고 있는 커넥션을 모두 닫습니다. 이후 반납되는 커넥션도 닫힙니다."""
+        self._closed = True
+        while True:
+            try:
+                _close_quietly(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+
+def _close_quietly(raw):
+    try:
+        raw.close()
+    except Exception:
+        pass
+
+
+def get_db_pool() -> ConnectionPool:
+    """프로세스 공용 커넥션 풀 (DB_POOL_SIZE, DB_POOL_TIMEOUT)"""
+    global _db_pool
+    with _db_pool_lock:
+        if _db_pool is None or _db_pool._closed:
+            _db_pool = ConnectionPool(
+                size=int(os.getenv('DB_POOL_SIZE', '5')),
+                timeout=float(os.getenv('DB_POOL_TIMEOUT', '30'))
+            )
+        return _db_pool
+
+
+def close_db_pool():
+    """서버 종료 시 공용 커넥션 풀을 닫습니다."""
+    global _db_pool
+    with _db_pool_lock:
+        if _db_pool is not None:
+            _db_pool.close()
+            _db_pool = None
+
+
+def connect_db() -> PooledConnection:
+    """공용 풀에서 커넥션을 빌립니다. 사용 후 close()하면 풀에 반납됩니다."""
+    return get_db_pool().acquire()
+
+
+@contextmanager
+def db_connection() -> Iterator[PooledConnection]:
+    """with 블록 동안 공용 풀의 커넥션을 빌립니다."""
+    with connect_db() as db:
+        yield db
+
+
+def chunked(items: Iterable, size: int = DEFAULT_BATCH_SIZE) -> Iterator[List]:
+    """items를 size개씩 나눕니다."""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def execute_batches(cursor, sql: str, rows: Iterable[Sequence], batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    executemany를 batch_size행씩 나눠 실행합니다.
+    INSERT ... VALUES 문은 pymysql이 한 번의 다중 행 INSERT로 묶어 보냅니다.
+    """
+    count = 0
+    for chunk in chunked(rows, batch_size):
+        cursor.executemany(sql, chunk)
+        count += len(chunk)
+    return count
+
+
+def select_in(cursor, sql: str, values: Iterable, batch_size: int = DEFAULT_BATCH_SIZE) -> List[tuple]:
+    """
+    sql의 {placeholders} 자리에 IN (...) 목록을 채워 batch_size개씩 조회한 결과를 합쳐 반환합니다.
+    예: select_in(cursor, "SELECT id, title FROM swpre WHERE id IN ({placeholders})", ids)
+    """
+    rows = []
+    for chunk in chunked(values, batch_size):
+        cursor.execute(sql.format(placeholders=", ".join(["%s"] * len(chunk))), chunk)
+        rows.extend(cursor.fetchall())
+    return rows
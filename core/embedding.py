@@ -1,13 +1,60 @@
-from langchain_huggingface import HuggingFaceEmbeddings
+import hashlib
+import os
+import re
+from typing import List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
 
 _embedding = None
 
+def get_embedding_backend():
+    """설정된 임베딩 백엔드를 반환합니다. ('huggingface' 또는 'hashing')"""
+    return os.getenv('EMBEDDING_BACKEND', 'huggingface').lower()
+
+class HashingEmbedding(Embeddings):
+    """
+    네트워크와 모델 파일 없이 동작하는 결정적 임베딩 (벤치마크, 부하 테스트용)
+    단어와 글자 2~3-gram을 해시해 고정 차원 벡터에 더한 뒤 정규화합니다.
+    의미 검색 품질은 실제 모델보다 낮지만, 같은 입력에는 항상 같은 벡터를 돌려줍니다.
+    """
+
+    def __init__(self, dimension: int = 1024):
+        self.dimension = dimension
+
+    def _features(self, text: str) -> List[str]:
+        features = []
+        for word in re.findall(r'\w+', text.lower()):
+            features.append(f"w:{word}")
+            for n in (2, 3):
+                features.extend(f"c:{word[i:i + n]}" for i in range(len(word) - n + 1))
+        return features
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for feature in self._features(text):
+            digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+            value = int.from_bytes(digest, 'little')
+            # 부호도 해시로 정해 충돌한 특징끼리 서로 상쇄되도록 함
+            vector[value % self.dimension] += 1.0 if value >> 63 else -1.0
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_query(text) for text in texts]
+
 def get_embedding():
     global _embedding
     if _embedding is None:
-        _embedding = HuggingFaceEmbeddings(
-            model_name="intfloat/e5-large-v2",
-            model_kwargs={'device': 'cpu'},
-            encode_kwargs={'normalize_embeddings': True}
-        )
-    return _embedding 
\ No newline at end of file
+        if get_embedding_backend() == 'hashing':
+            _embedding = HashingEmbedding()
+        else:
+            from langchain_huggingface import HuggingFaceEmbeddings
+            _embedding = HuggingFaceEmbeddings(
+                model_name="intfloat/e5-large-v2",
+                model_kwargs={'device': 'cpu'},
+                encode_kwargs={'normalize_embeddings': True}
+            )
+    return _embedding
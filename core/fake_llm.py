@@ -0,0 +1,104 @@
+"""
+부하 테스트용 가짜 채팅 모델
+OpenAI를 호출하지 않고, 설정한 지연 시간(첫 토큰까지)과 토큰 생성 속도만큼 기다린 뒤 답변 형식에 맞는 응답을 반환
+LLM_BACKEND=fake 로 get_llm()이 이 모델을 사용
+- FAKE_LLM_LATENCY_MS: 첫 토큰까지 걸리는 시간 (기본 800ms)
+- FAKE_LLM_TOKENS_PER_SECOND: 초당 생성 토큰 수 (기본 50)
+- FAKE_LLM_OUTPUT_TOKENS: 응답 토큰 수 (기본 200)
+프롬프트 접두사 캐시도 흉내 냄: 이전에 본 것과 같은 첫 시스템 메시지가 PREFIX_CACHE_MIN_TOKENS 이상이면
+그 토큰 수(128 단위로 내림)를 usage_metadata의 input_token_details.cache_read로 보고
+"""
+
+import os
+import re
+import threading
+import time
+from typing import Any, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+# 프롬프트 안의 검색 문서 형식 (core.corpus_export.format_notice_content)
+_DOCUMENT_PATTERN = re.compile(r"Title: (.*)\nLink: (\S+)")
+
+# OpenAI 프롬프트 캐시 규칙: 1024토큰 이상인 접두사를 128토큰 단위로 캐시
+PREFIX_CACHE_MIN_TOKENS = 1024
+PREFIX_CACHE_BLOCK_TOKENS = 128
+
+_seen_prefixes = set()
+_seen_prefixes_lock = threading.Lock()
+
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 근사값 (한국어 기준 대략 글자 2개당 1토큰)"""
+    return max(1, len(text) // 2)
+
+
+class FakeChatModel(BaseChatModel):
+    """지연 시간과 토큰 속도를 흉내 내는 채팅 모델"""
+    model_name: str = "fake-chat"
+    latency_ms: float = 800.0
+    tokens_per_second: float = 50.0
+    output_tokens: int = 200
+
+    @classmethod
+    def from_env(cls, model_name: str = "fake-chat") -> "FakeChatModel":
+        return cls(
+            model_name=model_name,
+            latency_ms=float(os.getenv('FAKE_LLM_LATENCY_MS', '800')),
+            tokens_per_second=float(os.getenv('FAKE_LLM_TOKENS_PER_SECOND', '50')),
+            output_tokens=int(os.getenv('FAKE_LLM_OUTPUT_TOKENS', '200'))
+        )
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    @property
+    def generation_seconds(self) -> float:
+        """응답 하나를 만드는 데 걸리는 시간 (초)"""
+        rate = self.tokens_per_second if self.tokens_per_second > 0 else float('inf')
+        return self.latency_ms / 1000 + self.output_tokens / rate
+
+    def _answer(self, messages: List[BaseMessage]) -> str:
+        prompt = "\n".join(str(message.content) for message in messages)
+        match = _DOCUMENT_PATTERN.search(prompt)
+        title, link = match.groups() if match else ("검색된 공지사항", "https://www.hansung.ac.kr")
+        question = str(messages[-1].content) if messages else ""
+        return (
+            f"여기 {question}에 대한 공지사항이 있습니다!\n\n"
+            f"1. 공지사항 제목: {title}\n\n"
+            f"2. 주요 내용 요약: 부하 테스트용 응답입니다.\n\n"
+            f"5. 공식 링크\n{link}\n\n"
+            "궁금한 점이 있으면 다시 물어봐 주세요!"
+        )
+
+    def _cached_tokens(self, messages: List[BaseMessage]) -> int:
+        """이전 호출과 같은 첫 메시지(고정 시스템 프롬프트)에서 캐시로 읽었다고 볼 토큰 수"""
+        if not messages:
+            return 0
+        prefix = str(messages[0].content)
+        tokens = estimate_tokens(prefix)
+        if tokens < PREFIX_CACHE_MIN_TOKENS:
+            return 0
+        with _seen_prefixes_lock:
+            seen = (self.model_name, prefix) in _seen_prefixes
+            _seen_prefixes.add((self.model_name, prefix))
+        return tokens // PREFIX_CACHE_BLOCK_TOKENS * PREFIX_CACHE_BLOCK_TOKENS if seen else 0
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.generation_seconds)
+        prompt_tokens = sum(estimate_tokens(str(message.content)) for message in messages)
+        message = AIMessage(
+            content=self._answer(messages),
+            usage_metadata={
+                'input_tokens': prompt_tokens,
+                'output_tokens': self.output_tokens,
+                'total_tokens': prompt_tokens + self.output_tokens,
+                'input_token_details': {'cache_read': self._cached_tokens(messages)}
+            },
+            response_metadata={'model_name': self.model_name}
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
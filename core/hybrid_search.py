@@ -1,14 +1,53 @@
-from typing import List, Dict, Any, Tuple
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
 from rank_bm25 import BM25Okapi
-from core.vectorstore import get_vectorstore
+from core.vectorstore import get_vectorstore, search_documents
+from core.corpus_export import get_corpus_exporter
 from core.korean_tokenizer import get_tokenizer
 from core.logger import logger
+from core.metrics import RETRIEVAL_CANDIDATES, RETRIEVAL_STAGE_SECONDS
+from core.tracing import start_span
 import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
 
+@dataclass(frozen=True)
+class SearchSnapshot:
+    """
+    검색 스냅샷: 한 번 만들면 바꾸지 않는 BM25 인덱스와 문서 목록
+    요청은 시작할 때 잡은 스냅샷으로 끝까지 검색하며, 수집 후에는 새 스냅샷으로 통째로 교체됨
+    (이전 스냅샷은 사용 중인 요청이 모두 끝나 참조가 사라지면 해제)
+    """
+    version: int
+    documents: Tuple[str, ...] = ()
+    metadatas: Tuple[Dict, ...] = ()
+    bm25_index: Optional[BM25Okapi] = None
+    corpus_verified: bool = False
+    source: Optional[str] = None
+    built_at: datetime = field(default_factory=datetime.now)
+    build_seconds: float = 0.0
+
+    def __len__(self):
+        return len(self.documents)
+
+    def to_dict(self) -> dict:
+        return {
+            'version': self.version,
+            'documents': len(self.documents),
+            'corpus_verified': self.corpus_verified,
+            'source': self.source,
+            'built_at': self.built_at.isoformat(),
+            'build_seconds': round(self.build_seconds, 3),
+        }
+
+
 class HybridSearchEngine:
     """
     하이브리드 검색 엔진: 벡터 검색(의미적 검색) + BM25 검색(키워드 검색)을 결합
+    BM25 상태는 SearchSnapshot으로 보관하고, rebuild()가 새 스냅샷을 만든 뒤 원자적으로 교체
     """
     
     # Step 1: 초기화 및 BM25 인덱스 구축 
@@ -17,105 +56,119 @@ class HybridSearchEngine:
         하이브리드 검색 엔진 초기화
         - 벡터스토어 연결
         - 한국어 토크나이저 초기화
-        - BM25 인덱스 구축
+        - 첫 검색 스냅샷(BM25 인덱스) 구축
         """
         self.vectorstore = get_vectorstore()      # Pinecone 벡터스토어
         self.tokenizer = get_tokenizer()          # 한국어 토크나이저
-        self.bm25_index = None                    # BM25 인덱스
-        self.documents = []                       # 문서 리스트
-        self._build_bm25_index()                  # BM25 인덱스 구축
+        self._snapshot = SearchSnapshot(version=0)  # 현재 검색 스냅샷
+        self._build_lock = threading.Lock()       # 스냅샷 구축은 한 번에 하나만
+        self.rebuild()                            # BM25 인덱스 구축
     
+    # 현재 스냅샷의 상태 (이전 속성 이름 유지)
+    @property
+    def snapshot(self) -> SearchSnapshot:
+        return self._snapshot
+
+    @property
+    def bm25_index(self) -> Optional[BM25Okapi]:
+        return self._snapshot.bm25_index
+
+    @property
+    def documents(self) -> Tuple[str, ...]:
+        return self._snapshot.documents
+
+    @property
+    def metadatas(self) -> Tuple[Dict, ...]:
+        return self._snapshot.metadatas
+
+    @property
+    def corpus_verified(self) -> bool:
+        return self._snapshot.corpus_verified
+
+    def rebuild(self) -> bool:
+        """
+        새 스냅샷을 만들어 교체합니다. 구축하는 동안 요청은 기존 스냅샷으로 계속 검색합니다.
+        구축에 실패하거나 문서를 하나도 가져오지 못하면 기존 스냅샷을 유지하고 False를 반환합니다.
+        """
+        with self._build_lock:
+            current = self._snapshot
+            snapshot = self._build_bm25_index(current.version + 1)
+            if snapshot is None or (not snapshot.documents and current.documents):
+                logger.warning(f"새 검색 스냅샷을 만들지 못해 v{current.version}을 계속 사용합니다.")
+                return False
+            # 참조를 바꾸는 것만으로 교체 (진행 중인 요청은 이전 스냅샷으로 끝까지 처리)
+            self._snapshot = snapshot
+            weakref.finalize(snapshot, logger.info, f"검색 스냅샷 v{snapshot.version} 해제")
+        logger.info(
+            f"검색 스냅샷 교체: v{current.version} -> v{snapshot.version} "
+            f"({len(snapshot)}개 문서, {snapshot.build_seconds:.1f}초)"
+        )
+        return True
+
     # Step 2: BM25 인덱스 구축
-    def _build_bm25_index(self):
+    def _build_bm25_index(self, version: int) -> Optional[SearchSnapshot]:
         """
-        BM25 인덱스를 구축
-        1.  벡터스토어에서 모든 문서 가져오기
+        BM25 인덱스를 구축해 새 스냅샷으로 반환 (실패 시 None)
+        1.  코퍼스 내보내기에서 문서를 페이지 단위로 스트리밍
         2.  한국어 토크나이저로 키워드 추출
-        3.  BM25 인덱스 생성
+        3.  원본 문서 수와 비교하여 완전성 검증
+        4.  BM25 인덱스 생성
         """
         try:
             logger.info("BM25 인덱스 구축 중...")
-            
-            # Step 2-1: 벡터스토어에서 모든 문서 가져오기
-            all_docs = self._get_all_documents_from_vectorstore()
-        
-            # Step 2-2: 한국어 토크나이저를 사용하여 문서 토큰화
-            tokenized_docs = []
-            for doc in all_docs:
-                keywords = self.tokenizer.extract_keywords(doc)  # 명사, 동사, 형용사 추출
-                tokenized_docs.append(keywords)
-            
-            self.documents = all_docs
-            
-            # BM25 인덱스 생성
-            self.bm25_index = BM25Okapi(tokenized_docs)
-            logger.info(f"BM25 인덱스 구축 완료: {len(all_docs)}개 문서")
+            start = time.perf_counter()
+            exporter = get_corpus_exporter()
+            # 원본 저장소의 문서 수는 수집 전에 셈 (수집 중에 추가된 문서가 불일치로 보이지 않도록)
+            expected_count = exporter.count()
+            
+            # Step 2-1 ~ 2-2: 페이지 단위로 문서를 받아 바로 토큰화
+            documents, metadatas, tokenized_docs = self._collect_corpus(exporter)
+            
+            # Step 2-3: 원본 저장소의 문서 수와 비교
+            corpus_verified = expected_count is not None and expected_count == len(documents)
+            if expected_count is None:
+                logger.warning(f"코퍼스 문서 수를 확인할 수 없습니다: {len(documents)}개 문서로 구축합니다.")
+            elif not corpus_verified:
+                logger.warning(f"코퍼스 문서 수 불일치: 원본 {expected_count}개, 수집 {len(documents)}개")
+            
+            if not documents:
+                logger.warning("BM25 인덱스를 구축할 문서가 없습니다.")
+                return SearchSnapshot(version=version, corpus_verified=corpus_verified, source=exporter.source)
+            
+            # Step 2-4: BM25 인덱스 생성
+            bm25_index = BM25Okapi(tokenized_docs)
+            logger.info(f"BM25 인덱스 구축 완료: {len(documents)}개 문서 (원본: {exporter.source})")
+            return SearchSnapshot(
+                version=version,
+                documents=tuple(documents),
+                metadatas=tuple(metadatas),
+                bm25_index=bm25_index,
+                corpus_verified=corpus_verified,
+                source=exporter.source,
+                build_seconds=time.perf_counter() - start
+            )
             
         except Exception as e:
             logger.error(f"BM25 인덱스 구축 실패: {e}")
-            self.bm25_index = None
+            return None
     
     # Step 3: 문서 수집
-    def _get_all_documents_from_vectorstore(self) -> List[str]:
+    def _collect_corpus(self, exporter) -> Tuple[List[str], List[Dict], List[List[str]]]:
         """
-        벡터스토어에서 모든 문서를 가져옵니다.
-        Step 3-1: Pinecone API 연결
-        Step 3-2: 모든 벡터 쿼리
-        Step 3-3: 메타데이터에서 텍스트 추출
+        코퍼스 내보내기에서 모든 문서를 수집합니다.
+        Step 3-1: 페이지 단위로 문서 수신
+        Step 3-2: 페이지마다 키워드 추출 (원본 응답은 페이지 단위로만 유지)
         """
-        try:
-            # Step 3-1: Pinecone API 연결
-            import pinecone
-            import os
-            
-            api_key = os.getenv("PINECONE_API_KEY")
-            environment = os.getenv("PINECONE_ENVIRONMENT")
-            
-            if not api_key or not environment:
-                logger.warning("Pinecone API 키 또는 환경 설정이 없습니다.")
-                return []
-            
-            pinecone.init(api_key=api_key, environment=environment)
-            
-            # 인덱스 접근
-            index_name = 'swpre10'  # 벡터스토어 설정과 동일
-            if index_name not in pinecone.list_indexes():
-                logger.warning(f"Pinecone 인덱스 '{index_name}'를 찾을 수 없습니다.")
-                return []
-            
-            index = pinecone.Index(index_name)
-            
-            # Step 3-2: 모든 벡터를 가져오기 (빈 벡터로 쿼리)
-            query_response = index.query(
-                vector=[0.0] * 1024,  # 1024차원 벡터 (모든 차원을 0으로)
-                top_k=10000,  # 충분히 큰 수
-                include_metadata=True
-            )
-            
-            # Step 3-3: 메타데이터에서 텍스트 추출
-            documents = []
-            for match in query_response['matches']:
-                if 'metadata' in match and 'text' in match['metadata']:
-                    documents.append(match['metadata']['text'])
-            
-            logger.info(f"Pinecone에서 {len(documents)}개 문서를 가져왔습니다.")
-            return documents
-                
-        except Exception as e:
-            logger.error(f"벡터스토어에서 문서 가져오기 실패: {e}")
-            # 실패 시 벡터스토어에서 직접 가져오기 시도
-            try:
-                vectorstore = get_vectorstore()
-                if hasattr(vectorstore, 'similarity_search'):
-                    # 빈 쿼리로 검색하여 문서 구조 확인
-                    sample_docs = vectorstore.similarity_search("", k=100)
-                    documents = [doc.page_content for doc in sample_docs]
-                    logger.info(f"벡터스토어에서 {len(documents)}개 문서를 가져왔습니다.")
-                    return documents
-            except Exception as e2:
-                logger.error(f"벡터스토어 직접 접근도 실패: {e2}")
-            
-            return []
+        documents = []
+        metadatas = []
+        tokenized_docs = []
+        for page in exporter.iter_pages():
+            for doc in page:
+                documents.append(doc.page_content)
+                metadatas.append(doc.metadata)
+                tokenized_docs.append(self.tokenizer.extract_keywords(doc.page_content))  # 명사, 동사, 형용사 추출
+        logger.info(f"{exporter.source}에서 {len(documents)}개 문서를 가져왔습니다.")
+        return documents, metadatas, tokenized_docs
             
     # Step 4: 하이브리드 검색 메인 로직
     def search(self, query: str, top_k: int = 5, alpha: float = 0.6) -> List[Dict[str, Any]]:
@@ -124,18 +177,27 @@ class HybridSearchEngine:
         1. 벡터 검색 (의미적 검색)
         2. BM25 검색 (키워드 검색)
         3. 결과 결합 및 재순위화
+        요청 처리 중에 스냅샷이 교체되어도 시작할 때 잡은 스냅샷으로 끝까지 검색합니다.
         """
+        snapshot = self._snapshot
         try:
-            # 벡터 검색 (밀집 표현) - 의미적 유사도
-            vector_results = self._vector_search(query, top_k * 2)
-            
-            # BM25 검색 (희소 표현) - 키워드 매칭
-            bm25_results = self._bm25_search(query, top_k * 2)
-            
-            # 결과 결합 및 재순위화
-            combined_results = self._combine_results(
-                vector_results, bm25_results, alpha, top_k
-            )
+            with start_span('hybrid_search', top_k=top_k, alpha=alpha, snapshot_version=snapshot.version) as span:
+                # 벡터 검색 (밀집 표현) - 의미적 유사도
+                with RETRIEVAL_STAGE_SECONDS.time(stage='vector_search'):
+                    vector_results = self._vector_search(query, top_k * 2)
+                
+                # BM25 검색 (희소 표현) - 키워드 매칭
+                with RETRIEVAL_STAGE_SECONDS.time(stage='bm25_search'), start_span('bm25_search'):
+                    bm25_results = self._bm25_search(query, top_k * 2, snapshot)
+                
+                # 결과 결합 및 재순위화
+                combined_results = self._combine_results(
+                    vector_results, bm25_results, alpha, top_k
+                )
+                RETRIEVAL_CANDIDATES.observe(len(vector_results), source='vector')
+                RETRIEVAL_CANDIDATES.observe(len(bm25_results), source='bm25')
+                span.set_attributes({'vector_candidates': len(vector_results), 'bm25_candidates': len(bm25_results),
+                                     'results': len(combined_results)})
             
             return combined_results
             
@@ -154,8 +216,7 @@ class HybridSearchEngine:
         """
         try:
             # 쿼리를 벡터로 변환하여 검색
-            retriever = self.vectorstore.as_retriever(search_kwargs={"k": top_k})
-            docs = retriever.invoke(query)
+            docs = search_documents(query, top_k, self.vectorstore)
             
             # 결과 포맷팅 및 점수 계산
             results = []
@@ -174,15 +235,17 @@ class HybridSearchEngine:
             return []
     
     # BM25 검색
-    def _bm25_search(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+    def _bm25_search(self, query: str, top_k: int,
+                     snapshot: Optional[SearchSnapshot] = None) -> List[Dict[str, Any]]:
         """
         BM25 검색을 수행합니다 (키워드 검색).
         1. 쿼리 토큰화
         2. BM25 점수 계산
         3. 상위 결과 선택
         """
+        snapshot = snapshot or self._snapshot
         try:
-            if self.bm25_index is None:
+            if snapshot.bm25_index is None:
                 return []
             
             # 한국어 토크나이저를 사용하여 쿼리 토큰화
@@ -192,7 +255,7 @@ class HybridSearchEngine:
                 return []
             
             # BM25 점수 계산 (키워드 빈도 기반)
-            scores = self.bm25_index.get_scores(query_keywords)
+            scores = snapshot.bm25_index.get_scores(query_keywords)
             
             # 상위 결과 선택
             top_indices = np.argsort(scores)[::-1][:top_k]  # 점수 내림차순 정렬
@@ -201,8 +264,8 @@ class HybridSearchEngine:
             for idx in top_indices:
                 if scores[idx] > 0:  # 점수가 있는 결과만
                     results.append({
-                        'content': self.documents[idx],
-                        'metadata': {'title': self.documents[idx]},
+                        'content': snapshot.documents[idx],
+                        'metadata': dict(snapshot.metadatas[idx]),  # 스냅샷의 메타데이터는 수정하지 않도록 복사
                         'score': scores[idx],
                         'type': 'bm25'
                     })
@@ -289,4 +352,23 @@ def get_hybrid_search_engine():
     global _hybrid_search_engine
     if _hybrid_search_engine is None:
         _hybrid_search_engine = HybridSearchEngine()
-    return _hybrid_search_engine 
\ No newline at end of file
+    return _hybrid_search_engine
+
+def refresh_hybrid_search_engine() -> bool:
+    """
+    새 문서가 수집된 뒤 다음 검색 스냅샷(BM25 인덱스)을 만들어 교체합니다.
+    수집 작업 스레드에서 호출되며, 교체 전까지 요청은 기존 스냅샷으로 검색합니다.
+    아직 검색 엔진이 만들어지지 않았다면 첫 사용 시 구축되므로 아무것도 하지 않습니다.
+    """
+    if _hybrid_search_engine is not None:
+        return _hybrid_search_engine.rebuild()
+    return False
+
+def get_search_snapshot() -> Optional[SearchSnapshot]:
+    """
+    현재 검색 스냅샷을 반환합니다. (검색 엔진이 아직 없으면 None)
+    검색 결과를 캐시하는 쪽은 snapshot.version을 키에 포함해 교체 후 이전 결과를 쓰지 않도록 합니다.
+    """
+    if _hybrid_search_engine is not None:
+        return _hybrid_search_engine.snapshot
+    return None
@@ -0,0 +1,21 @@
+"""
+공지사항 수집 파이프라인 (크롤링 -> OCR -> 임베딩 -> upsert -> 인덱스 갱신)
+"""
+
+from core.ingestion.records import NoticeRecord, PipelineResult, StageResult
+from core.ingestion.stages import (
+    FLUSH, BacklogStage, CrawlStage, EmbedStage, IndexRefreshStage, OcrStage, Stage,
+    UpsertStage
+)
+from core.ingestion.pipeline import (
+    IngestionPipeline, StreamingPipeline, default_stages, get_ingestion_mode,
+    get_ingestion_pipeline, run_incremental_pipeline
+)
+
+__all__ = [
+    'NoticeRecord', 'PipelineResult', 'StageResult',
+    'FLUSH', 'Stage', 'CrawlStage', 'BacklogStage', 'OcrStage', 'EmbedStage', 'UpsertStage',
+    'IndexRefreshStage',
+    'IngestionPipeline', 'StreamingPipeline', 'default_stages', 'get_ingestion_mode',
+    'get_ingestion_pipeline', 'run_incremental_pipeline',
+]
@@ -0,0 +1,267 @@
+"""
+대량 업로드 (백필)
+MySQL에서 id 기준 keyset 페이지로 행을 읽고, 배치 단위로 임베딩한 뒤 벡터 DB upsert를 병렬로 요청
+중단되면 체크포인트(마지막으로 완료된 swpre.id)부터 이어서 진행
+"""
+
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Deque, Iterator, List, Optional, Set
+
+from core.ingestion.records import NoticeRecord
+from core.logger import logger
+from core.db import connect_db
+from core.notice_repository import mark_embedded
+from core.schema import EMPTY_CONTENT_SQL
+
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_UPSERT_WORKERS = 4
+DEFAULT_CHECKPOINT_EVERY = 10   # 체크포인트 저장 간격 (완료된 배치 수)
+
+
+def get_upload_checkpoint_path() -> str:
+    """대량 업로드 체크포인트 파일 경로를 반환합니다."""
+    return os.getenv('UPLOAD_CHECKPOINT_PATH', 'data/upload_checkpoint.json')
+
+
+class UploadCheckpoint:
+    """마지막으로 벡터 DB와 수집 상태까지 반영된 swpre.id를 파일에 보관합니다."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or get_upload_checkpoint_path()
+        self.last_id = 0
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "UploadCheckpoint":
+        checkpoint = cls(path)
+        try:
+            with open(checkpoint.path, encoding='utf-8') as f:
+                checkpoint.last_id = int(json.load(f).get('last_id', 0))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"업로드 체크포인트를 읽을 수 없어 처음부터 시작합니다 ({checkpoint.path}): {e}")
+        return checkpoint
+
+    def save(self):
+        """임시 파일에 쓴 뒤 교체하여 저장합니다."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'last_id': self.last_id}, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """업로드가 끝까지 완료되면 체크포인트를 삭제합니다."""
+        self.last_id = 0
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+@dataclass
+class BulkUploadResult:
+    """대량 업로드 결과"""
+    checked: int = 0        # 확인한 행 수
+    skipped: int = 0        # 본문 해시가 같고 벡터스토어에 있어 건너뛴 수
+    embedded: int = 0       # 임베딩한 수
+    uploaded: int = 0       # 벡터 DB에 반영한 수
+    errors: int = 0
+    resumed_from: int = 0   # 이어서 시작한 swpre.id
+    seconds: float = 0.0
+    embed_seconds: float = 0.0
+
+    @property
+    def docs_per_second(self) -> float:
+        return self.checked / self.seconds if self.seconds else 0.0
+
+    @property
+    def embedded_per_second(self) -> float:
+        return self.embedded / self.seconds if self.seconds else 0.0
+
+
+@dataclass
+class _Batch:
+    last_id: int
+    records: List[NoticeRecord] = field(default_factory=list)
+    future: Optional[Future] = None
+
+
+class BulkUploader:
+    """
+    대량 업로드
+    - 행은 id 기준 keyset 페이지(batch_size행)로 읽어 전체 테이블을 메모리에 올리지 않음
+      (페이지를 다 읽은 뒤 임베딩하므로 임베딩이 오래 걸려도 MySQL 결과 전송이 끊기지 않음)
+    - batch_size 단위로 임베딩, upsert는 upsert_workers개의 스레드에서 병렬 요청
+    - 진행 중인 upsert 배치 수를 제한하여 메모리 사용량을 일정하게 유지
+    - 완료된 배치가 앞에서부터 연속될 때만 체크포인트를 전진 (순서가 뒤바뀌어 끝난 배치는 기다림)
+    """
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE, upsert_workers: int = DEFAULT_UPSERT_WORKERS,
+                 checkpoint: Optional[UploadCheckpoint] = None, checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY,
+                 force: bool = False, embedding=None):
+        from core.vectorstore import get_vectorstore_backend
+        self.backend = get_vectorstore_backend()
+        self.batch_size = batch_size
+        # 로컬 벡터스토어는 한 프로세스 안의 행렬을 수정하므로 upsert를 순서대로 실행
+        self.upsert_workers = 1 if self.backend == 'local' else max(1, upsert_workers)
+        self.checkpoint = checkpoint or UploadCheckpoint.load()
+        self.checkpoint_every = max(1, checkpoint_every)
+        self.force = force
+        self.embedding = embedding
+        self.result = BulkUploadResult()
+        # 벡터스토어에 저장된 id (첫 배치에서 한 번만 조회)
+        self._stored_ids: Optional[Set[str]] = None
+
+    def _iter_records(self) -> Iterator[NoticeRecord]:
+        db = connect_db()
+        try:
+            last_id = self.checkpoint.last_id
+            while True:
+                with db.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT id, title, link, content, image, date, content_hash FROM swpre "
+                        f"WHERE id > %s AND NOT {EMPTY_CONTENT_SQL} ORDER BY id LIMIT %s",
+                        (last_id, self.batch_size)
+                    )
+                    rows = cursor.fetchall()
+                if not rows:
+                    break
+                for id, title, link, content, image, date, stored_hash in rows:
+                    yield NoticeRecord(id, title, link, content, image, date,
+                                       stored_hash=None if self.force else stored_hash)
+                last_id = rows[-1][0]
+        finally:
+            db.close()
+
+    def _iter_batches(self) -> Iterator[_Batch]:
+        batch: List[NoticeRecord] = []
+        for record in self._iter_records():
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                yield _Batch(batch[-1].id, batch)
+                batch = []
+        if batch:
+            yield _Batch(batch[-1].id, batch)
+
+    def _embed(self, batch: _Batch):
+        self.result.checked += len(batch.records)
+        if not self.force:
+            # 해시가 같아도 벡터스토어에 없는 id(스토어가 비었거나 삭제된 경우)는 다시 업로드
+            if self._stored_ids is None:
+                from core.vectorstore import list_stored_ids
+                self._stored_ids = list_stored_ids()
+            for record in batch.records:
+                if str(record.id) not in self._stored_ids:
+                    record.stored_hash = None
+        changed = [record for record in batch.records if not record.is_unchanged]
+        self.result.skipped += len(batch.records) - len(changed)
+        batch.records = changed
+        if not changed:
+            return
+        start = time.perf_counter()
+        vectors = self.embedding.embed_documents([record.to_text() for record in changed])
+        self.result.embed_seconds += time.perf_counter() - start
+        for record, vector in zip(changed, vectors):
+            record.vector = vector
+        self.result.embedded += len(changed)
+
+    @staticmethod
+    def _upsert(records: List[NoticeRecord]):
+        from core.vectorstore import upsert_embeddings
+        if records:
+            upsert_embeddings(
+                ids=[str(record.id) for record in records],
+                texts=[record.to_text() for record in records],
+                embeddings=[record.vector for record in records],
+                metadatas=[record.to_metadata() for record in records],
+                save=False
+            )
+
+    def _commit(self, batches: List[_Batch]):
+        """완료된 배치를 로컬 저장 -> 수집 상태 기록 -> 체크포인트 순서로 확정합니다."""
+        if not batches:
+            return
+        if self.backend == 'local':
+            from core.vectorstore import get_vectorstore
+            get_vectorstore().save()
+        rows = [
+            (record.id, str(record.id), record.text_hash)
+            for batch in batches for record in batch.records
+        ]
+        db = connect_db()
+        try:
+            with db.cursor() as cursor:
+                mark_embedded(cursor, rows)
+            db.commit()
+        finally:
+            db.close()
+        self.checkpoint.last_id = batches[-1].last_id
+        self.checkpoint.save()
+
+    def run(self) -> BulkUploadResult:
+        if self.embedding is None:
+            from core.embedding import get_embedding
+            self.embedding = get_embedding()
+
+        self.result.resumed_from = self.checkpoint.last_id
+        if self.checkpoint.last_id:
+            logger.info(f"체크포인트 swpre.id > {self.checkpoint.last_id} 부터 이어서 업로드합니다.")
+
+        start = time.perf_counter()
+        in_flight: Deque[_Batch] = deque()
+        done: List[_Batch] = []
+        failed = False
+
+        def settle(block: bool):
+            # 앞에서부터 완료된 배치를 꺼내 확정 대상으로 이동 (실패한 배치 이후로는 체크포인트를 전진하지 않음)
+            nonlocal failed
+            if block and in_flight:
+                wait([batch.future for batch in in_flight], return_when=FIRST_COMPLETED)
+            while in_flight and in_flight[0].future.done():
+                batch = in_flight.popleft()
+                try:
+                    batch.future.result()
+                    self.result.uploaded += len(batch.records)
+                    if not failed:
+                        done.append(batch)
+                except Exception as e:
+                    failed = True
+                    self.result.errors += len(batch.records)
+                    logger.error(f"벡터 DB upsert 오류 (swpre.id <= {batch.last_id}): {e}")
+            if len(done) >= self.checkpoint_every:
+                self._commit(done)
+                done.clear()
+
+        with ThreadPoolExecutor(max_workers=self.upsert_workers, thread_name_prefix="bulk-upsert") as executor:
+            for batch in self._iter_batches():
+                try:
+                    self._embed(batch)
+                except Exception as e:
+                    failed = True
+                    self.result.errors += len(batch.records)
+                    logger.error(f"임베딩 오류 (swpre.id <= {batch.last_id}): {e}")
+                    break
+                batch.future = executor.submit(self._upsert, batch.records)
+                in_flight.append(batch)
+                # 진행 중인 배치가 작업자 수의 2배를 넘으면 하나가 끝날 때까지 대기 (backpressure)
+                while len(in_flight) >= self.upsert_workers * 2:
+                    settle(block=True)
+                settle(block=False)
+                if failed:
+                    break
+            while in_flight:
+                settle(block=True)
+        self._commit(done)
+
+        self.result.seconds = time.perf_counter() - start
+        if not failed:
+            self.checkpoint.clear()
+        return self.result
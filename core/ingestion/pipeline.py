@@ -0,0 +1,203 @@
+"""
+단일 프로세스 수집 파이프라인
+단계들을 연결해 레코드를 스트리밍 방식으로 처리하고 단계별 결과를 구조화해 반환
+- batch: 단계들을 제너레이터로 연결해 한 스레드에서 실행
+- streaming: 단계마다 스레드를 두고 크기 제한 큐로 연결해 단계들이 동시에 진행
+  (큐가 가득 차면 앞 단계가 대기하는 backpressure, 새 공지사항은 준비되는 즉시 다음 단계로 전달)
+"""
+
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional
+
+from core.ingestion.records import NoticeRecord, PipelineResult
+from core.ingestion.stages import (
+    FLUSH, BacklogStage, CrawlStage, EmbedStage, IndexRefreshStage, OcrStage, Stage,
+    UpsertStage
+)
+from core.logger import logger
+from core.metrics import INGESTION_RECORDS, INGESTION_RUNS, INGESTION_STAGE_SECONDS
+
+DEFAULT_QUEUE_SIZE = 16        # 단계 사이 큐 크기
+DEFAULT_FLUSH_INTERVAL = 1.0   # 입력이 이 시간(초) 동안 없으면 배치 단계가 모인 레코드를 처리
+
+# 큐에서 앞 단계의 종료를 알리는 표식
+_DONE = object()
+
+
+def get_ingestion_mode() -> str:
+    """수집 파이프라인 실행 방식을 반환합니다. ('batch' 또는 'streaming')"""
+    return os.getenv('INGESTION_MODE', 'batch').lower()
+
+
+def default_stages() -> List[Stage]:
+    """증분 업데이트 기본 단계: 크롤링 -> 남은 작업 -> OCR -> 임베딩 -> upsert -> 인덱스 갱신"""
+    return [CrawlStage(), BacklogStage(), OcrStage(), EmbedStage(), UpsertStage(), IndexRefreshStage()]
+
+
+class IngestionPipeline:
+    """단계 목록을 순서대로 연결해 한 번 실행합니다. (실행마다 새 인스턴스 사용)"""
+    mode = 'batch'
+
+    def __init__(self, stages: Optional[List[Stage]] = None):
+        self.stages = stages if stages is not None else default_stages()
+
+    @property
+    def crawl_stage(self) -> Optional[CrawlStage]:
+        return next((stage for stage in self.stages if isinstance(stage, CrawlStage)), None)
+
+    def progress(self) -> dict:
+        """실행 중인 단계별 처리 현황 (다른 스레드에서 조회)"""
+        return {'mode': self.mode, 'stages': [stage.result.to_dict() for stage in self.stages]}
+
+    def _connect(self) -> Iterator[NoticeRecord]:
+        stream = iter(())
+        for stage in self.stages:
+            stream = stage.stream(stream)
+        return stream
+
+    def run(self) -> PipelineResult:
+        result = PipelineResult(started_at=datetime.now(), mode=self.mode)
+        try:
+            for record in self._connect():
+                result.freshness.append((record.upserted_at or time.time()) - record.crawled_at)
+            result.success = not any(stage.fail_on_error and stage.result.errors for stage in self.stages)
+        except Exception as e:
+            result.error = str(e)
+            logger.error(f"수집 파이프라인 오류: {e}")
+        finally:
+            result.finished_at = datetime.now()
+            result.stages = [stage.result for stage in self.stages]
+
+        crawl = self.crawl_stage
+        if crawl is not None:
+            result.no_changes = crawl.no_changes
+            # 모든 단계가 성공했을 때만 이번 첫 페이지를 처리 완료로 기록 (실패 시 다음 실행에서 재시도)
+            if result.success and not crawl.no_changes and crawl.state is not None:
+                try:
+                    crawl.state.mark_pipeline_complete()
+                    crawl.state.save()
+                except Exception as e:
+                    logger.error(f"크롤링 상태 저장 오류: {e}")
+
+        for stage in result.stages:
+            logger.info(
+                f"[{stage.name}] 입력 {stage.input}, 출력 {stage.output}, 건너뜀 {stage.skipped}, "
+                f"오류 {stage.errors}, {stage.seconds:.2f}초"
+            )
+        _record_metrics(result)
+        freshness = result.freshness_summary()
+        if freshness['count']:
+            logger.info(f"[{self.mode}] 신선도 p50 {freshness['p50']}초, 최대 {freshness['max']}초 ({freshness['count']}건)")
+        return result
+
+
+def _record_metrics(result: PipelineResult):
+    """실행 결과를 /metrics 지표에 기록합니다."""
+    outcome = 'no_changes' if result.no_changes else 'success' if result.success else 'failure'
+    INGESTION_RUNS.inc(outcome=outcome)
+    INGESTION_STAGE_SECONDS.observe(result.seconds, stage='total')
+    for stage in result.stages:
+        INGESTION_STAGE_SECONDS.observe(stage.seconds, stage=stage.name)
+        for kind in ('input', 'output', 'skipped', 'errors'):
+            INGESTION_RECORDS.inc(getattr(stage, kind), stage=stage.name, kind=kind)
+
+
+class StreamingPipeline(IngestionPipeline):
+    """
+    단계마다 작업 스레드를 두고 크기 제한 큐로 연결합니다.
+    입력이 flush_interval 동안 끊기면 FLUSH 표식을 보내 임베딩/upsert 단계가 덜 찬 배치도 바로 처리합니다.
+    한 단계에서 예외가 나면 모든 단계가 멈추고 run()이 실패로 보고합니다.
+    """
+    mode = 'streaming'
+
+    def __init__(self, stages: Optional[List[Stage]] = None,
+                 queue_size: int = DEFAULT_QUEUE_SIZE, flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        super().__init__(stages)
+        self.queue_size = queue_size
+        self.flush_interval = flush_interval
+        self._stop = threading.Event()
+        self._errors: List[Exception] = []
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        # 큐가 가득 차면 다음 단계가 꺼낼 때까지 대기 (중단 시 포기)
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _iter_queue(self, q: queue.Queue) -> Iterator:
+        while True:
+            try:
+                item = q.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return
+                yield FLUSH
+                continue
+            if item is _DONE:
+                return
+            yield item
+
+    def _work(self, stage: Stage, upstream: Iterable, out: queue.Queue):
+        output = stage.stream(upstream)
+        try:
+            for record in output:
+                if not self._put(out, record):
+                    break
+        except Exception as e:
+            logger.error(f"[{stage.name}] 단계 오류: {e}")
+            self._errors.append(e)
+            self._stop.set()
+        finally:
+            output.close()
+            self._put(out, _DONE)
+
+    def _connect(self) -> Iterator[NoticeRecord]:
+        self._stop.clear()
+        self._errors = []
+        upstream: Iterable = iter(())
+        threads = []
+        for stage in self.stages:
+            out = queue.Queue(maxsize=self.queue_size)
+            thread = threading.Thread(
+                target=self._work, args=(stage, upstream, out),
+                name=f"ingestion-{stage.name}", daemon=True
+            )
+            threads.append(thread)
+            upstream = self._iter_queue(out)
+        for thread in threads:
+            thread.start()
+
+        try:
+            for record in upstream:
+                if record is not FLUSH:
+                    yield record
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+        if self._errors:
+            raise self._errors[0]
+
+
+def get_ingestion_pipeline(stages: Optional[List[Stage]] = None) -> IngestionPipeline:
+    """설정된 실행 방식(INGESTION_MODE)의 파이프라인을 만듭니다."""
+    if get_ingestion_mode() == 'streaming':
+        return StreamingPipeline(
+            stages,
+            queue_size=int(os.getenv('INGESTION_QUEUE_SIZE', str(DEFAULT_QUEUE_SIZE))),
+            flush_interval=float(os.getenv('INGESTION_FLUSH_INTERVAL', str(DEFAULT_FLUSH_INTERVAL)))
+        )
+    return IngestionPipeline(stages)
+
+
+def run_incremental_pipeline() -> PipelineResult:
+    """기본 단계로 증분 수집 파이프라인을 한 번 실행합니다."""
+    return get_ingestion_pipeline().run()
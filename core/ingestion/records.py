@@ -0,0 +1,130 @@
+"""
+수집 파이프라인 레코드 및 결과 타입
+"""
+
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import List, Optional
+
+from core.corpus_export import format_notice_content
+from core.crawl_state import content_hash
+
+# 본문이 없는 것으로 취급하는 값 (크롤링 실패/본문 없음)
+EMPTY_CONTENTS = (None, '', 'No content found')
+
+
+@dataclass
+class NoticeRecord:
+    """파이프라인 단계 사이를 흐르는 공지사항 한 건"""
+    id: Optional[int]
+    title: str
+    link: str
+    content: Optional[str]
+    image_url: Optional[str]
+    pub_date: object                      # RSS 문자열 또는 DB datetime
+    vector: Optional[List[float]] = None
+    crawled_at: float = field(default_factory=time.time)
+    upserted_at: Optional[float] = None   # 벡터 DB에 반영된 시각 (신선도 측정)
+    stored_hash: Optional[str] = None     # 벡터와 함께 저장된 본문 해시 (같으면 임베딩 생략)
+    image_urls: List[str] = field(default_factory=list)  # 본문의 모든 이미지 URL (image_url은 첫 번째)
+
+    @property
+    def images(self) -> List[str]:
+        """OCR할 이미지 URL 목록 (images 컬럼이 없던 행은 image_url 하나)"""
+        if self.image_urls:
+            return self.image_urls
+        return [self.image_url] if self.image_url else []
+
+    @property
+    def has_content(self) -> bool:
+        return self.content not in EMPTY_CONTENTS
+
+    @property
+    def published_at(self) -> datetime:
+        # RSS 날짜 형식 (예: "2025-01-20 15:30:00.0")과 DB datetime 모두 처리
+        return datetime.strptime(str(self.pub_date).split('.')[0], "%Y-%m-%d %H:%M:%S")
+
+    def to_text(self) -> str:
+        """벡터 DB에 저장할 문서 본문"""
+        return format_notice_content(self.title, self.link, self.content)
+
+    @property
+    def text_hash(self) -> str:
+        """벡터 DB에 저장할 문서 본문의 SHA-256 해시"""
+        return content_hash(self.to_text())
+
+    @property
+    def is_unchanged(self) -> bool:
+        """저장된 해시와 본문 해시가 같아 다시 임베딩할 필요가 없는지 여부"""
+        return self.stored_hash is not None and self.stored_hash == self.text_hash
+
+    def to_metadata(self) -> dict:
+        """벡터 DB에 저장할 메타데이터 (게시일은 자정 기준 UNIX 타임스탬프)"""
+        day = self.published_at.replace(hour=0, minute=0, second=0, microsecond=0)
+        return {
+            'title': self.title,
+            'link': self.link,
+            'expiry_date': int(time.mktime(day.timetuple())),
+            'content_hash': self.text_hash
+        }
+
+
+@dataclass
+class StageResult:
+    """단계별 처리 결과"""
+    name: str
+    input: int = 0          # 받은 레코드 수
+    output: int = 0         # 다음 단계로 넘긴 레코드 수
+    skipped: int = 0        # 처리 대상이 아니어서 건너뛴 수
+    errors: int = 0         # 오류 수
+    seconds: float = 0.0    # 단계 자체에서 사용한 시간 (앞 단계 대기 시간 제외)
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), 'seconds': round(self.seconds, 3)}
+
+
+@dataclass
+class PipelineResult:
+    """파이프라인 전체 실행 결과"""
+    stages: List[StageResult] = field(default_factory=list)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    success: bool = False
+    no_changes: bool = False
+    error: Optional[str] = None
+    mode: str = 'batch'
+    # 레코드별 신선도: 크롤링에서 본문을 가져온 뒤 벡터 DB에 반영되기까지 걸린 시간 (초)
+    freshness: List[float] = field(default_factory=list)
+
+    @property
+    def seconds(self) -> float:
+        if self.started_at and self.finished_at:
+            return (self.finished_at - self.started_at).total_seconds()
+        return 0.0
+
+    def stage(self, name: str) -> Optional[StageResult]:
+        return next((stage for stage in self.stages if stage.name == name), None)
+
+    def freshness_summary(self) -> dict:
+        if not self.freshness:
+            return {'count': 0, 'p50': None, 'max': None}
+        values = sorted(self.freshness)
+        return {
+            'count': len(values),
+            'p50': round(values[len(values) // 2], 3),
+            'max': round(values[-1], 3)
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            'mode': self.mode,
+            'success': self.success,
+            'no_changes': self.no_changes,
+            'error': self.error,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'seconds': round(self.seconds, 3),
+            'freshness': self.freshness_summary(),
+            'stages': [stage.to_dict() for stage in self.stages]
+        }
@@ -0,0 +1,494 @@
+"""
+수집 파이프라인 단계
+크롤링 -> 남은 작업(수집 상태 기준) -> OCR -> 임베딩 -> 벡터 DB upsert -> 검색 인덱스 갱신
+각 단계는 NoticeRecord 스트림을 받아 다음 단계로 넘기는 제너레이터입니다.
+"""
+
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, List, Optional
+
+from core.crawl_state import CrawlState, content_hash
+from core.crawler import get_crawler
+from core.db import connect_db
+from core.ingestion.records import NoticeRecord, StageResult
+from core.logger import logger
+from core.notice_repository import (
+    find_existing_links, find_notice_ids, find_pending_embed, find_pending_ocr,
+    mark_embedded, mark_ocr_results, parse_images, upsert_notices
+)
+from core.schema import ensure_schema
+
+# 확인할 최근 RSS 페이지 수
+DEFAULT_MAX_PAGES = 19
+
+# 스트리밍 모드에서 입력이 잠시 끊겼을 때 전달되는 표식 (배치 단계는 모인 레코드를 바로 처리)
+FLUSH = object()
+
+
+class Stage:
+    """
+    파이프라인 단계의 기본 클래스
+    - run(records): 레코드 스트림을 받아 처리한 레코드를 yield
+    - stream(upstream): run을 감싸 입력/출력 수와 단계 자체 처리 시간을 기록
+    """
+    name = 'stage'
+    # True이면 이 단계의 오류가 있을 때 파이프라인 실행을 실패로 처리
+    fail_on_error = False
+    # True이면 FLUSH 표식을 run()까지 전달 (배치로 모아 처리하는 단계)
+    accepts_flush = False
+
+    def __init__(self):
+        self.result = StageResult(self.name)
+        self._upstream_seconds = 0.0
+
+    def run(self, records: Iterator[NoticeRecord]) -> Iterator[NoticeRecord]:
+        raise NotImplementedError
+
+    def stream(self, upstream: Iterable[NoticeRecord]) -> Iterator[NoticeRecord]:
+        output = self.run(self._count_input(upstream))
+        try:
+            while True:
+                start = time.perf_counter()
+                waited = self._upstream_seconds
+                try:
+                    record = next(output)
+                except StopIteration:
+                    return
+                finally:
+                    # 앞 단계를 기다린 시간은 제외
+                    self.result.seconds += time.perf_counter() - start - (self._upstream_seconds - waited)
+                self.result.output += 1
+                yield record
+        finally:
+            output.close()
+
+    def _count_input(self, upstream: Iterable[NoticeRecord]) -> Iterator[NoticeRecord]:
+        upstream = iter(upstream)
+        while True:
+            start = time.perf_counter()
+            try:
+                record = next(upstream)
+            except StopIteration:
+                return
+            finally:
+                self._upstream_seconds += time.perf_counter() - start
+            if record is FLUSH:
+                if self.accepts_flush:
+                    yield record
+                continue
+            self.result.input += 1
+            yield record
+
+
+def get_latest_update_time(cursor) -> datetime:
+    """데이터베이스에서 가장 최근 공지사항 게시 시간을 가져옵니다."""
+    try:
+        cursor.execute("SELECT MAX(date) FROM swpre")
+        result = cursor.fetchone()
+        if result and result[0]:
+            return result[0]
+    except Exception as e:
+        logger.error(f"최근 업데이트 시간 조회 오류: {e}")
+    # 데이터가 없으면 7일 전으로 설정
+    return datetime.now() - timedelta(days=7)
+
+
+class CrawlStage(Stage):
+    """
+    새 학사 공지사항을 크롤링해 MySQL에 저장하고, 저장된 레코드를 (DB id 포함) 내보냅니다.
+    첫 RSS 페이지가 지난 파이프라인 실행과 같으면 no_changes를 설정하고 아무것도 내보내지 않습니다.
+    """
+    name = 'crawl'
+
+    def __init__(self, max_pages: int = DEFAULT_MAX_PAGES, state: Optional[CrawlState] = None):
+        super().__init__()
+        self.max_pages = max_pages
+        self.state = state
+        self.no_changes = False
+        self.latest_update_time: Optional[datetime] = None
+
+    def run(self, records):
+        db = connect_db()
+        try:
+            # 테이블이 없으면 생성하고, 링크 해시 컬럼/UNIQUE 인덱스 마이그레이션 적용
+            ensure_schema(db)
+            with db.cursor() as cursor:
+                self.latest_update_time = get_latest_update_time(cursor)
+            logger.info(f"최근 업데이트 시간: {self.latest_update_time} 이후의 공지사항만 크롤링합니다.")
+
+            if self.state is None:
+                self.state = CrawlState.load()
+            with get_crawler(state=self.state) as crawler:
+                yield from self._crawl(db, crawler)
+        finally:
+            db.close()
+            if self.state is not None:
+                try:
+                    self.state.save()
+                except Exception as e:
+                    logger.error(f"크롤링 상태 저장 오류: {e}")
+
+    def _is_new(self, article) -> bool:
+        try:
+            # RSS 날짜 형식 파싱 (예: "2025-01-20 15:30:00.0")
+            pub_date = datetime.strptime(article.pub_date.split('.')[0], "%Y-%m-%d %H:%M:%S")
+            return pub_date > self.latest_update_time
+        except Exception as e:
+            logger.warning(f"날짜 파싱 오류 ({article.pub_date}): {e}")
+            return False
+
+    def _crawl(self, db, crawler) -> Iterator[NoticeRecord]:
+        consecutive_old_pages = 0  # 연속으로 오래된 페이지가 나온 횟수
+
+        for page in crawler.iter_rss_pages(range(1, self.max_pages + 1), conditional=True):
+            page_number, articles = page.page_number, page.items
+            if articles is None:
+                logger.error(f"페이지 {page_number} 로딩 오류")
+                self.result.errors += 1
+                continue
+
+            # 첫 페이지 항목이 지난 파이프라인 실행과 같으면 전체 크롤링 생략
+            if page_number == 1:
+                self.state.latest_first_page = page.items_hash
+                if self.state.is_first_page_processed(page.items_hash):
+                    logger.info("첫 페이지 공지사항 목록이 지난 실행과 같습니다. 크롤링을 건너뜁니다.")
+                    self.no_changes = True
+                    return
+
+            # 변경 없는 페이지(304)에는 새 공지사항이 없음
+            if page.not_modified:
+                consecutive_old_pages += 1
+                if consecutive_old_pages >= 5:
+                    logger.info(f"연속 {consecutive_old_pages}페이지에 새로운 공지사항이 없어서 크롤링을 중단합니다.")
+                    return
+                continue
+
+            if not articles:
+                crawler.commit_state([page.url])
+                consecutive_old_pages += 1
+                if consecutive_old_pages >= 3:
+                    logger.info(f"연속 {consecutive_old_pages}번 빈 페이지가 나와서 크롤링을 중단합니다.")
+                    return
+                continue
+
+            # 2025년의 새로운 학사 공지사항만 선별
+            candidates = [
+                article for article in articles
+                if article.category == "학사" and '2025' in article.pub_date and self._is_new(article)
+            ]
+
+            # 중복 체크: 페이지당 한 번의 link_hash IN (...) 조회, 이미 저장된 링크는 상세 페이지를 가져오지 않음
+            with db.cursor() as cursor:
+                existing_links = find_existing_links(cursor, [article.link for article in candidates])
+            self.result.skipped += len(existing_links)
+            candidates = [article for article in candidates if article.link not in existing_links]
+
+            page_records = [
+                NoticeRecord(None, article.title, article.link, content, image_urls[0] if image_urls else None,
+                             article.pub_date, image_urls=image_urls)
+                for article, content, image_urls in crawler.iter_details(candidates)
+            ]
+
+            # 데이터베이스에 페이지 단위로 일괄 저장 후 id를 채워 다음 단계로 전달
+            # 저장에 성공한 페이지만 검증자를 기록 (실패하면 다음 실행에서 304 없이 다시 가져옴)
+            saved = []
+            committed = not page_records
+            if page_records:
+                try:
+                    with db.cursor() as cursor:
+                        upsert_notices(cursor, [
+                            (r.title, r.link, r.content, r.image_urls, r.pub_date) for r in page_records
+                        ])
+                        ids = find_notice_ids(cursor, [r.link for r in page_records])
+                    db.commit()
+                    for record in page_records:
+                        record.id = ids.get(record.link)
+                    saved = page_records
+                    committed = True
+                except Exception as e:
+                    db.rollback()
+                    self.result.errors += len(page_records)
+                    logger.error(f"데이터베이스 저장 오류 (페이지 {page_number}): {e}")
+            if committed:
+                crawler.commit_state([page.url] + [article.link for article in candidates])
+
+            for record in saved:
+                logger.info(f"새 공지사항 저장: {record.title} ({record.link})")
+                yield record
+
+            # 연속 5페이지에 새로운 공지사항이 없으면 중단
+            consecutive_old_pages = 0 if saved else consecutive_old_pages + 1
+            if consecutive_old_pages >= 5:
+                logger.info(f"연속 {consecutive_old_pages}페이지에 새로운 공지사항이 없어서 크롤링을 중단합니다.")
+                return
+
+
+def get_ocr_max_attempts() -> int:
+    """OCR 실패 행을 다시 시도하는 최대 횟수"""
+    return int(os.getenv('OCR_MAX_ATTEMPTS', '3'))
+
+
+class BacklogStage(Stage):
+    """
+    앞 단계의 레코드를 그대로 넘긴 뒤, 수집 상태로 남은 작업을 DB에서 골라 이어서 내보냅니다.
+    - OCR 대기/실패(재시도 한도 내) 행
+    - 본문은 있지만 벡터 DB에 아직 반영되지 않은 행 (embedded_at IS NULL)
+    이전 실행에서 실패한 행만 다시 처리되고, 전체 테이블을 다시 업로드하지 않습니다.
+    """
+    name = 'backlog'
+
+    def __init__(self, max_ocr_attempts: Optional[int] = None):
+        super().__init__()
+        self.max_ocr_attempts = max_ocr_attempts if max_ocr_attempts is not None else get_ocr_max_attempts()
+
+    def run(self, records):
+        seen = set()
+        for record in records:
+            seen.add(record.id)
+            yield record
+
+        db = connect_db()
+        try:
+            with db.cursor() as cursor:
+                rows = find_pending_ocr(cursor, self.max_ocr_attempts) + find_pending_embed(cursor)
+        finally:
+            db.close()
+
+        for id, title, link, content, image, date, images in rows:
+            if id in seen:
+                self.result.skipped += 1
+                continue
+            seen.add(id)
+            yield NoticeRecord(id, title, link, content, image, date, image_urls=parse_images(images, image))
+
+
+class OcrStage(Stage):
+    """
+    본문이 없고 이미지가 있는 공지사항을 OCR 처리해 본문을 채우고 DB에 반영합니다.
+    OCR 대상은 batch_size개(또는 스트리밍 모드의 FLUSH)까지 모아 OcrPool로 동시에 처리하고,
+    결과는 ocr_status(done/failed)로 배치마다 한 번에 기록합니다.
+    공지사항의 모든 이미지를 인식해 이미지 순서대로 이어 붙이고, 긴 이미지는 타일로 나눠 인식합니다.
+    """
+    name = 'ocr'
+    accepts_flush = True
+
+    def __init__(self, batch_size: int = 16):
+        super().__init__()
+        self.batch_size = batch_size
+        self.pool = None
+        self._unavailable = False
+        # 추출한 글자 수와 그중 두 번째 이후 이미지에서 늘어난 글자 수
+        self.chars = 0
+        self.extra_chars = 0
+
+    def run(self, records):
+        batch: List[NoticeRecord] = []
+        try:
+            for record in records:
+                if record is FLUSH:
+                    if batch:
+                        yield from self._process(batch)
+                        batch = []
+                    continue
+                if not record.images or record.has_content:
+                    self.result.skipped += 1
+                    yield record
+                    continue
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    yield from self._process(batch)
+                    batch = []
+            if batch:
+                yield from self._process(batch)
+            if self.chars:
+                logger.info(f"OCR 추출 {self.chars}자 (첫 번째 이미지 외 추가 이미지에서 +{self.extra_chars}자)")
+        finally:
+            if self.pool is not None:
+                self.pool.close()
+                self.pool = None
+
+    def _get_pool(self):
+        if self.pool is None and not self._unavailable:
+            from core.ocr import OcrUnavailableError
+            from core.ocr.pool import OcrPool
+            try:
+                self.pool = OcrPool()
+            except OcrUnavailableError as e:
+                logger.warning(f"OCR 백엔드를 사용할 수 없어 OCR 단계를 건너뜁니다: {e}")
+                self._unavailable = True
+        return self.pool
+
+    def _process(self, batch: List[NoticeRecord]) -> Iterator[NoticeRecord]:
+        pool = self._get_pool()
+        if pool is None:
+            # OCR 백엔드가 없으면 pending 상태로 남겨 다음 실행에서 처리
+            self.result.skipped += len(batch)
+            yield from batch
+            return
+
+        by_id = {record.id: record for record in batch}
+        done, failed = [], []
+        for result in pool.map_notices((record.id, record.images) for record in batch):
+            if result.ok:
+                by_id[result.key].content = result.text
+                done.append((result.key, result.text))
+                self.chars += result.chars
+                self.extra_chars += result.chars - result.first_image_chars
+                logger.info(
+                    f"OCR 처리 완료 (ID {result.key}, 이미지 {len(result.images)}장/타일 {result.tiles}개, "
+                    f"{result.ocr_seconds:.2f}초, {result.chars}자): {result.text[:100]}"
+                )
+                if result.error:
+                    logger.warning(f"일부 이미지 OCR 실패 (ID {result.key}): {result.error}")
+            else:
+                # 실패로 기록해 재시도 한도(ocr_attempts)까지 다음 실행에서 다시 처리
+                failed.append(result.key)
+                self.result.errors += 1
+                logger.error(f"OCR 처리 오류 (ID {result.key}): {result.error}")
+
+        try:
+            db = connect_db()
+            try:
+                with db.cursor() as cursor:
+                    mark_ocr_results(cursor, done, failed)
+                db.commit()
+            finally:
+                db.close()
+        except Exception as e:
+            # 기록하지 못한 공지사항은 pending 상태로 남아 다음 실행에서 다시 처리되므로 다음 단계로 넘기지 않음
+            self.result.errors += len(done)
+            logger.error(f"OCR 결과 기록 오류 ({len(done) + len(failed)}건): {e}")
+            unsaved = {notice_id for notice_id, _ in done}
+            yield from (record for record in batch if record.id not in unsaved)
+            return
+        yield from batch
+
+
+class EmbedStage(Stage):
+    """
+    본문이 있는 레코드를 배치로 임베딩합니다.
+    본문 해시가 저장된 해시(stored_hash)와 같으면 건너뜁니다.
+    서버에서 이미 로드된 임베딩 모델(get_embedding)을 그대로 재사용합니다.
+    """
+    name = 'embed'
+    fail_on_error = True
+    accepts_flush = True
+
+    def __init__(self, batch_size: int = 32, embedding=None):
+        super().__init__()
+        self.batch_size = batch_size
+        self.embedding = embedding
+
+    def run(self, records):
+        if self.embedding is None:
+            from core.embedding import get_embedding
+            self.embedding = get_embedding()
+
+        batch: List[NoticeRecord] = []
+        for record in records:
+            if record is FLUSH:
+                if batch:
+                    yield from self._embed(batch)
+                    batch = []
+                continue
+            # 본문이 없거나 저장된 해시와 같은(변경 없는) 공지사항은 임베딩하지 않음
+            if not record.has_content or record.is_unchanged:
+                self.result.skipped += 1
+                continue
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                yield from self._embed(batch)
+                batch = []
+        if batch:
+            yield from self._embed(batch)
+
+    def _embed(self, batch: List[NoticeRecord]) -> Iterator[NoticeRecord]:
+        try:
+            vectors = self.embedding.embed_documents([record.to_text() for record in batch])
+        except Exception as e:
+            self.result.errors += len(batch)
+            logger.error(f"임베딩 오류 ({len(batch)}건): {e}")
+            return
+        for record, vector in zip(batch, vectors):
+            record.vector = vector
+            yield record
+
+
+class UpsertStage(Stage):
+    """
+    임베딩된 레코드를 swpre.id를 벡터 id로 하여 벡터 DB에 배치 upsert합니다.
+    upsert가 끝난 행은 embedded_at을 기록해 다시 처리되지 않습니다.
+    """
+    name = 'upsert'
+    fail_on_error = True
+    accepts_flush = True
+
+    def __init__(self, batch_size: int = 100):
+        super().__init__()
+        self.batch_size = batch_size
+
+    def run(self, records):
+        batch: List[NoticeRecord] = []
+        for record in records:
+            if record is FLUSH:
+                if batch:
+                    yield from self._upsert(batch)
+                    batch = []
+                continue
+            if record.vector is None:
+                self.result.skipped += 1
+                continue
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                yield from self._upsert(batch)
+                batch = []
+        if batch:
+            yield from self._upsert(batch)
+
+    def _upsert(self, batch: List[NoticeRecord]) -> Iterator[NoticeRecord]:
+        from core.vectorstore import upsert_embeddings
+        texts = [record.to_text() for record in batch]
+        hashes = [content_hash(text) for text in texts]
+        try:
+            upsert_embeddings(
+                ids=[str(record.id) for record in batch],
+                texts=texts,
+                embeddings=[record.vector for record in batch],
+                metadatas=[record.to_metadata() for record in batch]
+            )
+            # 반영 결과를 행별 상태(embedded_at, vector_id, content_hash)로 기록
+            db = connect_db()
+            try:
+                with db.cursor() as cursor:
+                    mark_embedded(cursor, [
+                        (record.id, str(record.id), text_hash) for record, text_hash in zip(batch, hashes)
+                    ])
+                db.commit()
+            finally:
+                db.close()
+        except Exception as e:
+            self.result.errors += len(batch)
+            logger.error(f"벡터 DB upsert 오류 ({len(batch)}건): {e}")
+            return
+        upserted_at = time.time()
+        for record in batch:
+            record.upserted_at = upserted_at
+            yield record
+
+
+class IndexRefreshStage(Stage):
+    """모든 upsert가 끝난 뒤 새 문서가 있으면 BM25 인덱스를 한 번 다시 구축합니다."""
+    name = 'index_refresh'
+
+    def run(self, records):
+        records = list(records)
+        if records:
+            from core.hybrid_search import refresh_hybrid_search_engine
+            try:
+                refresh_hybrid_search_engine()
+            except Exception as e:
+                self.result.errors += 1
+                logger.error(f"검색 인덱스 갱신 오류: {e}")
+        yield from records
@@ -3,6 +3,8 @@ import re
 from typing import List
 from functools import lru_cache
 import time
+from core.metrics import CACHE_REQUESTS
+from core.tracing import start_span
 
 class KoreanTokenizer:
     """
@@ -68,10 +70,14 @@ class KoreanTokenizer:
         Step 3-2: 각 텍스트에 대해 키워드 추출
         """
         results = []
-        # Step 3-1: 텍스트 리스트 순회
-        for text in texts:
-            # Step 3-2: 각 텍스트에 대해 키워드 추출
-            results.append(self.extract_keywords(text))
+        with start_span('tokenizer.extract_keywords_batch', texts=len(texts)) as span:
+            misses = KoreanTokenizer.extract_keywords.cache_info().misses
+            # Step 3-1: 텍스트 리스트 순회
+            for text in texts:
+                # Step 3-2: 각 텍스트에 대해 키워드 추출
+                results.append(self.extract_keywords(text))
+            # 캐시에 없어 실제로 형태소 분석한 텍스트 수 (다른 스레드의 호출이 섞이면 근사값)
+            span.set_attribute('analyzed', KoreanTokenizer.extract_keywords.cache_info().misses - misses)
         return results
     
     # Step 4: 쿼리 정규화
@@ -136,6 +142,12 @@ class KoreanTokenizer:
         
         return final_score
 
+# 키워드 추출 캐시(lru_cache)의 적중/실패 수를 /metrics에 노출
+CACHE_REQUESTS.set_function(lambda: KoreanTokenizer.extract_keywords.cache_info().hits,
+                            cache='tokenizer_keywords', result='hit')
+CACHE_REQUESTS.set_function(lambda: KoreanTokenizer.extract_keywords.cache_info().misses,
+                            cache='tokenizer_keywords', result='miss')
+
 # Step 6: 전역 인스턴스 관리
 _tokenizer = None
 
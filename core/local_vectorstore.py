@@ -0,0 +1,241 @@
+"""
+로컬 인메모리 벡터스토어
+Pinecone 대신 프로세스 내부에서 NumPy 행렬곱으로 top-k 검색을 수행
+"""
+
+import json
+import os
+import threading
+import uuid
+from typing import Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from core.logger import logger
+
+VECTORS_FILE = "vectors.npy"
+DOCS_FILE = "docs.jsonl"
+
+
+class LocalVectorStore(VectorStore):
+    """
+    로컬 벡터스토어: 정규화된 임베딩 행렬 + 문서 목록
+    - 벡터는 vectors.npy (float32 또는 float16)로 저장
+    - 문서 내용과 메타데이터는 docs.jsonl로 저장
+    - 검색은 행렬곱(코사인 유사도) + argpartition으로 top-k 선택
+    - 추가/삭제는 새 행렬과 문서 목록을 만든 뒤 잠금 안에서 한 번에 교체하므로,
+      검색과 저장은 언제나 행 수가 맞는 (행렬, 문서 목록) 쌍을 봄
+    """
+
+    # Step 1: 초기화
+    def __init__(self, embedding: Embeddings, path: Optional[str] = None, dtype: str = "float32"):
+        """
+        로컬 벡터스토어 초기화
+        1. 임베딩 모델 설정
+        2. 저장 경로 및 저장 dtype 설정
+        3. 빈 행렬과 문서 목록 생성
+        """
+        self.embedding = embedding
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self._vectors = None          # (문서 수, 차원) 행렬
+        self._docs = []               # {'id', 'page_content', 'metadata'} 목록
+        self._id_to_row = {}          # 문서 id -> 행 번호
+        self._lock = threading.Lock()  # 위 세 값을 함께 교체/조회
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding
+
+    def __len__(self):
+        return len(self._docs)
+
+    # Step 2: 문서 추가 (같은 id는 덮어쓰기)
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None,
+                  ids: Optional[List[str]] = None, **kwargs: Any) -> List[str]:
+        """텍스트를 임베딩하여 추가합니다."""
+        texts = list(texts)
+        if not texts:
+            return []
+        return self.add_embeddings(texts, self.embedding.embed_documents(texts), metadatas=metadatas, ids=ids)
+
+    def add_embeddings(self, texts: List[str], embeddings: List[List[float]], metadatas: Optional[List[dict]] = None,
+                       ids: Optional[List[str]] = None) -> List[str]:
+        """
+        이미 계산된 임베딩으로 문서를 추가합니다. (수집 파이프라인에서 임베딩을 재사용)
+        기존 id는 해당 행을 교체하고, 새 id는 행을 추가합니다.
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        ids = [str(i) if i is not None else None for i in ids] if ids else [None] * len(texts)
+        ids = [i or str(uuid.uuid4()) for i in ids]
+
+        vectors = self._normalize(np.asarray(embeddings, dtype=np.float32))
+
+        with self._lock:
+            # 메모리 맵 행렬은 읽기 전용이고 검색 중인 행렬을 바꾸지 않도록 복사본을 수정
+            if self._vectors is None:
+                current = np.empty((0, vectors.shape[1]), dtype=np.float32)
+            else:
+                current = np.array(self._vectors, dtype=np.float32)
+            docs = list(self._docs)
+            id_to_row = dict(self._id_to_row)
+
+            new_rows = []
+            for text, metadata, doc_id, vector in zip(texts, metadatas, ids, vectors):
+                entry = {'id': doc_id, 'page_content': text, 'metadata': dict(metadata)}
+                row = id_to_row.get(doc_id)
+                if row is not None:
+                    current[row] = vector
+                    docs[row] = entry
+                else:
+                    id_to_row[doc_id] = len(docs)
+                    docs.append(entry)
+                    new_rows.append(vector)
+
+            if new_rows:
+                current = np.vstack([current, np.asarray(new_rows, dtype=np.float32)])
+            self._vectors, self._docs, self._id_to_row = current, docs, id_to_row
+        return ids
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        """지정한 id의 문서를 삭제합니다."""
+        if not ids:
+            return False
+        with self._lock:
+            if self._vectors is None:
+                return False
+            remove = {self._id_to_row[str(i)] for i in ids if str(i) in self._id_to_row}
+            if not remove:
+                return False
+            keep = [row for row in range(len(self._docs)) if row not in remove]
+            docs = [self._docs[row] for row in keep]
+            self._vectors = np.array(self._vectors, dtype=np.float32)[keep]
+            self._docs = docs
+            self._id_to_row = {doc['id']: row for row, doc in enumerate(docs)}
+        return True
+
+    def _state(self):
+        """행 수가 맞는 (행렬, 문서 목록, id -> 행) 쌍 (교체는 새 객체로만 하므로 이후 수정에 영향 없음)"""
+        with self._lock:
+            return self._vectors, self._docs, self._id_to_row
+
+    def get_ids(self) -> List[str]:
+        """저장된 모든 문서 id를 저장 순서대로 반환합니다."""
+        return [doc['id'] for doc in self._state()[1]]
+
+    def get_by_ids(self, ids, /) -> List[Document]:
+        """id로 문서를 조회합니다."""
+        _, docs, id_to_row = self._state()
+        return [self._to_document(docs[id_to_row[str(i)]]) for i in ids if str(i) in id_to_row]
+
+    # Step 3: 검색
+    def similarity_search_by_vector_with_score(self, embedding: List[float], k: int = 4) -> List[Tuple[Document, float]]:
+        """
+        벡터로 top-k 검색을 수행합니다.
+        1. 정규화된 행렬과 쿼리 벡터의 행렬곱 (코사인 유사도)
+        2. argpartition으로 상위 k개 선택 후 정렬
+        """
+        vectors, docs, _ = self._state()
+        if vectors is None or not docs:
+            return []
+        query = self._normalize(np.asarray(embedding, dtype=np.float32).reshape(1, -1))[0]
+        scores = vectors @ query
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self._to_document(docs[int(row)]), float(scores[row])) for row in top]
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_by_vector_with_score(self.embedding.embed_query(query), k)
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    def _select_relevance_score_fn(self):
+        # 코사인 유사도(-1~1)를 0~1 범위로 변환
+        return lambda score: (score + 1.0) / 2.0
+
+    # Step 4: 저장 및 로드
+    def save(self, path: Optional[str] = None):
+        """
+        벡터와 문서를 디스크에 저장합니다.
+        임시 파일에 먼저 쓴 뒤 교체하여 읽는 쪽이 깨진 파일을 보지 않도록 합니다.
+        """
+        path = path or self.path
+        if not path:
+            raise ValueError("저장 경로가 지정되지 않았습니다.")
+        os.makedirs(path, exist_ok=True)
+
+        vectors, docs, _ = self._state()
+        if vectors is None:
+            vectors = np.empty((0, 0), dtype=np.float32)
+        tmp_vectors = os.path.join(path, f".{VECTORS_FILE}.tmp")
+        with open(tmp_vectors, "wb") as f:
+            np.save(f, np.asarray(vectors, dtype=self.dtype))
+
+        tmp_docs = os.path.join(path, f".{DOCS_FILE}.tmp")
+        with open(tmp_docs, "w", encoding="utf-8") as f:
+            for doc in docs:
+                f.write(json.dumps(doc, ensure_ascii=False) + "\n")
+
+        os.replace(tmp_vectors, os.path.join(path, VECTORS_FILE))
+        os.replace(tmp_docs, os.path.join(path, DOCS_FILE))
+        logger.info(f"로컬 벡터스토어 저장 완료: {len(docs)}개 문서 ({path})")
+
+    @classmethod
+    def load(cls, path: str, embedding: Embeddings, mmap: bool = True, dtype: str = "float32") -> "LocalVectorStore":
+        """
+        디스크에 저장된 벡터스토어를 로드합니다.
+        float32 행렬은 메모리 맵으로 열고, float16 행렬은 검색 속도를 위해 float32로 한 번만 변환합니다.
+        저장된 파일이 없으면 dtype으로 저장하는 빈 벡터스토어를 반환합니다.
+        """
+        store = cls(embedding, path=path, dtype=dtype)
+        vectors_path = os.path.join(path, VECTORS_FILE)
+        docs_path = os.path.join(path, DOCS_FILE)
+        if not os.path.exists(vectors_path) or not os.path.exists(docs_path):
+            logger.warning(f"로컬 벡터스토어 파일이 없습니다: {path}")
+            return store
+
+        vectors = np.load(vectors_path, mmap_mode="r" if mmap else None)
+        store.dtype = vectors.dtype
+        if vectors.dtype != np.float32:
+            vectors = np.asarray(vectors, dtype=np.float32)
+        store._vectors = vectors if vectors.size else None
+
+        with open(docs_path, encoding="utf-8") as f:
+            store._docs = [json.loads(line) for line in f if line.strip()]
+        store._id_to_row = {doc['id']: row for row, doc in enumerate(store._docs)}
+
+        logger.info(f"로컬 벡터스토어 로드 완료: {len(store._docs)}개 문서 ({path})")
+        return store
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None,
+                   ids: Optional[List[str]] = None, path: Optional[str] = None,
+                   dtype: str = "float32", **kwargs: Any) -> "LocalVectorStore":
+        """텍스트로부터 새 벡터스토어를 만들고, 경로가 있으면 저장합니다."""
+        store = cls(embedding, path=path, dtype=dtype)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        if path:
+            store.save()
+        return store
+
+    # 내부 유틸리티
+    @staticmethod
+    def _to_document(doc: dict) -> Document:
+        return Document(page_content=doc['page_content'], metadata=dict(doc['metadata']), id=doc['id'])
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
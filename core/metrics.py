@@ -0,0 +1,238 @@
+"""
+서비스 지표 (Prometheus 텍스트 형식)
+채팅 요청 단계별 소요 시간, 검색 후보 수, 프롬프트 토큰 수, 캐시 적중/실패, 수집 단계별 소요 시간을 기록
+- Counter: 누적 값 (캐시 적중 수, 요청 수 등)
+- Histogram: 구간별 분포 (소요 시간, 후보 수, 토큰 수)
+기록은 잠금 한 번과 덧셈 몇 번이라 요청 처리에 주는 부담이 거의 없으며, /metrics 조회 시에만 텍스트로 만듦
+"""
+
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from core.logger import logger
+
+# 소요 시간(초) 구간: 토크나이저 수 ms부터 LLM 호출 수십 초까지
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# 개수 구간 (검색 후보 수)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+# 토큰 수 구간
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+
+_metrics_registry: Optional["MetricsRegistry"] = None
+_metrics_registry_lock = threading.Lock()
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """라벨 값 조합별로 값을 보관하는 지표의 공통 부분"""
+    type_name = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._functions: Dict[Tuple[str, ...], Callable[[], float]] = {}
+
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} 지표의 라벨은 {self.labelnames}여야 합니다: {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def set_function(self, function: Callable[[], float], **labels):
+        """조회할 때마다 function()의 값을 사용합니다. (다른 모듈이 이미 세고 있는 값을 노출할 때)"""
+        with self._lock:
+            self._functions[self._key(labels)] = function
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        return lines + self.samples()
+
+
+class Counter(_Metric):
+    """증가만 하는 누적 값"""
+    type_name = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def values(self) -> Dict[Tuple[str, ...], float]:
+        """라벨 값 조합별 현재 값 (set_function으로 등록한 값은 제외)"""
+        with self._lock:
+            return dict(self._values)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+            functions = dict(self._functions)
+        for key, function in functions.items():
+            try:
+                values[key] = function()
+            except Exception as e:
+                logger.warning(f"{self.name} 지표 값을 읽지 못했습니다: {e}")
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in sorted(values.items())]
+
+
+class Gauge(Counter):
+    """오르내리는 현재 값"""
+    type_name = 'gauge'
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """값의 분포: 구간별 누적 개수, 합계, 개수"""
+    type_name = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # 구간별 개수(마지막은 +Inf), 합계
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """with 블록의 소요 시간(초)을 기록합니다. (예외가 나도 기록)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = {key: (list(counts), total) for key, (counts, total) in self._values.items()}
+        lines = []
+        for key, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """이름별 지표 모음. 같은 이름으로 다시 만들면 기존 지표를 반환합니다."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"{name} 지표가 다른 종류로 이미 등록되어 있습니다.")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """모든 지표를 Prometheus 텍스트 형식(0.0.4)으로 반환합니다."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """프로세스 공용 지표 모음을 반환합니다."""
+    global _metrics_registry
+    with _metrics_registry_lock:
+        if _metrics_registry is None:
+            _metrics_registry = MetricsRegistry()
+        return _metrics_registry
+
+
+# 서비스 공용 지표
+_registry = get_metrics_registry()
+
+CHAT_STAGE_SECONDS = _registry.histogram(
+    'chat_stage_seconds', '채팅 응답 생성 단계별 소요 시간(초)', ['stage'])
+CHAT_REQUESTS = _registry.counter(
+    'chat_requests_total', '채팅 요청 수 (결과별)', ['outcome'])
+CHAT_COALESCED = _registry.counter(
+    'chat_coalesced_total', '진행 중인 같은 질문의 응답을 함께 받아 검색/LLM 호출을 건너뛴 요청 수')
+CHAT_ROUTES = _registry.counter(
+    'chat_routes_total', '사전 라우터가 보낸 경로별 채팅 요청 수 (smalltalk/faq는 LLM 호출 없음)', ['route'])
+RETRIEVAL_STAGE_SECONDS = _registry.histogram(
+    'retrieval_stage_seconds', '문서 검색 단계별 소요 시간(초)', ['stage'])
+RETRIEVAL_CANDIDATES = _registry.histogram(
+    'retrieval_candidates', '검색 단계별 후보 문서 수', ['source'], buckets=COUNT_BUCKETS)
+LLM_TOKENS = _registry.histogram(
+    'llm_tokens', 'LLM 호출 한 번의 토큰 수', ['model', 'kind'], buckets=TOKEN_BUCKETS)
+LLM_SECONDS = _registry.histogram(
+    'llm_seconds', 'LLM 호출 한 번의 소요 시간(초)', ['model', 'tier'])
+LLM_MODEL_ROUTES = _registry.counter(
+    'llm_model_routes_total', '모델 라우팅 결과 (등급, 그 등급으로 보낸 이유)', ['tier', 'reason'])
+CACHE_REQUESTS = _registry.counter(
+    'cache_requests_total', '캐시 조회 수 (적중 hit / 실패 miss)', ['cache', 'result'])
+INGESTION_STAGE_SECONDS = _registry.histogram(
+    'ingestion_stage_seconds', '수집 파이프라인 단계별 소요 시간(초)', ['stage'])
+INGESTION_RECORDS = _registry.counter(
+    'ingestion_records_total', '수집 파이프라인 단계별 레코드 수', ['stage', 'kind'])
+INGESTION_RUNS = _registry.counter(
+    'ingestion_runs_total', '수집 파이프라인 실행 수 (결과별)', ['outcome'])
+
+
+def render_metrics() -> str:
+    """/metrics 응답 본문"""
+    return get_metrics_registry().render()
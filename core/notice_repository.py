@@ -0,0 +1,124 @@
+"""
+공지사항 저장소
+자주 실행하는 쿼리(중복 확인, 처리 대상 조회, OCR/임베딩 상태 기록)를 한 곳에 모아 두고
+core.db의 일괄 처리 도우미로 실행 (커넥션은 core.db.connect_db()의 풀에서 빌림)
+"""
+
+import json
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from core.db import execute_batches, select_in
+from core.schema import EMPTY_CONTENT_SQL, OCR_DONE, OCR_FAILED, OCR_PENDING, link_hash
+
+UPSERT_NOTICE = (
+    "INSERT INTO swpre (title, link, link_hash, content, image, images, date, crawled_at, ocr_status) "
+    "VALUES (%s, %s, %s, %s, %s, %s, %s, NOW(), %s) "
+    "ON DUPLICATE KEY UPDATE title = VALUES(title), date = VALUES(date)"
+)
+
+# 수집 상태로 처리할 작업을 고르는 조회 (id, title, link, content, image, date, images)
+SELECT_PENDING_OCR = (
+    "SELECT id, title, link, content, image, date, images FROM swpre "
+    "WHERE ocr_status IN (%s, %s) AND ocr_attempts < %s ORDER BY id"
+)
+SELECT_PENDING_EMBED = (
+    "SELECT id, title, link, content, image, date, images FROM swpre "
+    f"WHERE embedded_at IS NULL AND NOT {EMPTY_CONTENT_SQL} ORDER BY id"
+)
+MARK_OCR_DONE = (
+    "UPDATE swpre SET content = %s, ocr_status = %s, ocr_attempts = ocr_attempts + 1, "
+    "embedded_at = NULL WHERE id = %s"
+)
+MARK_OCR_FAILED = "UPDATE swpre SET ocr_status = %s, ocr_attempts = ocr_attempts + 1 WHERE id = %s"
+MARK_EMBEDDED = "UPDATE swpre SET embedded_at = NOW(), vector_id = %s, content_hash = %s WHERE id = %s"
+SELECT_IDS_BY_LINK_HASH = "SELECT id, link_hash FROM swpre WHERE link_hash IN ({placeholders})"
+SELECT_NOTICES_BY_ID = "SELECT id, title, link, content, image, date, images FROM swpre WHERE id IN ({placeholders})"
+
+
+def needs_ocr(content, image):
+    """본문 없이 이미지만 있는 공지사항이면 OCR 대기 상태를, 아니면 None을 반환합니다."""
+    if image and content in (None, '', 'No content found'):
+        return OCR_PENDING
+    return None
+
+
+def parse_images(images: Optional[str], image: Optional[str] = None) -> List[str]:
+    """images 컬럼(JSON 배열)을 URL 목록으로 바꿉니다. 비어 있으면 image 컬럼 값 하나를 사용합니다."""
+    if images:
+        try:
+            return [url for url in json.loads(images) if url]
+        except ValueError:
+            pass
+    return [image] if image else []
+
+
+def find_notice_ids(cursor, links: Iterable[str]) -> Dict[str, int]:
+    """
+    저장된 링크의 id를 한 번의 쿼리로 찾습니다. ({링크: id})
+    WHERE link_hash IN (...) 조회로 UNIQUE 인덱스를 사용합니다.
+    """
+    hashes = {link_hash(link): link for link in links}
+    return {hashes[row[1]]: row[0] for row in select_in(cursor, SELECT_IDS_BY_LINK_HASH, list(hashes))}
+
+
+def find_existing_links(cursor, links: Iterable[str]) -> Set[str]:
+    """이미 저장된 링크를 한 번의 쿼리로 찾습니다."""
+    return set(find_notice_ids(cursor, links))
+
+
+def find_notices_by_ids(cursor, ids: Iterable[int]) -> Dict[int, Tuple]:
+    """
+    id로 공지사항을 일괄 조회합니다. ({id: (id, title, link, content, image, date, images)})
+    검색 결과의 벡터 id(= swpre.id)로 원문을 찾을 때 사용합니다.
+    """
+    return {row[0]: row for row in select_in(cursor, SELECT_NOTICES_BY_ID, list(dict.fromkeys(ids)))}
+
+
+def upsert_notices(cursor, notices: List[Tuple]) -> int:
+    """
+    공지사항을 executemany로 일괄 저장합니다. 커밋은 호출하는 쪽에서 배치마다 한 번 수행합니다.
+    notices: (title, link, content, image_urls, date) 튜플 목록
+    image 컬럼에는 첫 번째 이미지를, images 컬럼에는 전체 목록(JSON 배열)을 저장합니다.
+    이미 있는 링크는 제목과 게시일만 갱신하고, OCR로 보강된 본문과 수집 상태는 유지합니다.
+    새 행은 본문 없이 이미지만 있으면 OCR 대기(pending) 상태로 저장됩니다.
+    """
+    if not notices:
+        return 0
+    rows = []
+    for title, link, content, image_urls, date in notices:
+        image = image_urls[0] if image_urls else None
+        images = json.dumps(image_urls, ensure_ascii=False) if image_urls else None
+        rows.append((title, link, link_hash(link), content, image, images, date, needs_ocr(content, image)))
+    return execute_batches(cursor, UPSERT_NOTICE, rows)
+
+
+def find_pending_ocr(cursor, max_attempts: int) -> List[Tuple]:
+    """OCR 대기 중이거나 실패 후 재시도 한도가 남은 행을 가져옵니다."""
+    cursor.execute(SELECT_PENDING_OCR, (OCR_PENDING, OCR_FAILED, max_attempts))
+    return list(cursor.fetchall())
+
+
+def find_pending_embed(cursor) -> List[Tuple]:
+    """본문이 있지만 아직 벡터 DB에 반영되지 않은 행을 가져옵니다."""
+    cursor.execute(SELECT_PENDING_EMBED)
+    return list(cursor.fetchall())
+
+
+def mark_ocr_results(cursor, done: List[Tuple], failed: List[int]) -> int:
+    """
+    OCR 결과를 executemany로 일괄 기록합니다.
+    done: (notice_id, content) 튜플 목록, failed: 실패한 notice_id 목록
+    """
+    count = execute_batches(cursor, MARK_OCR_DONE, [(content, OCR_DONE, notice_id) for notice_id, content in done])
+    count += execute_batches(cursor, MARK_OCR_FAILED, [(OCR_FAILED, notice_id) for notice_id in failed])
+    return count
+
+
+def mark_embedded(cursor, rows: List[Tuple]) -> int:
+    """
+    벡터 DB에 반영된 행을 기록합니다.
+    rows: (notice_id, vector_id, content_hash) 튜플 목록
+    """
+    return execute_batches(
+        cursor, MARK_EMBEDDED, [(vector_id, content_hash, notice_id) for notice_id, vector_id, content_hash in rows]
+    )
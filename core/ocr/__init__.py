@@ -0,0 +1,63 @@
+"""
+OCR 백엔드
+- vision: Apple Vision (macOS)
+- tesseract: Tesseract + 한국어 학습 데이터 (Linux 서버)
+OCR_BACKEND 환경 변수로 선택하며, 'auto'(기본값)이면 사용 가능한 백엔드를 순서대로 고름
+"""
+
+import os
+from typing import Dict, Optional, Type
+
+from core.logger import logger
+from core.ocr.base import OcrBackend, OcrLine, OcrUnavailableError, download_image, open_image
+from core.ocr.tesseract import TesseractBackend
+from core.ocr.vision import VisionBackend
+
+# 'auto' 선택 시 확인하는 순서
+BACKENDS: Dict[str, Type[OcrBackend]] = {
+    VisionBackend.name: VisionBackend,
+    TesseractBackend.name: TesseractBackend,
+}
+
+_ocr_backend: Optional[OcrBackend] = None
+
+
+def get_ocr_backend_name() -> str:
+    """설정된 OCR 백엔드 이름을 반환합니다. ('auto', 'vision', 'tesseract')"""
+    return os.getenv('OCR_BACKEND', 'auto').lower()
+
+
+def create_ocr_backend(name: Optional[str] = None, **kwargs) -> OcrBackend:
+    """
+    OCR 백엔드를 만듭니다.
+    사용할 수 있는 백엔드가 없으면 OcrUnavailableError를 발생시킵니다.
+    """
+    name = (name or get_ocr_backend_name()).lower()
+    if 'confidence_threshold' not in kwargs and os.getenv('OCR_CONFIDENCE_THRESHOLD'):
+        kwargs['confidence_threshold'] = float(os.getenv('OCR_CONFIDENCE_THRESHOLD'))
+
+    if name == 'auto':
+        for backend_class in BACKENDS.values():
+            if backend_class.is_available():
+                return backend_class(**kwargs)
+        raise OcrUnavailableError(f"사용 가능한 OCR 백엔드가 없습니다. (확인한 백엔드: {', '.join(BACKENDS)})")
+
+    backend_class = BACKENDS.get(name)
+    if backend_class is None:
+        raise OcrUnavailableError(f"알 수 없는 OCR 백엔드입니다: {name}")
+    return backend_class(**kwargs)
+
+
+def get_ocr_backend() -> OcrBackend:
+    """설정된 OCR 백엔드 인스턴스를 반환합니다."""
+    global _ocr_backend
+    if _ocr_backend is None:
+        _ocr_backend = create_ocr_backend()
+        logger.info(f"OCR 백엔드: {_ocr_backend.name} {_ocr_backend.version}")
+    return _ocr_backend
+
+
+__all__ = [
+    'OcrBackend', 'OcrLine', 'OcrUnavailableError', 'VisionBackend', 'TesseractBackend', 'BACKENDS',
+    'get_ocr_backend_name', 'create_ocr_backend', 'get_ocr_backend', 'download_image', 'open_image',
+]
@@ -0,0 +1,86 @@
+"""
+OCR 백엔드 인터페이스
+이미지 바이트를 받아 인식된 텍스트 줄(텍스트, 신뢰도, 영역)을 반환
+"""
+
+import io
+from dataclasses import dataclass
+from typing import FrozenSet, List, Optional, Tuple
+
+import requests
+from PIL import Image
+
+
+class OcrUnavailableError(RuntimeError):
+    """현재 환경에서 OCR 백엔드를 사용할 수 없을 때 발생"""
+
+
+@dataclass
+class OcrLine:
+    """인식된 텍스트 한 줄"""
+    text: str
+    confidence: float                              # 0.0 ~ 1.0
+    bbox: Tuple[float, float, float, float]        # (x, y, w, h), 이미지 크기 대비 0.0 ~ 1.0
+
+
+class OcrBackend:
+    """
+    OCR 백엔드의 기본 클래스
+    - name/version: 캐시 키와 벤치마크 결과에 사용
+    - settings(): 인식 결과를 바꾸는 설정(언어, 신뢰도 기준 등)을 나타내는 문자열, 캐시 키의 버전에 포함
+    - recognize(data): 원본 이미지 바이트(PNG/JPEG 등)를 인식
+    """
+    name = 'base'
+    version = '0'
+    # 원본 바이트를 그대로 넘길 수 있는 이미지 형식 (None이면 PIL이 여는 모든 형식)
+    supported_formats: Optional[FrozenSet[str]] = None
+
+    def __init__(self, languages: List[str] = None, confidence_threshold: float = 0.8):
+        self.languages = languages or ['ko-KR']
+        self.confidence_threshold = confidence_threshold
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return False
+
+    def settings(self) -> str:
+        return f"{','.join(self.languages)}@{self.confidence_threshold:g}"
+
+    def recognize(self, data: bytes) -> List[OcrLine]:
+        raise NotImplementedError
+
+    def recognize_text(self, data: bytes) -> str:
+        """인식된 줄을 공백으로 이어 붙인 텍스트를 반환합니다."""
+        return " ".join(line.text for line in self.recognize(data))
+
+    def prepare(self, data: bytes) -> bytes:
+        """
+        백엔드가 지원하는 형식이면 원본 바이트를 그대로 반환하고,
+        지원하지 않는 형식일 때만 PNG로 다시 인코딩합니다.
+        """
+        if self.supported_formats is None:
+            return data
+        image = open_image(data)
+        if image.format in self.supported_formats:
+            return data
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        return buffer.getvalue()
+
+
+def open_image(data: bytes) -> Image.Image:
+    """이미지 바이트를 PIL 이미지로 엽니다."""
+    return Image.open(io.BytesIO(data))
+
+
+def fetch_image(url: str, timeout: int = 10, session: Optional[requests.Session] = None) -> requests.Response:
+    """이미지를 내려받아 응답을 반환합니다. (ETag 등 응답 헤더가 필요할 때 사용)"""
+    response = (session or requests).get(url, timeout=timeout)
+    if response.status_code != 200:
+        raise requests.exceptions.RequestException(f"Failed to retrieve image from {url} ({response.status_code})")
+    return response
+
+
+def download_image(url: str, timeout: int = 10, session: Optional[requests.Session] = None) -> bytes:
+    """이미지를 원본 바이트 그대로 내려받습니다."""
+    return fetch_image(url, timeout, session).content
@@ -0,0 +1,148 @@
+"""
+OCR 결과 캐시 (SQLite)
+이미지 바이트의 SHA-256과 OCR 백엔드 이름/버전을 키로 인식 결과(텍스트, 신뢰도, 영역)를 보관
+이미지 URL별 ETag/Last-Modified도 함께 저장해, 검증자가 같으면 HEAD 요청만으로 결과를 재사용
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+from core.logger import logger
+from core.ocr.base import OcrLine
+
+CREATE_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS ocr_results (
+        image_hash TEXT NOT NULL,
+        backend TEXT NOT NULL,
+        version TEXT NOT NULL,
+        lines TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        PRIMARY KEY (image_hash, backend, version)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS image_urls (
+        url TEXT PRIMARY KEY,
+        image_hash TEXT NOT NULL,
+        etag TEXT,
+        last_modified TEXT,
+        checked_at REAL NOT NULL
+    )
+    """,
+)
+
+_ocr_cache: Optional["OcrCache"] = None
+_ocr_cache_lock = threading.Lock()
+
+
+def get_ocr_cache_path() -> str:
+    """OCR 캐시 파일 경로를 반환합니다. (빈 문자열이면 캐시 사용 안 함)"""
+    return os.getenv('OCR_CACHE_PATH', 'data/ocr_cache.sqlite3')
+
+
+def image_hash(data: bytes) -> str:
+    """이미지 바이트의 SHA-256 해시를 반환합니다."""
+    return hashlib.sha256(data).hexdigest()
+
+
+@dataclass
+class ImageUrlEntry:
+    """이미지 URL의 마지막 응답 정보"""
+    url: str
+    image_hash: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def matches(self, headers) -> bool:
+        """HEAD 응답의 검증자가 저장된 값과 같은지 확인합니다. (ETag 우선)"""
+        etag = headers.get('ETag')
+        if self.etag and etag:
+            return etag == self.etag
+        last_modified = headers.get('Last-Modified')
+        return bool(self.last_modified and last_modified and last_modified == self.last_modified)
+
+
+class OcrCache:
+    """
+    OCR 결과 캐시
+    - get/put: (이미지 해시, 백엔드, 버전) -> OcrLine 목록
+    - get_url/record_url: 이미지 URL -> 이미지 해시와 ETag/Last-Modified
+    다운로드 스레드에서 함께 사용하므로 연결 하나를 잠금으로 보호합니다.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or get_ocr_cache_path()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        for statement in CREATE_TABLES:
+            self._conn.execute(statement)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def get(self, image_hash: str, backend: str, version: str) -> Optional[List[OcrLine]]:
+        """캐시된 인식 결과를 반환합니다. 없으면 None을 반환합니다."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT lines FROM ocr_results WHERE image_hash = ? AND backend = ? AND version = ?",
+                (image_hash, backend, version)
+            ).fetchone()
+        if row is None:
+            return None
+        return [OcrLine(text, confidence, tuple(bbox)) for text, confidence, bbox in json.loads(row[0])]
+
+    def put(self, image_hash: str, backend: str, version: str, lines: List[OcrLine]):
+        payload = json.dumps([[line.text, line.confidence, list(line.bbox)] for line in lines], ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ocr_results (image_hash, backend, version, lines, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (image_hash, backend, version, payload, time.time())
+            )
+            self._conn.commit()
+
+    def get_url(self, url: str) -> Optional[ImageUrlEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, image_hash, etag, last_modified FROM image_urls WHERE url = ?", (url,)
+            ).fetchone()
+        return ImageUrlEntry(*row) if row else None
+
+    def record_url(self, url: str, image_hash: str, headers):
+        """다운로드한 이미지의 해시와 응답 검증자(ETag/Last-Modified)를 기록합니다."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO image_urls (url, image_hash, etag, last_modified, checked_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, image_hash, headers.get('ETag'), headers.get('Last-Modified'), time.time())
+            )
+            self._conn.commit()
+
+
+def get_ocr_cache() -> Optional[OcrCache]:
+    """
+    OCR 캐시 인스턴스를 반환합니다.
+    OCR_CACHE_PATH가 빈 문자열이거나 캐시 파일을 열 수 없으면 None을 반환합니다.
+    """
+    global _ocr_cache
+    with _ocr_cache_lock:
+        if _ocr_cache is None and get_ocr_cache_path():
+            try:
+                _ocr_cache = OcrCache()
+            except sqlite3.Error as e:
+                logger.warning(f"OCR 캐시를 열 수 없어 캐시 없이 처리합니다 ({get_ocr_cache_path()}): {e}")
+                return None
+        return _ocr_cache
@@ -0,0 +1,336 @@
+"""
+OCR 작업 풀
+이미지 다운로드는 스레드 풀에서 동시에, 인식은 CPU 코어 수만큼의 프로세스 풀에서 병렬로 처리
+다운로드한 원본 바이트를 그대로 인식 프로세스에 넘기며, 끝나는 순서대로 결과를 돌려줌
+OCR 캐시가 있으면 같은 이미지(내용 해시)는 다시 인식하지 않고, ETag가 같은 URL은 HEAD 요청만 보냄
+세로로 긴 이미지는 겹치는 타일로 나눠 병렬로 인식한 뒤 위에서 아래 순서로 이어 붙임
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+
+from core.logger import logger
+from core.ocr.base import OcrBackend, OcrLine, fetch_image, open_image
+from core.ocr.cache import OcrCache, get_ocr_cache, image_hash
+from core.metrics import CACHE_REQUESTS
+from core.ocr.tiling import TilePlan, get_tile_aspect, get_tile_overlap, plan_tiles, split_image, stitch_lines
+
+# 작업 프로세스마다 한 번만 만드는 백엔드
+_worker_backend: Optional[OcrBackend] = None
+
+
+def _init_worker(backend_name: str):
+    global _worker_backend
+    from core.ocr import create_ocr_backend
+    _worker_backend = create_ocr_backend(backend_name)
+
+
+def _recognize(data: bytes) -> Tuple[List[OcrLine], float]:
+    start = time.perf_counter()
+    lines = _worker_backend.recognize(data)
+    return lines, time.perf_counter() - start
+
+
+@dataclass
+class OcrResult:
+    """이미지 한 장의 OCR 결과"""
+    key: Any                                   # 호출한 쪽의 식별자 (예: swpre.id)
+    url: str
+    lines: List[OcrLine] = field(default_factory=list)
+    error: Optional[str] = None
+    download_seconds: float = 0.0
+    ocr_seconds: float = 0.0
+    image_hash: Optional[str] = None
+    tiles: int = 1                             # 나눠서 인식한 타일 수
+    cached: Optional[str] = None               # 캐시 적중 방식 ('head': ETag/Last-Modified가 같아 HEAD만 요청, 'hash': 다운로드 후 재사용)
+
+    @property
+    def text(self) -> str:
+        return " ".join(line.text for line in self.lines)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class NoticeOcrResult:
+    """공지사항 한 건(이미지 여러 장)의 OCR 결과, 이미지 순서대로 본문을 이어 붙임"""
+    key: Any
+    images: List[OcrResult]
+
+    @property
+    def text(self) -> str:
+        return " ".join(image.text for image in self.images if image.ok and image.text)
+
+    @property
+    def ok(self) -> bool:
+        """한 장이라도 인식했으면 성공 (실패한 이미지는 error에 남김)"""
+        return any(image.ok for image in self.images)
+
+    @property
+    def error(self) -> Optional[str]:
+        errors = [f"{image.url}: {image.error}" for image in self.images if not image.ok]
+        return "; ".join(errors) or None
+
+    @property
+    def ocr_seconds(self) -> float:
+        return sum(image.ocr_seconds for image in self.images)
+
+    @property
+    def tiles(self) -> int:
+        return sum(image.tiles for image in self.images)
+
+    @property
+    def chars(self) -> int:
+        return len(self.text)
+
+    @property
+    def first_image_chars(self) -> int:
+        """첫 번째 이미지만 인식하던 이전 방식의 글자 수 (추가 이미지로 늘어난 양 비교용)"""
+        first = self.images[0] if self.images else None
+        return len(first.text) if first is not None and first.ok else 0
+
+
+def get_ocr_workers() -> int:
+    """인식 프로세스 수 (기본값: CPU 코어 수, 1이면 현재 프로세스에서 처리)"""
+    return int(os.getenv('OCR_WORKERS', str(os.cpu_count() or 1)))
+
+
+def get_ocr_download_workers() -> int:
+    return int(os.getenv('OCR_DOWNLOAD_WORKERS', '8'))
+
+
+def get_ocr_max_pending() -> int:
+    """동시에 처리 중일 수 있는 최대 이미지 수 (0이면 작업자 수의 2배)"""
+    return int(os.getenv('OCR_MAX_PENDING', '0'))
+
+
+class OcrPool:
+    """
+    OCR 작업 풀
+    - map(jobs): (key, url) 목록을 받아 OcrResult를 끝나는 순서대로 yield
+    - map_notices(jobs): (key, [url, ...]) 목록을 받아 이미지가 모두 끝난 공지사항부터 NoticeOcrResult를 yield
+    - images_per_minute: 지금까지 처리한 이미지 기준 처리량
+    - cache: OCR 결과 캐시 (기본값: get_ocr_cache(), use_cache=False면 사용 안 함)
+    - max_pending: 동시에 다운로드/인식 중인 이미지 수 상한 (기본값: 인식/다운로드 작업자 중 큰 쪽의 2배)
+      작업 목록을 한꺼번에 제출하지 않고 결과가 나오는 만큼 이어서 제출해, 내려받은 이미지가 메모리에 쌓이지 않음
+    프로세스는 fork 대신 spawn으로 만들어 서버 스레드 상태를 물려받지 않습니다.
+    """
+
+    def __init__(self, backend: Optional[OcrBackend] = None, workers: Optional[int] = None,
+                 download_workers: Optional[int] = None, timeout: int = 10,
+                 cache: Optional[OcrCache] = None, use_cache: bool = True,
+                 tile_aspect: Optional[float] = None, tile_overlap: Optional[float] = None,
+                 max_pending: Optional[int] = None):
+        from core.crawler import create_session
+        from core.ocr import get_ocr_backend
+        # 현재 프로세스에서 백엔드를 한 번 만들어 사용 가능 여부를 먼저 확인
+        self.backend = backend or get_ocr_backend()
+        self.workers = workers if workers is not None else get_ocr_workers()
+        self.download_workers = download_workers or get_ocr_download_workers()
+        self.timeout = timeout
+        self.max_pending = max_pending or get_ocr_max_pending() or 2 * max(self.workers, self.download_workers, 1)
+        self.cache = (cache or get_ocr_cache()) if use_cache else None
+        self.tile_aspect = get_tile_aspect() if tile_aspect is None else tile_aspect
+        self.tile_overlap = get_tile_overlap() if tile_overlap is None else tile_overlap
+        # 백엔드 설정(언어, 신뢰도 기준)과 타일링 여부에 따라 인식 결과가 달라지므로 캐시 키의 버전에 포함
+        self.cache_version = f"{self.backend.version}+{self.backend.settings()}"
+        if self.tile_aspect > 0:
+            self.cache_version += f"+tile{self.tile_aspect:g}/{self.tile_overlap:g}"
+        self.session = create_session(pool_size=self.download_workers)
+        self._downloads = ThreadPoolExecutor(max_workers=self.download_workers, thread_name_prefix="ocr-download")
+        self._recognizer: Optional[Executor] = None
+        self.images = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.seconds = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._downloads.shutdown(wait=True)
+        if self._recognizer is not None:
+            self._recognizer.shutdown(wait=True)
+        self.session.close()
+
+    @property
+    def images_per_minute(self) -> float:
+        return self.images / self.seconds * 60 if self.seconds else 0.0
+
+    def _get_recognizer(self) -> Executor:
+        if self._recognizer is None:
+            if self.workers > 1:
+                self._recognizer = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.backend.name,)
+                )
+            else:
+                self._recognizer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ocr")
+        return self._recognizer
+
+    def _submit_recognition(self, data: bytes):
+        if self.workers > 1:
+            return self._get_recognizer().submit(_recognize, data)
+
+        def recognize_here():
+            start = time.perf_counter()
+            return self.backend.recognize(data), time.perf_counter() - start
+        return self._get_recognizer().submit(recognize_here)
+
+    def _cached_by_etag(self, url: str) -> Optional[Tuple[str, List[OcrLine]]]:
+        """URL의 ETag/Last-Modified가 지난 다운로드와 같으면 HEAD 요청만으로 캐시된 결과를 반환합니다."""
+        entry = self.cache.get_url(url)
+        if entry is None or not (entry.etag or entry.last_modified):
+            return None
+        lines = self.cache.get(entry.image_hash, self.backend.name, self.cache_version)
+        if lines is None:
+            return None
+        try:
+            response = self.session.head(url, timeout=self.timeout, allow_redirects=True)
+        except requests.exceptions.RequestException:
+            return None
+        if response.status_code == 200 and entry.matches(response.headers):
+            return entry.image_hash, lines
+        return None
+
+    def _download(self, result: OcrResult) -> Optional[Tuple[TilePlan, List[bytes]]]:
+        """
+        이미지를 내려받아 타일 계획과 인식할 이미지 바이트 목록을 반환합니다.
+        (긴 이미지가 아니면 원본 바이트 하나)
+        캐시에서 결과를 찾으면 result에 채우고 None을 반환합니다.
+        """
+        start = time.perf_counter()
+        try:
+            if self.cache is not None:
+                hit = self._cached_by_etag(result.url)
+                if hit is not None:
+                    result.image_hash, result.lines = hit
+                    result.cached = 'head'
+                    return None
+
+            response = fetch_image(result.url, timeout=self.timeout, session=self.session)
+            data = response.content
+            if self.cache is not None:
+                result.image_hash = image_hash(data)
+                self.cache.record_url(result.url, result.image_hash, response.headers)
+                lines = self.cache.get(result.image_hash, self.backend.name, self.cache_version)
+                if lines is not None:
+                    result.lines = lines
+                    result.cached = 'hash'
+                    return None
+
+            width, height = open_image(data).size
+            plan = plan_tiles(width, height, self.tile_aspect, self.tile_overlap)
+            if not plan.tiled:
+                return plan, [data]
+            result.tiles = len(plan.tiles)
+            return plan, split_image(data, plan)
+        finally:
+            result.download_seconds = time.perf_counter() - start
+
+    def map(self, jobs: Iterable[Tuple[Any, str]]) -> Iterator[OcrResult]:
+        start = time.perf_counter()
+        jobs = iter(jobs)
+        pending = {}
+        # 인식 중인 이미지별 타일 상태: id(result) -> (타일 계획, 타일별 결과)
+        tiles = {}
+        # 제출했지만 아직 결과를 돌려주지 않은 이미지 수 (max_pending까지만 제출)
+        active = 0
+
+        try:
+            while True:
+                while active < self.max_pending:
+                    job = next(jobs, None)
+                    if job is None:
+                        break
+                    key, url = job
+                    result = OcrResult(key, url)
+                    pending[self._downloads.submit(self._download, result)] = ('download', result, None)
+                    active += 1
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    kind, result, index = pending.pop(future)
+                    if result.error is not None:
+                        # 같은 이미지의 다른 타일이 이미 실패함
+                        continue
+                    try:
+                        value = future.result()
+                    except Exception as e:
+                        result.error = f"{'이미지 다운로드 실패' if kind == 'download' else 'OCR 처리 오류'}: {e}"
+                        tiles.pop(id(result), None)
+                        self.errors += 1
+                        self.images += 1
+                        active -= 1
+                        yield result
+                        continue
+
+                    if kind == 'download':
+                        if self.cache is not None:
+                            CACHE_REQUESTS.inc(cache='ocr', result='hit' if result.cached else 'miss')
+                        if result.cached:
+                            self.cache_hits += 1
+                            self.images += 1
+                            active -= 1
+                            yield result
+                            continue
+                        plan, images = value
+                        tiles[id(result)] = (plan, [None] * len(images))
+                        for i, data in enumerate(images):
+                            pending[self._submit_recognition(data)] = ('ocr', result, i)
+                        continue
+
+                    plan, tile_lines = tiles[id(result)]
+                    tile_lines[index], seconds = value
+                    result.ocr_seconds += seconds
+                    if any(lines is None for lines in tile_lines):
+                        continue
+                    del tiles[id(result)]
+                    result.lines = stitch_lines(plan, tile_lines) if plan.tiled else tile_lines[0]
+                    if self.cache is not None:
+                        self.cache.put(result.image_hash, self.backend.name, self.cache_version, result.lines)
+                    self.images += 1
+                    active -= 1
+                    yield result
+        finally:
+            for future in pending:
+                future.cancel()
+            self.seconds += time.perf_counter() - start
+            if self.images:
+                logger.info(f"OCR {self.images}장 처리 ({self.images_per_minute:.1f}장/분, "
+                            f"캐시 적중 {self.cache_hits}장, 오류 {self.errors}장)")
+
+    def map_notices(self, jobs: Iterable[Tuple[Any, List[str]]]) -> Iterator[NoticeOcrResult]:
+        """공지사항별 이미지 URL 목록을 받아, 모든 이미지의 인식이 끝난 공지사항부터 반환합니다."""
+        slots = {}
+
+        def image_jobs():
+            for key, urls in jobs:
+                if not urls:
+                    continue
+                slots[key] = [None] * len(urls)
+                for index, url in enumerate(urls):
+                    yield (key, index), url
+
+        for result in self.map(image_jobs()):
+            key, index = result.key
+            images = slots[key]
+            images[index] = result
+            if all(image is not None for image in images):
+                del slots[key]
+                yield NoticeOcrResult(key, images)
@@ -0,0 +1,79 @@
+"""
+Tesseract OCR 백엔드 (Linux/macOS/Windows)
+pytesseract와 tesseract 실행 파일, 한국어 학습 데이터(kor)가 필요
+예: apt install tesseract-ocr tesseract-ocr-kor && pip install pytesseract
+"""
+
+import shutil
+from typing import List
+
+from core.ocr.base import OcrBackend, OcrLine, OcrUnavailableError, open_image
+
+# Vision 언어 코드 -> Tesseract 언어 코드
+LANGUAGE_CODES = {'ko-KR': 'kor', 'en-US': 'eng'}
+
+
+class TesseractBackend(OcrBackend):
+    """줄 단위로 단어를 묶어 OcrLine을 만들고, 줄 신뢰도는 단어 신뢰도의 평균을 사용합니다."""
+    name = 'tesseract'
+
+    def __init__(self, languages: List[str] = None, confidence_threshold: float = 0.6, psm: int = 6):
+        super().__init__(languages, confidence_threshold)
+        try:
+            import pytesseract
+        except ImportError as e:
+            raise OcrUnavailableError(f"pytesseract가 설치되어 있지 않습니다: {e}")
+        self._pytesseract = pytesseract
+        try:
+            self.version = str(pytesseract.get_tesseract_version())
+        except Exception as e:
+            raise OcrUnavailableError(f"tesseract 실행 파일을 찾을 수 없습니다: {e}")
+        self.lang = "+".join(LANGUAGE_CODES.get(language, language) for language in self.languages)
+        self.psm = psm
+
+    @classmethod
+    def is_available(cls) -> bool:
+        try:
+            import pytesseract  # noqa: F401
+        except ImportError:
+            return False
+        return shutil.which('tesseract') is not None
+
+    def settings(self) -> str:
+        return f"{super().settings()}@psm{self.psm}"
+
+    def recognize(self, data: bytes) -> List[OcrLine]:
+        image = open_image(data)
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        width, height = image.size
+        result = self._pytesseract.image_to_data(
+            image, lang=self.lang, config=f"--psm {self.psm}",
+            output_type=self._pytesseract.Output.DICT
+        )
+
+        # (block, paragraph, line) 단위로 단어를 묶음
+        grouped = {}
+        for i, word in enumerate(result['text']):
+            confidence = float(result['conf'][i])
+            if not word.strip() or confidence < 0:
+                continue
+            key = (result['block_num'][i], result['par_num'][i], result['line_num'][i])
+            grouped.setdefault(key, []).append(i)
+
+        lines = []
+        for indexes in grouped.values():
+            confidence = sum(float(result['conf'][i]) for i in indexes) / len(indexes) / 100
+            if confidence < self.confidence_threshold:
+                continue
+            left = min(result['left'][i] for i in indexes)
+            top = min(result['top'][i] for i in indexes)
+            right = max(result['left'][i] + result['width'][i] for i in indexes)
+            bottom = max(result['top'][i] + result['height'][i] for i in indexes)
+            text = " ".join(result['text'][i] for i in indexes)
+            # Vision과 같이 왼쪽 아래 기준 좌표로 변환
+            lines.append(OcrLine(
+                text, confidence,
+                (left / width, 1 - bottom / height, (right - left) / width, (bottom - top) / height)
+            ))
+        return lines
@@ -0,0 +1,110 @@
+"""
+세로로 긴 이미지 타일링
+긴 공지 포스터는 OCR 엔진이 이미지를 축소하면서 글자를 읽지 못하므로, 겹치는 가로 띠(타일)로 나눠
+인식한 뒤 위에서 아래 순서로 이어 붙임. 겹치는 부분에서 두 번 인식된 줄은 한쪽 타일의 결과만 남김
+"""
+
+import io
+import math
+import os
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from core.ocr.base import OcrBackend, OcrLine, open_image
+
+# 타일 높이의 최솟값 (폭이 좁은 이미지가 지나치게 잘게 나뉘지 않도록)
+MIN_TILE_HEIGHT = 1024
+
+
+def get_tile_aspect() -> float:
+    """타일 높이/폭 비율 (이보다 긴 이미지를 타일링, 0이면 타일링 안 함)"""
+    return float(os.getenv('OCR_TILE_ASPECT', '1.5'))
+
+
+def get_tile_overlap() -> float:
+    """이웃한 타일이 겹치는 비율 (타일 높이 대비)"""
+    return float(os.getenv('OCR_TILE_OVERLAP', '0.1'))
+
+
+@dataclass
+class TilePlan:
+    """이미지를 나누는 방법: tiles는 위에서 아래 순서의 (top, bottom) 픽셀 범위"""
+    width: int
+    height: int
+    tiles: List[Tuple[int, int]]
+
+    @property
+    def tiled(self) -> bool:
+        return len(self.tiles) > 1
+
+    def owned_range(self, index: int) -> Tuple[float, float]:
+        """
+        타일이 결과를 책임지는 세로 범위
+        이웃 타일과 겹치는 구간은 가운데에서 나눠, 줄의 중심이 범위 안에 있을 때만 해당 타일의 결과를 사용
+        """
+        top, bottom = self.tiles[index]
+        start = 0 if index == 0 else (top + self.tiles[index - 1][1]) / 2
+        end = self.height if index == len(self.tiles) - 1 else (self.tiles[index + 1][0] + bottom) / 2
+        return start, end
+
+
+def plan_tiles(width: int, height: int, aspect: Optional[float] = None,
+               overlap: Optional[float] = None) -> TilePlan:
+    """이미지 크기로 타일 범위를 정합니다. 타일 높이보다 짧은 이미지는 타일 하나(원본)입니다."""
+    aspect = get_tile_aspect() if aspect is None else aspect
+    overlap = get_tile_overlap() if overlap is None else overlap
+    tile_height = max(int(width * aspect), MIN_TILE_HEIGHT)
+    if aspect <= 0 or height <= tile_height * (1 + overlap):
+        return TilePlan(width, height, [(0, height)])
+
+    # 겹침이 overlap 이상이 되도록 타일 수를 정하고, 첫 타일은 위 끝, 마지막 타일은 아래 끝에 맞춰 고르게 배치
+    step = max(1, int(tile_height * (1 - overlap)))
+    count = math.ceil((height - tile_height) / step) + 1
+    tops = [round(i * (height - tile_height) / (count - 1)) for i in range(count)]
+    return TilePlan(width, height, [(top, top + tile_height) for top in tops])
+
+
+def split_image(data: bytes, plan: TilePlan) -> List[bytes]:
+    """계획한 범위대로 이미지를 잘라 PNG 바이트 목록으로 반환합니다."""
+    image = open_image(data)
+    if image.mode not in ('RGB', 'RGBA', 'L', 'P'):
+        image = image.convert('RGB')
+    tiles = []
+    for top, bottom in plan.tiles:
+        buffer = io.BytesIO()
+        image.crop((0, top, plan.width, bottom)).save(buffer, format="PNG")
+        tiles.append(buffer.getvalue())
+    return tiles
+
+
+def stitch_lines(plan: TilePlan, tile_lines: List[List[OcrLine]]) -> List[OcrLine]:
+    """
+    타일별 인식 결과를 원본 이미지 좌표로 바꿔 타일 순서대로 이어 붙입니다.
+    타일 안의 줄 순서는 OCR 엔진이 돌려준 읽기 순서를 그대로 유지합니다.
+    """
+    lines = []
+    for index, ((top, bottom), recognized) in enumerate(zip(plan.tiles, tile_lines)):
+        start, end = plan.owned_range(index)
+        tile_height = bottom - top
+        for line in recognized:
+            # bbox는 왼쪽 아래 기준 (x, y, w, h) 비율 좌표
+            x, y, w, h = line.bbox
+            line_top = top + (1 - y - h) * tile_height
+            line_bottom = top + (1 - y) * tile_height
+            if not start <= (line_top + line_bottom) / 2 < end:
+                continue
+            lines.append(OcrLine(
+                line.text, line.confidence,
+                (x, 1 - line_bottom / plan.height, w, (line_bottom - line_top) / plan.height)
+            ))
+    return lines
+
+
+def recognize_tiled(backend: OcrBackend, data: bytes, aspect: Optional[float] = None,
+                    overlap: Optional[float] = None) -> List[OcrLine]:
+    """긴 이미지는 타일로 나눠 차례로 인식하고, 아니면 원본을 그대로 인식합니다."""
+    width, height = open_image(data).size
+    plan = plan_tiles(width, height, aspect, overlap)
+    if not plan.tiled:
+        return backend.recognize(data)
+    return stitch_lines(plan, [backend.recognize(tile) for tile in split_image(data, plan)])
@@ -0,0 +1,75 @@
+"""
+Apple Vision OCR 백엔드 (macOS)
+pyobjc(objc, Vision)는 백엔드를 만들 때만 import하므로 다른 플랫폼에서도 모듈을 불러올 수 있음
+"""
+
+import platform
+from typing import List
+
+from core.ocr.base import OcrBackend, OcrLine, OcrUnavailableError
+
+
+class VisionBackend(OcrBackend):
+    """VNRecognizeTextRequest로 텍스트를 인식합니다. (원본 바이트를 그대로 전달)"""
+    name = 'vision'
+    version = '1'
+    # ImageIO가 직접 디코딩하는 형식은 PNG로 다시 인코딩하지 않음
+    supported_formats = frozenset({'PNG', 'JPEG', 'GIF', 'BMP', 'TIFF', 'WEBP', 'HEIF'})
+
+    def __init__(self, languages: List[str] = None, confidence_threshold: float = 0.8,
+                 recognition_level: str = "accurate"):
+        super().__init__(languages, confidence_threshold)
+        if recognition_level not in {"accurate", "fast"}:
+            raise ValueError("Invalid recognition level. Must be 'accurate' or 'fast'.")
+        self.recognition_level = recognition_level
+        try:
+            import objc
+            import Vision
+        except ImportError as e:
+            raise OcrUnavailableError(f"Vision 프레임워크를 사용할 수 없습니다: {e}")
+        self._objc = objc
+        self._vision = Vision
+
+    @classmethod
+    def is_available(cls) -> bool:
+        if platform.system() != 'Darwin':
+            return False
+        try:
+            import objc  # noqa: F401
+            import Vision  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def settings(self) -> str:
+        return f"{super().settings()}@{self.recognition_level}"
+
+    def recognize(self, data: bytes) -> List[OcrLine]:
+        data = self.prepare(data)
+        Vision = self._vision
+        with self._objc.autorelease_pool():
+            req = Vision.VNRecognizeTextRequest.alloc().init()
+            req.setRecognitionLevel_(1 if self.recognition_level == "fast" else 0)
+
+            if self.languages:
+                available_languages = req.supportedRecognitionLanguagesAndReturnError_(None)[0]
+                if not set(self.languages).issubset(set(available_languages)):
+                    raise ValueError(
+                        f"Invalid language preference. Must be a subset of {available_languages}."
+                    )
+                req.setRecognitionLanguages_(self.languages)
+
+            handler = Vision.VNImageRequestHandler.alloc().initWithData_options_(data, None)
+
+            success = handler.performRequests_error_([req], None)
+            lines = []
+            if success:
+                for result in req.results():
+                    confidence = result.confidence()
+                    if confidence >= self.confidence_threshold:
+                        bbox = result.boundingBox()
+                        lines.append(OcrLine(
+                            result.text(), float(confidence),
+                            (bbox.origin.x, bbox.origin.y, bbox.size.width, bbox.size.height)
+                        ))
+            return lines
@@ -0,0 +1,155 @@
+"""
+swpre 테이블 스키마 및 마이그레이션
+기존 테이블에는 필요한 컬럼/인덱스를 추가하고, 새 테이블은 최신 스키마로 생성
+"""
+
+import hashlib
+
+from core.logger import logger
+
+CREATE_SWPRE_TABLE = """
+CREATE TABLE IF NOT EXISTS swpre (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    title VARCHAR(255),
+    link TEXT,
+    link_hash CHAR(64),
+    content TEXT,
+    image TEXT,
+    images TEXT NULL,
+    date DATETIME,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    crawled_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    ocr_status VARCHAR(16) NULL,
+    ocr_attempts INT NOT NULL DEFAULT 0,
+    embedded_at DATETIME NULL,
+    vector_id VARCHAR(64) NULL,
+    content_hash CHAR(64) NULL,
+    UNIQUE KEY uq_swpre_link_hash (link_hash),
+    KEY idx_swpre_ocr_status (ocr_status),
+    KEY idx_swpre_embedded_at (embedded_at)
+)
+"""
+
+# 행별 수집 상태 (ocr_status)
+# NULL: OCR 불필요 / pending: OCR 대기 / done: 완료 / failed: 실패 (ocr_attempts 한도까지 재시도)
+OCR_PENDING = 'pending'
+OCR_DONE = 'done'
+OCR_FAILED = 'failed'
+
+# 본문이 없는 것으로 취급하는 SQL 조건
+EMPTY_CONTENT_SQL = "(content IS NULL OR content = '' OR content = 'No content found')"
+
+# 기존 테이블에 추가하는 상태 컬럼: (컬럼명, 정의)
+_STATE_COLUMNS = [
+    ('crawled_at', "DATETIME DEFAULT CURRENT_TIMESTAMP"),
+    ('ocr_status', "VARCHAR(16) NULL"),
+    ('ocr_attempts', "INT NOT NULL DEFAULT 0"),
+    ('embedded_at', "DATETIME NULL"),
+    ('vector_id', "VARCHAR(64) NULL"),
+    ('content_hash', "CHAR(64) NULL"),
+]
+
+
+def link_hash(link: str) -> str:
+    """링크의 SHA-256 해시 (MySQL SHA2(link, 256)과 같은 값)"""
+    return hashlib.sha256(link.encode('utf-8')).hexdigest()
+
+
+def _has_column(cursor, column: str) -> bool:
+    cursor.execute("SHOW COLUMNS FROM swpre LIKE %s", (column,))
+    return cursor.fetchone() is not None
+
+
+def _has_index(cursor, index: str) -> bool:
+    cursor.execute("SHOW INDEX FROM swpre WHERE Key_name = %s", (index,))
+    return cursor.fetchone() is not None
+
+
+def _backfill_embedded(cursor):
+    """
+    embedded_at 컬럼을 처음 추가할 때, 벡터스토어에 실제로 있는 id의 행만 반영된 것으로 기록합니다.
+    이전 MAX(date) 기준 업로드에서 빠진 행은 NULL로 남아 다음 업로드에서 임베딩됩니다.
+    벡터스토어를 확인할 수 없으면 모두 NULL로 둡니다. (다음 업로드에서 전체를 다시 반영)
+    """
+    from core.db import execute_batches
+    cursor.execute(f"SELECT id FROM swpre WHERE NOT {EMPTY_CONTENT_SQL}")
+    ids = [row[0] for row in cursor.fetchall()]
+    if not ids:
+        return
+    try:
+        from core.vectorstore import find_stored_ids
+        stored = find_stored_ids(ids)
+    except Exception as e:
+        logger.warning(f"벡터스토어를 확인할 수 없어 embedded_at을 비워 둡니다: {e}")
+        return
+    count = execute_batches(
+        cursor,
+        "UPDATE swpre SET embedded_at = COALESCE(updated_at, NOW()), vector_id = CAST(id AS CHAR) WHERE id = %s",
+        [(id,) for id in ids if str(id) in stored]
+    )
+    logger.info(f"벡터스토어에 있는 {count}/{len(ids)}개 행을 반영된 것으로 기록했습니다.")
+
+
+def ensure_schema(db):
+    """
+    swpre 테이블을 최신 스키마로 맞춥니다.
+    1. 테이블이 없으면 생성
+    2. link_hash 컬럼 추가 및 기존 행 채우기
+    3. 중복 링크 정리 (가장 먼저 저장된 행만 유지) 후 UNIQUE 인덱스 추가
+    4. OCR 처리 시각을 기록하는 updated_at 컬럼 추가
+       공지사항의 모든 이미지 URL을 담는 images(JSON 배열) 컬럼 추가, 기존 행은 image 하나로 채움
+    5. 행별 수집 상태 컬럼(crawled_at, ocr_status, embedded_at, vector_id, content_hash) 추가
+       - 이미 있던 행: 본문 없는 이미지 공지는 OCR 대기, 본문이 있는 행은
+         전체 업로드(upload.py, 벡터 id = swpre.id)로 이미 반영된 것으로 간주
+    """
+    with db.cursor() as cursor:
+        cursor.execute(CREATE_SWPRE_TABLE)
+
+        if not _has_column(cursor, 'link_hash'):
+            cursor.execute("ALTER TABLE swpre ADD COLUMN link_hash CHAR(64) NULL AFTER link")
+            logger.info("swpre.link_hash 컬럼이 추가되었습니다.")
+
+        cursor.execute("UPDATE swpre SET link_hash = SHA2(link, 256) WHERE link_hash IS NULL AND link IS NOT NULL")
+        if cursor.rowcount:
+            logger.info(f"swpre.link_hash {cursor.rowcount}개 행을 채웠습니다.")
+
+        if not _has_index(cursor, 'uq_swpre_link_hash'):
+            cursor.execute(
+                "DELETE newer FROM swpre newer JOIN swpre older "
+                "ON newer.link_hash = older.link_hash AND newer.id > older.id"
+            )
+            if cursor.rowcount:
+                logger.info(f"중복 링크 {cursor.rowcount}개 행을 정리했습니다.")
+            cursor.execute("ALTER TABLE swpre ADD UNIQUE INDEX uq_swpre_link_hash (link_hash)")
+            logger.info("swpre.link_hash UNIQUE 인덱스가 추가되었습니다.")
+
+        if not _has_column(cursor, 'updated_at'):
+            cursor.execute("ALTER TABLE swpre ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP")
+            logger.info("swpre.updated_at 컬럼이 추가되었습니다.")
+
+        if not _has_column(cursor, 'images'):
+            cursor.execute("ALTER TABLE swpre ADD COLUMN images TEXT NULL AFTER image")
+            cursor.execute("UPDATE swpre SET images = JSON_ARRAY(image) WHERE image IS NOT NULL AND image != ''")
+            logger.info("swpre.images 컬럼이 추가되었습니다.")
+
+        added = []
+        for column, definition in _STATE_COLUMNS:
+            if not _has_column(cursor, column):
+                cursor.execute(f"ALTER TABLE swpre ADD COLUMN {column} {definition}")
+                added.append(column)
+        if added:
+            logger.info(f"swpre 상태 컬럼이 추가되었습니다: {', '.join(added)}")
+        if 'crawled_at' in added:
+            cursor.execute("UPDATE swpre SET crawled_at = COALESCE(date, NOW())")
+        if 'ocr_status' in added:
+            cursor.execute(
+                f"UPDATE swpre SET ocr_status = %s WHERE image IS NOT NULL AND image != '' AND {EMPTY_CONTENT_SQL}",
+                (OCR_PENDING,)
+            )
+        if 'embedded_at' in added:
+            _backfill_embedded(cursor)
+
+        for index, column in (('idx_swpre_ocr_status', 'ocr_status'), ('idx_swpre_embedded_at', 'embedded_at')):
+            if not _has_index(cursor, index):
+                cursor.execute(f"ALTER TABLE swpre ADD INDEX {index} ({column})")
+    db.commit()
@@ -0,0 +1,61 @@
+"""
+같은 키의 동시 호출 합치기 (single-flight)
+같은 키로 진행 중인 호출이 있으면 새로 실행하지 않고 그 결과(또는 예외)를 함께 받음
+호출이 끝나면 키를 지우므로 결과를 캐시하지는 않음 (끝난 뒤 들어온 요청은 다시 실행)
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class _Call:
+    """진행 중인 호출 하나"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """키별로 진행 중인 호출을 하나로 합칩니다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, function: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        function()을 실행하거나 진행 중인 같은 키의 호출을 기다립니다.
+        Returns:
+            (결과, 다른 호출의 결과를 함께 받았는지)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = function()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self) -> int:
+        """진행 중인 호출 수"""
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,280 @@
+"""
+요청 단위 트레이싱
+requirements.txt에 고정된 OpenTelemetry SDK(TracerProvider)로 span을 만들고,
+현재 span은 OpenTelemetry 컨텍스트로 전파되어 같은 요청 안의 호출이 자동으로 부모-자식 관계를 가짐
+span마다 그 동안 사용한 스레드 CPU 시간을 cpu_ms 속성으로 남김
+끝난 span은 TraceExporter(SpanExporter)가 트레이스별로 모았다가 루트 span이 끝나면 트레이스 하나로 내보냄
+- 메모리 링 버퍼: 최근 TRACE_BUFFER_SIZE개 (느린 요청 조회 /api/debug/traces)
+- 파일: TRACE_FILE을 지정하면 트레이스마다 JSON 한 줄씩 추가 (수집기가 없을 때 나중에 분석)
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from opentelemetry import trace
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor, SpanExporter, SpanExportResult
+from opentelemetry.sdk.trace.sampling import ALWAYS_OFF, ALWAYS_ON
+from opentelemetry.trace import Status, StatusCode, format_span_id, format_trace_id
+
+from core.logger import logger
+
+# 트레이스 하나에 보관하는 최대 span 수 (반복문 안의 span이 메모리를 계속 쓰지 않도록)
+MAX_SPANS_PER_TRACE = 256
+
+_tracer: Optional["Tracer"] = None
+_tracer_lock = threading.Lock()
+
+
+def is_tracing_enabled() -> bool:
+    return os.getenv('TRACING_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+
+
+def get_trace_buffer_size() -> int:
+    return int(os.getenv('TRACE_BUFFER_SIZE', '200'))
+
+
+def get_trace_file() -> str:
+    """트레이스를 JSON Lines로 기록할 파일 경로 (빈 문자열이면 기록 안 함)"""
+    return os.getenv('TRACE_FILE', '')
+
+
+def get_slow_trace_ms() -> float:
+    """느린 요청으로 보는 기준 (밀리초)"""
+    return float(os.getenv('TRACE_SLOW_MS', '2000'))
+
+
+def duration_ms(span: ReadableSpan) -> float:
+    end = span.end_time or time.time_ns()
+    return (end - span.start_time) / 1e6
+
+
+def cpu_ms(span: ReadableSpan) -> float:
+    """span 동안 같은 스레드가 사용한 CPU 시간 (I/O 대기 제외, 다른 스레드에 맡긴 작업은 포함하지 않음)"""
+    return float((span.attributes or {}).get('cpu_ms', 0.0))
+
+
+def _attributes(attributes: Dict[str, Any]) -> Dict[str, Any]:
+    """OpenTelemetry 속성으로 쓸 수 없는 None 값은 뺍니다."""
+    return {key: value for key, value in attributes.items() if value is not None}
+
+
+def span_to_dict(span: ReadableSpan) -> dict:
+    return {
+        'name': span.name,
+        'trace_id': format_trace_id(span.context.trace_id),
+        'span_id': format_span_id(span.context.span_id),
+        'parent_span_id': format_span_id(span.parent.span_id) if span.parent else None,
+        'start_time_unix_nano': span.start_time,
+        'end_time_unix_nano': span.end_time,
+        'duration_ms': round(duration_ms(span), 3),
+        'cpu_ms': round(cpu_ms(span), 3),
+        'attributes': dict(span.attributes or {}),
+        'status': {'code': span.status.status_code.name, 'message': span.status.description},
+        'events': [
+            {'name': event.name, 'time_unix_nano': event.timestamp, 'attributes': dict(event.attributes or {})}
+            for event in span.events
+        ],
+    }
+
+
+@dataclass
+class Trace:
+    """루트 span과 그 아래에서 끝난 span들"""
+    root: ReadableSpan
+    spans: List[ReadableSpan] = field(default_factory=list)
+    dropped_spans: int = 0
+
+    @property
+    def trace_id(self) -> str:
+        return format_trace_id(self.root.context.trace_id)
+
+    @property
+    def duration_ms(self) -> float:
+        return duration_ms(self.root)
+
+    def to_dict(self) -> dict:
+        return {
+            'trace_id': self.trace_id,
+            'name': self.root.name,
+            'duration_ms': round(self.duration_ms, 3),
+            'attributes': dict(self.root.attributes or {}),
+            'status': self.root.status.status_code.name,
+            'dropped_spans': self.dropped_spans,
+            # 시작 순서로 정렬 (부모가 자식보다 먼저)
+            'spans': [span_to_dict(span) for span in sorted(self.spans, key=lambda s: s.start_time)],
+        }
+
+
+class RingBufferSink:
+    """최근 트레이스를 메모리에 보관합니다."""
+
+    def __init__(self, capacity: int = 200):
+        self._traces = deque(maxlen=max(1, capacity))
+        self._lock = threading.Lock()
+
+    def export(self, trace: Trace):
+        with self._lock:
+            self._traces.append(trace)
+
+    def recent(self, limit: int = 20, min_duration_ms: float = 0.0) -> List[Trace]:
+        """min_duration_ms 이상 걸린 트레이스를 최근 것부터 limit개 반환합니다."""
+        with self._lock:
+            traces = list(self._traces)
+        slow = [trace for trace in reversed(traces) if trace.duration_ms >= min_duration_ms]
+        return slow[:limit]
+
+
+class JsonlFileSink:
+    """트레이스마다 JSON 한 줄을 파일에 추가합니다."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def export(self, trace: Trace):
+        line = json.dumps(trace.to_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + "\n")
+
+
+class TraceExporter(SpanExporter):
+    """
+    끝난 span을 trace_id별로 모았다가 루트 span(부모가 없거나 원격인 span)이 끝나면
+    트레이스 하나로 묶어 sinks(링 버퍼, JSONL 파일 등 export(trace)가 있는 객체)에 넘깁니다.
+    """
+
+    def __init__(self, sinks: list):
+        self.sinks = sinks
+        self._open: Dict[int, Trace] = {}
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        for span in spans:
+            is_root = span.parent is None or span.parent.is_remote
+            with self._lock:
+                trace_id = span.context.trace_id
+                collected = self._open.pop(trace_id, None) if is_root else self._open.get(trace_id)
+                if collected is None:
+                    collected = Trace(span)
+                    if not is_root:
+                        self._open[trace_id] = collected
+                if is_root:
+                    collected.root = span
+                if len(collected.spans) < MAX_SPANS_PER_TRACE:
+                    collected.spans.append(span)
+                else:
+                    collected.dropped_spans += 1
+            if is_root:
+                for sink in self.sinks:
+                    try:
+                        sink.export(collected)
+                    except Exception as e:
+                        logger.warning(f"트레이스 내보내기 실패 ({type(sink).__name__}): {e}")
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        with self._lock:
+            self._open.clear()
+
+
+class Tracer:
+    """
+    TracerProvider 하나와 TraceExporter를 묶어 둡니다.
+    부모가 없는 span은 새 트레이스의 루트가 되며, 비활성화하면 span을 기록하지 않습니다. (ALWAYS_OFF)
+    """
+
+    def __init__(self, sinks: Optional[list] = None, enabled: bool = True):
+        self.enabled = enabled
+        # 링 버퍼는 항상 두고, 추가 sink를 지정하지 않으면 TRACE_FILE 설정을 따름
+        self.buffer = RingBufferSink(get_trace_buffer_size())
+        self.exporter = TraceExporter([self.buffer] + (sinks if sinks is not None else self._file_sinks()))
+        self.provider = TracerProvider(sampler=ALWAYS_ON if enabled else ALWAYS_OFF)
+        self.provider.add_span_processor(SimpleSpanProcessor(self.exporter))
+        self._tracer = self.provider.get_tracer(__name__)
+
+    @property
+    def sinks(self) -> list:
+        return self.exporter.sinks
+
+    @staticmethod
+    def _file_sinks() -> list:
+        sinks = []
+        path = get_trace_file()
+        if path:
+            try:
+                sinks.append(JsonlFileSink(path))
+            except OSError as e:
+                logger.warning(f"트레이스 파일을 열 수 없어 메모리에만 보관합니다 ({path}): {e}")
+        return sinks
+
+    @contextmanager
+    def start_span(self, name: str, **attributes) -> Iterator[trace.Span]:
+        start_cpu = time.thread_time_ns()
+        with self._tracer.start_as_current_span(name, attributes=_attributes(attributes)) as span:
+            try:
+                yield span
+            finally:
+                if span.is_recording():
+                    span.set_attribute('cpu_ms', (time.thread_time_ns() - start_cpu) / 1e6)
+
+    def recent_traces(self, limit: int = 20, min_duration_ms: float = 0.0) -> List[Trace]:
+        return self.buffer.recent(limit, min_duration_ms)
+
+
+def get_tracer() -> Tracer:
+    """프로세스 공용 Tracer를 반환합니다. (TRACING_ENABLED, TRACE_BUFFER_SIZE, TRACE_FILE)"""
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer(enabled=is_tracing_enabled())
+        return _tracer
+
+
+def start_span(name: str, **attributes):
+    """with start_span("이름", 속성=값) as span: 형태로 현재 요청의 트레이스에 span을 추가합니다."""
+    return get_tracer().start_span(name, **attributes)
+
+
+def current_span() -> Optional[trace.Span]:
+    span = trace.get_current_span()
+    return span if span.is_recording() else None
+
+
+def set_span_attributes(**attributes):
+    """현재 span에 속성을 추가합니다. (span 밖이면 아무것도 하지 않음)"""
+    span = current_span()
+    if span is not None:
+        span.set_attributes(_attributes(attributes))
+
+
+def record_span_exception(error: BaseException):
+    """현재 span을 오류로 표시합니다. (예외를 잡아 처리하는 곳에서 사용)"""
+    span = current_span()
+    if span is not None:
+        span.record_exception(error)
+        span.set_status(Status(StatusCode.ERROR, str(error)))
+
+
+def traced(name: Optional[str] = None):
+    """함수 호출 전체를 span으로 기록하는 데코레이터"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with start_span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,13 +1,100 @@
-from langchain_pinecone import PineconeVectorStore
+import os
 from .embedding import get_embedding
+from .tracing import start_span
 
 _vectorstore = None
+_pinecone_index = None
+
+# Pinecone upsert 요청 하나에 담을 벡터 수 (요청당 2MB 제한: 1024차원 벡터 + 본문 메타데이터, LangChain 기본값과 같음)
+PINECONE_UPSERT_BATCH_SIZE = 32
+
+def get_vectorstore_backend():
+    """설정된 벡터스토어 백엔드를 반환합니다. ('pinecone' 또는 'local')"""
+    return os.getenv('VECTORSTORE_BACKEND', 'pinecone').lower()
+
+def get_pinecone_index_name():
+    """Pinecone 인덱스명을 반환합니다. (1024차원 인덱스)"""
+    return os.getenv('PINECONE_INDEX_NAME', 'swpre10')
+
+def get_pinecone_index():
+    """Pinecone 인덱스 클라이언트를 반환합니다. (벡터 직접 upsert/list/fetch용)"""
+    global _pinecone_index
+    if _pinecone_index is None:
+        from pinecone import Pinecone
+        pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
+        _pinecone_index = pc.Index(get_pinecone_index_name())
+    return _pinecone_index
+
+def get_local_vectorstore_path():
+    """로컬 벡터스토어 저장 경로를 반환합니다."""
+    return os.getenv('LOCAL_VECTORSTORE_PATH', 'data/vectorstore')
+
+def get_local_vectorstore_dtype():
+    """로컬 벡터스토어 저장 dtype을 반환합니다. ('float32' 또는 'float16')"""
+    return os.getenv('LOCAL_VECTORSTORE_DTYPE', 'float32')
 
 def get_vectorstore():
     global _vectorstore
     if _vectorstore is None:
-        _vectorstore = PineconeVectorStore.from_existing_index(
-            index_name='swpre10',  # 1024차원 인덱스명
-            embedding=get_embedding()
-        )
-    return _vectorstore 
\ No newline at end of file
+        if get_vectorstore_backend() == 'local':
+            from .local_vectorstore import LocalVectorStore
+            _vectorstore = LocalVectorStore.load(
+                get_local_vectorstore_path(),
+                embedding=get_embedding(),
+                dtype=get_local_vectorstore_dtype()
+            )
+        else:
+            from langchain_pinecone import PineconeVectorStore
+            _vectorstore = PineconeVectorStore.from_existing_index(
+                index_name=get_pinecone_index_name(),  # 1024차원 인덱스명
+                embedding=get_embedding()
+            )
+    return _vectorstore
+
+def search_documents(query, k, vectorstore=None):
+    """
+    벡터스토어에서 query와 가까운 문서 k개를 검색합니다.
+    검색 호출(Pinecone 요청)마다 트레이스에 span을 남깁니다.
+    """
+    vectorstore = vectorstore or get_vectorstore()
+    with start_span('vectorstore.search', backend=get_vectorstore_backend(), k=k) as span:
+        docs = vectorstore.as_retriever(search_kwargs={"k": k}).invoke(query)
+        span.set_attribute('results', len(docs))
+    return docs
+
+def upsert_embeddings(ids, texts, embeddings, metadatas, save=True):
+    """
+    미리 계산한 임베딩을 설정된 벡터스토어에 upsert합니다.
+    - local: 로컬 벡터스토어에 추가 후 저장 (save=False이면 저장은 호출하는 쪽에서 수행)
+    - pinecone: 인덱스에 직접 upsert (LangChain과 같이 본문은 metadata['text']에 저장, PINECONE_UPSERT_BATCH_SIZE개씩 요청)
+    """
+    if get_vectorstore_backend() == 'local':
+        store = get_vectorstore()
+        store.add_embeddings(texts, embeddings, metadatas=metadatas, ids=ids)
+        if save:
+            store.save()
+        return
+    vectors = [
+        {'id': str(id), 'values': list(values), 'metadata': {**metadata, 'text': text}}
+        for id, text, values, metadata in zip(ids, texts, embeddings, metadatas)
+    ]
+    get_pinecone_index().upsert(vectors=vectors, batch_size=PINECONE_UPSERT_BATCH_SIZE)
+
+def list_stored_ids(batch_size=100):
+    """
+    설정된 벡터스토어에 저장된 모든 id 집합을 반환합니다.
+    Pinecone은 벡터 값과 메타데이터를 내려받지 않도록 list로 id만 페이지 단위(batch_size개)로 조회합니다.
+    """
+    if get_vectorstore_backend() == 'local':
+        return set(get_vectorstore().get_ids())
+    stored = set()
+    for page in get_pinecone_index().list(limit=batch_size):
+        stored.update(page)
+    return stored
+
+def find_stored_ids(ids, batch_size=100):
+    """
+    ids 중 설정된 벡터스토어에 실제로 저장되어 있는 id 집합을 반환합니다.
+    (swpre.content_hash가 같아도 벡터스토어가 비었거나 삭제되었으면 다시 업로드해야 하므로 확인)
+    """
+    return {str(id) for id in ids} & list_stored_ids(batch_size)
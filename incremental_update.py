@@ -1,94 +1,46 @@
 #!/usr/bin/env python3
 """
 한성대학교 챗봇 증분 업데이트 파이프라인
-crawl_incremental.py -> ocrmac_incremental.py -> upload_incremental.py 순서로 실행
+크롤링 -> OCR -> 임베딩 -> 벡터 DB 업로드 -> 검색 인덱스 갱신을 한 프로세스에서 실행
+INGESTION_MODE=streaming 이면 단계들이 동시에 진행되어 새 공지사항이 준비되는 즉시 업로드
 새로운 공지사항만 처리하여 효율적으로 업데이트
 """
 
-import subprocess
 import sys
-import time
-import os
 from datetime import datetime
+from dotenv import load_dotenv
+from core.ingestion import run_incremental_pipeline
 
-def run_script(script_name, description):
-    """스크립트를 실행하고 결과를 반환합니다."""
-    print(f"\n{'='*60}")
-    print(f"{description} 시작: {script_name}")
-    print(f"시작 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"{'='*60}")
-    
-    try:
-        # 스크립트 실행
-        result = subprocess.run([sys.executable, script_name], 
-                              capture_output=True, 
-                              text=True, 
-                              check=True)
-        
-        print(f"{description} 완료!")
-        print(f"출력:\n{result.stdout}")
-        
-        if result.stderr:
-            print(f"경고/오류:\n{result.stderr}")
-        
-        return True
-        
-    except subprocess.CalledProcessError as e:
-        print(f"{description} 실패!")
-        print(f"오류 코드: {e.returncode}")
-        print(f"출력:\n{e.stdout}")
-        print(f"오류:\n{e.stderr}")
-        return False
-    except FileNotFoundError:
-        print(f"파일을 찾을 수 없습니다: {script_name}")
-        return False
-    except Exception as e:
-        print(f"예상치 못한 오류: {e}")
-        return False
+# 환경 변수 로드
+load_dotenv()
 
 def main():
     """메인 증분 업데이트 파이프라인 실행 함수"""
     print("한성대학교 챗봇 증분 업데이트 파이프라인 시작")
     print(f"실행 날짜: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("새로운 공지사항만 처리하여 효율적으로 업데이트합니다.")
-    
-    # 실행할 스크립트 목록
-    scripts = [
-        ("crawl_incremental.py", "새로운 학사 공지사항 크롤링"),
-        ("ocrmac_incremental.py", "새로운 이미지 OCR 처리"),
-        ("upload_incremental.py", "새로운 공지사항 벡터 DB 업로드")
-    ]
-    
-    # 각 스크립트 실행
-    success_count = 0
-    total_scripts = len(scripts)
-    
-    for script_name, description in scripts:
-        if run_script(script_name, description):
-            success_count += 1
-            print(f"{description} 성공!")
-        else:
-            print(f"{description} 실패! 파이프라인 중단")
-            break
-        
-        # 스크립트 간 잠시 대기 (서버 부하 방지)
-        if script_name != scripts[-1][0]:  # 마지막 스크립트가 아니면
-            print(f"3초 대기 중...")
-            time.sleep(3)
-    
+
+    result = run_incremental_pipeline()
+
     # 결과 요약
     print(f"\n{'='*60}")
     print(f"증분 업데이트 파이프라인 실행 결과")
     print(f"{'='*60}")
-    print(f"성공: {success_count}/{total_scripts}")
-    print(f"실패: {total_scripts - success_count}/{total_scripts}")
-    
-    if success_count == total_scripts:
+    for stage in result.stages:
+        print(f"{stage.name:<14} 입력 {stage.input:4d}  출력 {stage.output:4d}  "
+              f"건너뜀 {stage.skipped:4d}  오류 {stage.errors:3d}  {stage.seconds:7.2f}초")
+    print(f"전체 소요 시간: {result.seconds:.2f}초 (실행 방식: {result.mode})")
+    freshness = result.freshness_summary()
+    if freshness['count']:
+        print(f"크롤링 후 벡터 DB 반영까지: p50 {freshness['p50']}초, 최대 {freshness['max']}초")
+
+    if result.no_changes:
+        print("새로운 공지사항이 없어 나머지 단계를 건너뛰었습니다.")
+    elif result.success:
         print(f"모든 증분 업데이트가 성공적으로 완료되었습니다!")
-        return True
     else:
-        print(f"일부 증분 업데이트가 실패했습니다.")
-        return False
+        print(f"일부 증분 업데이트가 실패했습니다. {result.error or ''}")
+    return result.success
 
 if __name__ == "__main__":
     try:
@@ -99,4 +51,4 @@ if __name__ == "__main__":
         sys.exit(1)
     except Exception as e:
         print(f"\n예상치 못한 오류: {e}")
-        sys.exit(1) 
\ No newline at end of file
+        sys.exit(1)
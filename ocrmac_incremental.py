@@ -1,143 +1,55 @@
 #!/usr/bin/env python3
 """
 한성대학교 챗봇 증분 OCR 처리 스크립트
-새로 추가된 이미지가 있는 공지사항만 OCR 처리
+OCR 대기(ocr_status = pending) 또는 실패 후 재시도 한도가 남은 공지사항만 OCR 처리
 """
 
-import pymysql
-import requests
-import io
-import objc
-from PIL import Image
-import Vision
-from typing import List, Tuple
-from dotenv import load_dotenv
 import os
-from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from datetime import datetime
+from core.schema import ensure_schema
+from core.db import connect_db
+from core.notice_repository import find_pending_ocr, mark_ocr_results, parse_images
+from core.ingestion.stages import get_ocr_max_attempts
+from core.ocr import OcrUnavailableError, get_ocr_backend
+from core.ocr.pool import OcrPool
 
 # Load environment variables
 load_dotenv()
 
-def pil2buf(pil_image: Image.Image):
-    """Convert PIL image to buffer"""
-    buffer = io.BytesIO()
-    pil_image.save(buffer, format="PNG")
-    return buffer.getvalue()
-
-def load_image_from_url(url: str) -> Image.Image:
-    """Load image from a URL into PIL format"""
-    response = requests.get(url, timeout=10)
-    if response.status_code == 200:
-        image = Image.open(io.BytesIO(response.content))
-        return image
-    else:
-        raise Exception(f"Failed to retrieve image from {url}")
-
-def text_from_image(
-    image, recognition_level="accurate", language_preference=None, confidence_threshold=0.0
-) -> List[Tuple[str, float, Tuple[float, float, float, float]]]:
-    """Extract text from image using Apple's Vision framework."""
-    if not isinstance(image, Image.Image):
-        raise ValueError("Invalid image format. Image must be a PIL image.")
-
-    if recognition_level not in {"accurate", "fast"}:
-        raise ValueError("Invalid recognition level. Must be 'accurate' or 'fast'.")
-
-    if language_preference is not None and not isinstance(language_preference, list):
-        raise ValueError("Language preference must be a list.")
-
-    with objc.autorelease_pool():
-        req = Vision.VNRecognizeTextRequest.alloc().init()
-        req.setRecognitionLevel_(1 if recognition_level == "fast" else 0)
-
-        if language_preference is not None:
-            available_languages = req.supportedRecognitionLanguagesAndReturnError_(None)[0]
-            if not set(language_preference).issubset(set(available_languages)):
-                raise ValueError(
-                    f"Invalid language preference. Must be a subset of {available_languages}."
-                )
-            req.setRecognitionLanguages_(language_preference)
-
-        handler = Vision.VNImageRequestHandler.alloc().initWithData_options_(
-            pil2buf(image), None
-        )
-
-        success = handler.performRequests_error_([req], None)
-        res = []
-        if success:
-            for result in req.results():
-                confidence = result.confidence()
-                if confidence >= confidence_threshold:
-                    bbox = result.boundingBox()
-                    x, y = bbox.origin.x, bbox.origin.y
-                    w, h = bbox.size.width, bbox.size.height
-                    res.append((result.text(), confidence, (x, y, w, h)))
-            
-        return res
-
-def get_latest_ocr_time(cursor):
-    """마지막 OCR 처리 시간을 가져옵니다."""
-    try:
-        cursor.execute("SELECT MAX(updated_at) FROM swpre WHERE content IS NOT NULL AND content != ''")
-        result = cursor.fetchone()
-        if result and result[0]:
-            return result[0]
-        else:
-            # OCR 처리된 데이터가 없으면 7일 전으로 설정
-            return datetime.now() - timedelta(days=7)
-    except Exception as e:
-        print(f"최근 OCR 시간 조회 오류: {e}")
-        return datetime.now() - timedelta(days=7)
+# OCR 결과를 DB에 기록하고 커밋하는 간격 (공지사항 수, 중간에 중단되어도 그때까지의 결과는 남음)
+FLUSH_EVERY = int(os.getenv('OCR_FLUSH_EVERY', '20'))
 
 def main():
     """메인 증분 OCR 처리 함수"""
     print("한성대학교 챗봇 증분 OCR 처리 시작")
     print(f"실행 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
+    # OCR 백엔드 선택 (OCR_BACKEND: auto, vision, tesseract)
+    try:
+        backend = get_ocr_backend()
+        print(f"OCR 백엔드: {backend.name} {backend.version}")
+    except OcrUnavailableError as e:
+        print(f"OCR 백엔드를 사용할 수 없습니다: {e}")
+        return False
+    
     # Database connection
     try:
-        db = pymysql.connect(
-            host=os.getenv('DB_HOST', 'localhost'),
-            user=os.getenv('DB_USER', 'root'),
-            password=os.getenv('DB_PASSWORD', 'dnjswnsdud1.'),
-            database=os.getenv('DB_NAME', 'swpre6'),
-            port=int(os.getenv('DB_PORT', '3306'))
-        )
+        db = connect_db()
         cursor = db.cursor()
     except Exception as e:
         print(f"데이터베이스 연결 오류: {e}")
         return False
     
-    # 테이블에 updated_at 컬럼이 없으면 추가
+    # 수집 상태 컬럼(ocr_status 등)이 없으면 추가
     try:
-        cursor.execute("SHOW COLUMNS FROM swpre LIKE 'updated_at'")
-        if not cursor.fetchone():
-            cursor.execute("ALTER TABLE swpre ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP")
-            db.commit()
-            print("updated_at 컬럼이 추가되었습니다.")
-        else:
-            print("updated_at 컬럼이 이미 존재합니다.")
+        ensure_schema(db)
     except Exception as e:
         print(f"테이블 구조 업데이트 오류: {e}")
     
-    # 최근 OCR 처리 시간 가져오기
-    latest_ocr_time = get_latest_ocr_time(cursor)
-    print(f"최근 OCR 처리 시간: {latest_ocr_time}")
-    print(f"이 시간 이후의 새로운 이미지만 OCR 처리합니다.")
-    
-    # 새로 추가된 이미지가 있는 공지사항만 조회 (OCR이 처리되지 않은 것)
-    query = """
-    SELECT id, image, content, title 
-    FROM swpre 
-    WHERE image IS NOT NULL 
-    AND image != '' 
-    AND (content IS NULL OR content = '' OR content = 'No content found')
-    AND date > %s
-    ORDER BY date DESC
-    """
-    
-    cursor.execute(query, (latest_ocr_time,))
-    image_rows = cursor.fetchall()
+    # OCR 대기 중이거나 실패 후 재시도 한도가 남은 공지사항만 조회 (ocr_status 기준)
+    max_attempts = get_ocr_max_attempts()
+    image_rows = find_pending_ocr(cursor, max_attempts)
     
     if not image_rows:
         print("새로 추가된 이미지가 있는 공지사항이 없습니다.")
@@ -149,46 +61,58 @@ def main():
     
     processed_count = 0
     error_count = 0
+    total_chars = 0
+    extra_chars = 0
+    done, failed = [], []
+    rows_by_id = {row[0]: row for row in image_rows}
+    
+    def flush():
+        # 모인 결과를 executemany로 일괄 반영하고 커밋
+        if done or failed:
+            mark_ocr_results(cursor, done, failed)
+            db.commit()
+            done.clear()
+            failed.clear()
     
-    for row in image_rows:
-        id, image_url, existing_content, title = row
-        try:
-            print(f"OCR 처리 중: {title}")
+    # 이미지 다운로드는 동시에, OCR은 CPU 코어 수만큼의 프로세스에서 병렬 처리 (원본 바이트 그대로 전달)
+    # 공지사항의 모든 이미지(images 컬럼)를 인식하고, 긴 이미지는 타일로 나눠 인식
+    with OcrPool(backend=backend) as pool:
+        print(f"OCR 작업자: 인식 {pool.workers}개, 다운로드 {pool.download_workers}개")
+        jobs = [(row[0], parse_images(row[6], row[4])) for row in image_rows]
+        for result in pool.map_notices(jobs):
+            id, title, link, existing_content, image_url, pub_date, images = rows_by_id[result.key]
+            if not result.ok:
+                print(f"{result.error} (ID {id})")
+                error_count += 1
+                failed.append(id)
+                if len(done) + len(failed) >= FLUSH_EVERY:
+                    flush()
+                continue
+            
+            extracted_text = result.text
             
-            # Load image from URL
-            image = load_image_from_url(image_url)
-
-            # Perform OCR
-            recognized_text = text_from_image(
-                image, 
-                recognition_level="accurate", 
-                language_preference=["ko-KR"], 
-                confidence_threshold=0.8
-            )
-            extracted_text = " ".join([text for text, _, _ in recognized_text])
-
             # Prepare new content
             if existing_content and existing_content != "No content found":
                 new_content = f"{existing_content} {extracted_text}"
             else:
                 new_content = extracted_text
-
-            # Update content in the database
-            cursor.execute(
-                "UPDATE swpre SET content = %s, updated_at = NOW() WHERE id = %s", 
-                (new_content, id)
-            )
-            db.commit()
+            done.append((id, new_content))
             
             processed_count += 1
-            print(f"OCR 처리 완료 (ID {id}): {extracted_text[:100]}...")
-
-        except requests.exceptions.RequestException as e:
-            print(f"이미지 다운로드 실패 (ID {id}): {e}")
-            error_count += 1
-        except Exception as e:
-            print(f"OCR 처리 오류 (ID {id}): {e}")
-            error_count += 1
+            total_chars += result.chars
+            extra_chars += result.chars - result.first_image_chars
+            cached = sum(1 for image in result.images if image.cached)
+            print(f"OCR 처리 완료 (ID {id}, 이미지 {len(result.images)}장/타일 {result.tiles}개, "
+                  f"{result.ocr_seconds:.2f}초, 캐시 {cached}장, {result.chars}자): {extracted_text[:100]}...")
+            if result.error:
+                print(f"일부 이미지 OCR 실패 (ID {id}): {result.error}")
+            if len(done) + len(failed) >= FLUSH_EVERY:
+                flush()
+        images_per_minute = pool.images_per_minute
+        cache_hits = pool.cache_hits
+    
+    # 남은 결과 반영
+    flush()
     
     # Close database connection
     cursor.close()
@@ -201,6 +125,8 @@ def main():
     print(f"처리된 공지사항: {processed_count}개")
     print(f"오류 발생: {error_count}개")
     print(f"총 확인된 공지사항: {len(image_rows)}개")
+    print(f"처리량: {images_per_minute:.1f}장/분 (캐시 적중 {cache_hits}장)")
+    print(f"추출 글자 수: {total_chars}자 (첫 번째 이미지 외 추가 이미지에서 +{extra_chars}자)")
     
     if processed_count > 0:
         print(f"새로운 이미지 {processed_count}개가 성공적으로 OCR 처리되었습니다!")
@@ -1,12 +1,9 @@
-import asyncio
 import threading
-import time
 from datetime import datetime, timedelta
-from typing import Optional
-import subprocess
-import sys
-import os
+from typing import List, Optional
 from core.logger import logger
+from core.ingestion import get_ingestion_pipeline
+from service.scheduler import Job, JobQueue, parse_schedule
 
 import os
 from dotenv import load_dotenv
@@ -14,106 +11,128 @@ from dotenv import load_dotenv
 # 환경 변수 로드
 load_dotenv()
 
+def get_auto_update_stop_timeout() -> float:
+    """서비스를 멈출 때 실행 중인 업데이트 작업을 기다리는 최대 시간 (초)"""
+    return float(os.getenv('AUTO_UPDATE_STOP_TIMEOUT_SECONDS', '60'))
+
 class AutoUpdateService:
-    """자동 업데이트 서비스"""
-    
-    def __init__(self, update_interval_hours: int = None):
+    """
+    자동 업데이트 서비스
+    일정(AUTO_UPDATE_SCHEDULE)마다 증분 업데이트 작업을 작업 큐에 넣고, 작업 스레드 하나가 차례로 실행
+    (수집 파이프라인은 동시에 하나만 실행되며, 강제 업데이트도 같은 큐로 들어가 작업 id를 바로 반환)
+    """
+    JOB_NAME = 'incremental-update'
+
+    def __init__(self, update_interval_hours: int = None, schedule=None):
         # 환경 변수에서 업데이트 간격 가져오기
         if update_interval_hours is None:
             update_interval_hours = int(os.getenv('AUTO_UPDATE_INTERVAL_HOURS', '6'))
-        
+
         self.update_interval_hours = update_interval_hours
+        # 일정: cron 식("0 */6 * * *") 또는 간격("6h"), 첫 실행은 서버 시작 후 AUTO_UPDATE_INITIAL_DELAY_HOURS 뒤
+        if schedule is None:
+            initial_delay = timedelta(hours=float(os.getenv('AUTO_UPDATE_INITIAL_DELAY_HOURS', str(update_interval_hours))))
+            schedule = parse_schedule(os.getenv('AUTO_UPDATE_SCHEDULE', f"{update_interval_hours}h"), initial_delay)
+        self.schedule = schedule
+        self.jobs = JobQueue()
         self.last_update_time: Optional[datetime] = None
+        self.next_update_time: Optional[datetime] = None
+        self.last_scheduled_time: Optional[datetime] = None
         self.is_running = False
         self.update_thread: Optional[threading.Thread] = None
-        
+        self.last_result: Optional[dict] = None  # 마지막 파이프라인 실행의 단계별 결과
+        self._stop = threading.Event()
+
     def start(self):
         """자동 업데이트 서비스를 시작합니다."""
         if self.is_running:
             logger.warning("자동 업데이트 서비스가 이미 실행 중입니다.")
             return
-            
+
         self.is_running = True
-        self.update_thread = threading.Thread(target=self._update_loop, daemon=True)
+        self._stop.clear()
+        self.jobs.start()
+        self.update_thread = threading.Thread(target=self._update_loop, name="auto-update-scheduler", daemon=True)
         self.update_thread.start()
-        logger.info(f"자동 업데이트 서비스가 시작되었습니다. (간격: {self.update_interval_hours}시간)")
-        
-    def stop(self):
-        """자동 업데이트 서비스를 중지합니다."""
+        logger.info(f"자동 업데이트 서비스가 시작되었습니다. (일정: {self.schedule.describe()})")
+
+    def stop(self, timeout: Optional[float] = None) -> bool:
+        """
+        자동 업데이트 서비스를 중지합니다. (대기 중인 일정은 즉시 깨워 종료)
+        실행 중인 작업은 timeout초(기본 AUTO_UPDATE_STOP_TIMEOUT_SECONDS)까지 기다리며, 끝났으면 True를 반환합니다.
+        """
         self.is_running = False
+        self._stop.set()
         if self.update_thread:
             self.update_thread.join(timeout=5)
+        stopped = self.jobs.stop(get_auto_update_stop_timeout() if timeout is None else timeout)
+        self.next_update_time = None
         logger.info("자동 업데이트 서비스가 중지되었습니다.")
-        
+        return stopped
+
     def _update_loop(self):
-        """업데이트 루프를 실행합니다."""
-        while self.is_running:
+        """일정에 맞춰 업데이트 작업을 등록합니다. 대기는 stop()으로 바로 중단됩니다."""
+        while not self._stop.is_set():
             try:
-                # 첫 실행 시 6시간 대기 후 업데이트
-                if self.last_update_time is None:
-                    initial_wait_hours = 6
-                    initial_wait_seconds = initial_wait_hours * 3600
-                    logger.info(f"서버 시작 후 {initial_wait_hours}시간 대기 후 첫 업데이트를 실행합니다...")
-                    logger.info(f"첫 업데이트까지 {initial_wait_seconds/3600:.1f}시간 대기 중...")
-                    
-                    # 6시간 대기
-                    time.sleep(initial_wait_seconds)
-                    
-                    if self.is_running:  # 서비스가 여전히 실행 중인지 확인
-                        logger.info("첫 업데이트를 실행합니다...")
-                        self._run_update_pipeline()
-                        self.last_update_time = datetime.now()
-                
-                # 이후 정기 업데이트 (6시간 간격)
-                next_update = self.last_update_time + timedelta(hours=self.update_interval_hours)
-                wait_seconds = (next_update - datetime.now()).total_seconds()
-                
-                if wait_seconds > 0:
-                    logger.info(f"다음 업데이트까지 {wait_seconds/3600:.1f}시간 대기 중...")
-                    time.sleep(min(wait_seconds, 300))  # 최대 5분씩 체크
-                else:
-                    # 업데이트 실행
-                    logger.info("정기 업데이트를 실행합니다...")
-                    self._run_update_pipeline()
-                    self.last_update_time = datetime.now()
-                    
+                now = datetime.now()
+                self.next_update_time = self.schedule.next_run(now, self.last_scheduled_time)
+                wait_seconds = (self.next_update_time - now).total_seconds()
+                logger.info(f"다음 업데이트까지 {wait_seconds/3600:.1f}시간 대기 중... ({self.next_update_time.isoformat()})")
+
+                if self._stop.wait(timeout=max(0.0, wait_seconds)):
+                    break
+
+                logger.info("정기 업데이트를 실행합니다...")
+                self.last_scheduled_time = datetime.now()
+                self.submit_update(trigger='schedule')
+
             except Exception as e:
-                logger.error(f"자동 업데이트 중 오류 발생: {e}")
-                time.sleep(300)  # 오류 시 5분 대기
-                
-    def _run_update_pipeline(self):
-        """증분 업데이트 파이프라인을 실행합니다."""
-        try:
-            # 증분 업데이트 파이프라인 실행 (새로운 공지사항만 처리)
-            result = subprocess.run([
-                sys.executable, "incremental_update.py"
-            ], capture_output=True, text=True, timeout=1800)  # 30분 타임아웃
-            
-            if result.returncode == 0:
-                logger.info("증분 업데이트 파이프라인이 성공적으로 완료되었습니다.")
-                if result.stdout:
-                    logger.info(f"업데이트 결과: {result.stdout[-500:]}")  # 마지막 500자만
-            else:
-                logger.error(f"증분 업데이트 파이프라인 실패: {result.stderr}")
-                
-        except subprocess.TimeoutExpired:
-            logger.error("증분 업데이트 파이프라인이 시간 초과되었습니다.")
-        except Exception as e:
-            logger.error(f"증분 업데이트 파이프라인 실행 중 오류: {e}")
-            
-    def force_update(self):
-        """강제로 업데이트를 실행합니다."""
-        logger.info("강제 업데이트를 실행합니다...")
-        self._run_update_pipeline()
+                logger.error(f"자동 업데이트 일정 처리 중 오류 발생: {e}")
+                self._stop.wait(timeout=300)  # 오류 시 5분 대기
+
+    def _run_update_pipeline(self, job: Job):
+        """증분 업데이트 파이프라인을 서버 프로세스 안에서 실행합니다. (로드된 임베딩 모델 재사용)"""
+        pipeline = get_ingestion_pipeline()
+        job.progress = pipeline.progress
+        result = pipeline.run()
+        self.last_result = job.result = result.to_dict()
         self.last_update_time = datetime.now()
-        
+
+        if result.no_changes:
+            logger.info("새로운 공지사항이 없어 증분 업데이트를 건너뛰었습니다.")
+        elif result.success:
+            logger.info(f"증분 업데이트 파이프라인이 성공적으로 완료되었습니다. ({result.seconds:.1f}초)")
+        else:
+            logger.error(f"증분 업데이트 파이프라인 실패: {self.last_result}")
+            raise RuntimeError(result.error or "일부 단계에서 오류가 발생했습니다.")
+
+    def submit_update(self, trigger: str = 'manual') -> Job:
+        """업데이트 작업을 큐에 넣고 바로 반환합니다. (이미 대기 중인 작업이 있으면 그 작업을 반환)"""
+        self.jobs.start()
+        return self.jobs.submit(self.JOB_NAME, self._run_update_pipeline, trigger)
+
+    def force_update(self) -> Job:
+        """강제 업데이트 작업을 등록합니다."""
+        logger.info("강제 업데이트를 등록합니다...")
+        return self.submit_update(trigger='manual')
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def list_jobs(self) -> List[Job]:
+        return self.jobs.list()
+
     def get_status(self) -> dict:
         """서비스 상태를 반환합니다."""
+        current = self.jobs.current
         return {
             "is_running": self.is_running,
+            "schedule": self.schedule.describe(),
             "last_update_time": self.last_update_time.isoformat() if self.last_update_time else None,
-            "next_update_time": (self.last_update_time + timedelta(hours=self.update_interval_hours)).isoformat() if self.last_update_time else None,
-            "update_interval_hours": self.update_interval_hours
+            "next_update_time": self.next_update_time.isoformat() if self.next_update_time else None,
+            "update_interval_hours": self.update_interval_hours,
+            "current_job": current.to_dict() if current else None,
+            "last_result": self.last_result
         }
 
 # 전역 인스턴스
@@ -131,7 +150,7 @@ def start_auto_update():
     service = get_auto_update_service()
     service.start()
 
-def stop_auto_update():
-    """자동 업데이트 서비스를 중지합니다."""
+def stop_auto_update() -> bool:
+    """자동 업데이트 서비스를 중지합니다. (실행 중인 작업이 끝났으면 True)"""
     service = get_auto_update_service()
-    service.stop() 
\ No newline at end of file
+    return service.stop()
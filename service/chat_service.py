@@ -1,11 +1,20 @@
 import requests
 from service.rag_service import get_retriever
 from service.conversation_service import get_conversation_service
-from service.intent_classifier import get_intent_classifier
+from service.intent_classifier import INTENT_HINTS, PERSONA_PROMPT
+from service.pre_router import get_pre_router
+from service.model_router import get_model_router
 from core.logger import logger
+from core.metrics import CHAT_COALESCED, CHAT_REQUESTS, CHAT_STAGE_SECONDS, LLM_SECONDS, LLM_TOKENS
+from core.singleflight import SingleFlight
+from core.tracing import record_span_exception, set_span_attributes, start_span
 from langchain_openai import ChatOpenAI
 from pydantic import SecretStr
 import os
+import re
+import hashlib
+import threading
+from langchain_core.messages import SystemMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.chains.combine_documents import create_stuff_documents_chain
 from langchain_community.chat_message_histories import ChatMessageHistory
@@ -13,11 +22,128 @@ from datetime import datetime
 
 _llm_cache = {}
 store = {}
+# 요청은 스레드 풀(합쳐진 요청은 작업 스레드)에서 처리되므로 세션 히스토리와 LLM 클라이언트는 잠금 안에서 만듦
+_store_lock = threading.Lock()
+_llm_cache_lock = threading.Lock()
+# 진행 중인 같은 질문의 응답 생성을 하나로 합침 (_coalescing_key)
+_in_flight = SingleFlight()
+
+def is_coalescing_enabled():
+    return os.getenv('CHAT_COALESCING_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+
+def _coalescing_key(user_message, chat_history):
+    """공백/문장부호/대소문자를 무시한 질문과 대화 히스토리가 같으면 같은 키"""
+    digest = hashlib.sha256(re.sub(r'[^\w]', '', user_message.lower()).encode('utf-8'))
+    for message in chat_history:
+        digest.update(f"\x00{message.type}\x00{message.content}".encode('utf-8'))
+    return digest.hexdigest()
+
+# 프롬프트 고정 앞부분: 모든 요청에서 바이트 단위로 같아야 LLM 제공자의 프롬프트 접두사 캐시가 적중함
+# (날짜, 의도, 검색 문서처럼 요청마다 바뀌는 내용은 여기에 넣지 말 것)
+# OpenAI는 PROMPT_CACHE_MIN_TOKENS 이상인 접두사부터 캐시하므로, 의도별 안내(INTENT_HINTS 전체),
+# 답변 형식과 규칙, 예시, 결과 없음 안내처럼 바뀌지 않는 내용은 모두 이 앞부분에 넣음 (tests/test_chat_prompt.py)
+PROMPT_CACHE_MIN_TOKENS = 1024
+
+INTENT_GUIDE = "".join(f"- {intent}: {hint}\n" for intent, hint in INTENT_HINTS.items())
+
+STATIC_SYSTEM_PROMPT = (
+    f"{PERSONA_PROMPT} "
+    "반드시 한성대학교 공식 공지사항의 URL을 포함해서, 학생이 바로 클릭할 수 있도록 안내해드리겠습니다. "
+    "\n\n"
+    "답변 형식을 다음과 같이 정확히 지켜서 답변해줘:\n"
+    "\n"
+    "여기 [질문 키워드]에 대한 공지사항이 있습니다!\n"
+    "\n"
+    "1. 공지사항 제목: [제목]\n"
+    "\n"
+    "2. 주요 내용 요약: [내용 요약]\n"
+    "\n"
+    "3. 중요 정보: [신청기간, 접수기간, 모집기간, 안내사항 등 공지사항에 포함된 중요 정보]\n"
+    "\n"
+    "4. 신청 방법: [신청/접수 방법이 있는 경우에만 포함]\n"
+    "\n"
+    "5. 공식 링크\n[링크 URL만 정확히 입력]\n"
+    "\n"
+    "[마무리 멘트]\n"
+    "\n"
+    "⚠️ 중요한 규칙: "
+    "• 마크다운 형식(**굵은 글씨**)을 사용하지 말고 일반 텍스트로 답변해줘. "
+    "• 줄바꿈을 적절히 사용해서 가독성을 높여줘. "
+    "• 공지사항에 신청기간이 없으면 '3. 중요 정보'에 다른 중요 정보를 포함해줘. "
+    "• 신청 방법이 없으면 해당 항목을 생략해줘. "
+    "• 검색된 문서 중에서 질문과 관련된 공지사항이 있으면 반드시 답변해줘! "
+    "• 제목에 정확히 일치하지 않아도 내용이 관련되면 답변해줘. "
+    "• 예를 들어 '트랙변경'을 물어보면 제목에 '트랙변경'이 포함된 공지사항을 찾아서 답변해줘. "
+    "• 5. 공식 링크에는 반드시 https://로 시작하는 완전한 URL만 입력해줘. "
+    "\n\n"
+    "📌 내용 작성 규칙:\n"
+    "• 날짜, 시간, 금액, 학점, 장소, 연락처는 검색된 공지사항에 적힌 그대로 옮기고, 공지사항에 없는 내용은 추측해서 만들지 마.\n"
+    "• '이번 주', '다음 달', '오늘까지'처럼 상대적인 표현은 아래 요청별 안내의 오늘 날짜를 기준으로 판단해줘.\n"
+    "• 신청기간이나 마감일이 오늘 날짜보다 지났으면 '신청기간이 종료되었습니다'라고 함께 알려줘.\n"
+    "• 같은 주제의 공지사항이 여러 개면 게시일이 가장 최근인 공지사항을 먼저 안내하고, "
+    "다른 공지사항은 마무리 멘트에서 제목만 짧게 소개해줘.\n"
+    "• 학년도, 학기, 대상(신입생, 재학생, 졸업예정자 등)이 다른 공지사항을 섞어서 하나의 답변으로 만들지 마.\n"
+    "• 주요 내용 요약은 2~3문장으로, 학생이 가장 먼저 알아야 할 내용부터 적어줘.\n"
+    "• 중요 정보가 여러 개면 한 줄에 하나씩 '- '로 시작해서 나열해줘.\n"
+    "• 이전 대화에서 이어지는 질문이면 이전 대화의 주제를 참고해서 어떤 공지사항을 묻는지 판단해줘.\n"
+    "• 질문이 영어로 들어오면 같은 형식으로 영어로 답변하고, 그 밖에는 한국어 존댓말로 답변해줘.\n"
+    "• 개인 정보(학번, 성적, 등록 여부 등)를 확인해 달라는 질문에는 종합정보시스템이나 담당 부서에서 "
+    "직접 확인하도록 안내해줘.\n"
+    "\n"
+    "🧭 질문 의도별 안내 (요청별 안내에 적힌 질문 의도의 항목을 따라줘):\n"
+    f"{INTENT_GUIDE}"
+    "\n"
+    "✍️ 답변 예시 (형식 참고용이며, 내용은 반드시 검색된 공지사항에서 가져와줘):\n"
+    "\n"
+    "여기 수강신청에 대한 공지사항이 있습니다!\n"
+    "\n"
+    "1. 공지사항 제목: 2025학년도 1학기 수강신청 안내\n"
+    "\n"
+    "2. 주요 내용 요약: 2025학년도 1학기 수강신청 일정과 방법을 안내합니다. "
+    "장바구니(예비수강신청) 후 본 수강신청을 진행하며, 학년별로 신청 일자가 다릅니다.\n"
+    "\n"
+    "3. 중요 정보:\n"
+    "- 장바구니 기간: [공지사항의 기간]\n"
+    "- 수강신청 기간: [공지사항의 기간]\n"
+    "- 수강정정 기간: [공지사항의 기간]\n"
+    "\n"
+    "4. 신청 방법: 종합정보시스템 로그인 후 수강신청 메뉴에서 신청합니다.\n"
+    "\n"
+    "5. 공식 링크\n"
+    "https://www.hansung.ac.kr/...\n"
+    "\n"
+    "수강신청 기간을 놓치지 않도록 미리 시간표를 준비해 두세요! 더 궁금한 점이 있으면 언제든 물어봐 주세요.\n"
+    "\n"
+    "검색된 문서가 전혀 관련이 없을 때는 다음과 같이 답변해줘:\n"
+    "\n"
+    "정확한 정보를 찾지 못했습니다. 😅\n\n"
+    "[질문 내용]에 대한 공지사항은 현재 확인할 수 없습니다.\n\n"
+    "한성대학교 (☎760-4219)에 직접 문의하거나, "
+    "한성대학교 공식 홈페이지(https://www.hansung.ac.kr)에서 공지사항을 확인해보세요!\n\n"
+)
+
+# 요청별 부분: 날짜(일 단위), 질문 의도(안내 문장은 고정 앞부분에 있음), 검색 문서 -> 대화 히스토리 -> 질문 순서
+REQUEST_SYSTEM_PROMPT = (
+    "오늘 날짜는 {current_date}입니다. 질문 의도: {intent}\n\n"
+    "--- 검색된 관련 공지사항 ---\n"
+    "{context}"
+    "--- 끝 ---\n"
+)
+
+_QA_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        SystemMessage(content=STATIC_SYSTEM_PROMPT),
+        ("system", REQUEST_SYSTEM_PROMPT),
+        MessagesPlaceholder("chat_history"),
+        ("human", "{input}"),
+    ]
+)
 
 def get_session_history(session_id: str):
-    if session_id not in store:
-        store[session_id] = ChatMessageHistory()
-    return store[session_id]
+    with _store_lock:
+        if session_id not in store:
+            store[session_id] = ChatMessageHistory()
+        return store[session_id]
 
 def _clean_markdown_format(text):
     """
@@ -41,117 +167,140 @@ def _clean_markdown_format(text):
     return text.strip()
 
 def get_llm(model='gpt-4o'):
-    if model not in _llm_cache:
-        api_key = os.getenv("OPENAI_API_KEY")
-        if api_key is not None:
-            api_key = SecretStr(api_key)
-        _llm_cache[model] = ChatOpenAI(model=model, api_key=api_key)
-    return _llm_cache[model]
+    with _llm_cache_lock:
+        if model not in _llm_cache:
+            # LLM_BACKEND=fake: OpenAI 대신 지연 시간만 흉내 내는 모델 (부하 테스트용)
+            if os.getenv('LLM_BACKEND', 'openai').lower() == 'fake':
+                from core.fake_llm import FakeChatModel
+                _llm_cache[model] = FakeChatModel.from_env(model_name=f"fake-{model}")
+                return _llm_cache[model]
+            api_key = os.getenv("OPENAI_API_KEY")
+            if api_key is not None:
+                api_key = SecretStr(api_key)
+            _llm_cache[model] = ChatOpenAI(model=model, api_key=api_key)
+        return _llm_cache[model]
+
+def _record_token_usage(model, response):
+    """LLM 응답의 토큰 사용량을 지표와 현재 span에 기록합니다. (사용량 정보가 없으면 건너뜀)"""
+    usage = getattr(response, 'usage_metadata', None) or {}
+    for kind, key in (('prompt', 'input_tokens'), ('completion', 'output_tokens')):
+        if usage.get(key) is not None:
+            LLM_TOKENS.observe(usage[key], model=model, kind=kind)
+            set_span_attributes(**{f"{kind}_tokens": usage[key]})
+    # 제공자의 프롬프트 접두사 캐시에서 읽은 토큰 수 (STATIC_SYSTEM_PROMPT가 캐시되면 0보다 큼)
+    cached = (usage.get('input_token_details') or {}).get('cache_read')
+    if cached is not None:
+        LLM_TOKENS.observe(cached, model=model, kind='cached_prompt')
+        set_span_attributes(cached_prompt_tokens=cached)
+        logger.info(f"프롬프트 캐시: {cached}/{usage.get('input_tokens')} 토큰 ({model})")
+
+def _generate_answer(user_message, chat_history, intent, confidence):
+    """
+    Retrieval, prompt and LLM call for one question; depends only on the message and chat history,
+    so identical concurrent questions can share it (see _coalescing_key). Returns None when no documents were found.
+    """
+    # Get current date (일 단위 - 같은 날의 요청은 같은 문장)
+    current_date_str = datetime.now().strftime("%Y-%m-%d")
+
+    # Retrieve documents using the enhanced retriever
+    with CHAT_STAGE_SECONDS.time(stage='retrieval'):
+        retrieved_docs = get_retriever(user_message)
+    logger.info(f"Retrieved {len(retrieved_docs)} documents for the query.")
+    set_span_attributes(retrieved=len(retrieved_docs))
+
+    if not retrieved_docs:
+        logger.warning("No documents were retrieved.")
+        return None
+    else:
+        for i, doc in enumerate(retrieved_docs[:3]):
+            logger.info(f"Retrieved Doc {i+1}: {doc.metadata.get('title', 'N/A')}")
+
+    # Create context from documents
+    context = "\n\n".join([doc.page_content for doc in retrieved_docs])
+
+    # Pick the model tier from intent, confidence, rerank score margin and context size
+    choice = get_model_router().choose(intent, confidence, retrieved_docs, context)
+    set_span_attributes(model_tier=choice.tier, model_reason=choice.reason, score_margin=choice.margin,
+                        context_chars=choice.context_chars)
+    llm = get_llm(choice.model)
+
+    qa_prompt = _QA_PROMPT
+
+    # Call the LLM directly
+    with CHAT_STAGE_SECONDS.time(stage='prompt'):
+        messages = qa_prompt.format_messages(
+            input=user_message,
+            chat_history=chat_history,
+            context=context,
+            current_date=current_date_str,
+            intent=intent if intent in INTENT_HINTS else "일반_질문"
+        )
+    with CHAT_STAGE_SECONDS.time(stage='llm'), LLM_SECONDS.time(model=llm.model_name, tier=choice.tier), \
+            start_span('llm.invoke', model=llm.model_name, tier=choice.tier, messages=len(messages)):
+        response = llm.invoke(messages)
+        _record_token_usage(llm.model_name, response)
+    
+    return response.content
 
 def get_ai_response(user_message, session_id="default_session"):
     """
     Gets and processes AI response using enhanced RAG approach with conversation context and intent classification.
+    Each stage is timed into chat_stage_seconds (see /metrics) and traced as spans.
+    Smalltalk and FAQ-type questions are answered by the pre-router (service.pre_router) without calling the LLM.
     """
+    with CHAT_STAGE_SECONDS.time(stage='total'), start_span('get_ai_response', session_id=session_id):
+        return _get_ai_response(user_message, session_id)
+
+def _get_ai_response(user_message, session_id):
     try:
         # Get services
-        llm = get_llm()
         conversation_service = get_conversation_service()
-        intent_classifier = get_intent_classifier()
         
         # Get session history
         session_history = get_session_history(session_id)
         chat_history = session_history.messages
         
+        # Classify user intent and pre-route (smalltalk/FAQ are answered without retrieval or the LLM)
+        with CHAT_STAGE_SECONDS.time(stage='intent'):
+            decision = get_pre_router().route(user_message)
+        intent, confidence = decision.intent, decision.confidence
+        set_span_attributes(intent=intent, intent_confidence=round(confidence, 3), route=decision.route)
+        logger.info(f"Intent classified: {intent} (confidence: {confidence:.2f}, route: {decision.route})")
+
+        if decision.answer is not None:
+            conversation_service.add_to_history(session_id, user_message, decision.answer)
+            session_history.add_user_message(user_message)
+            session_history.add_ai_message(decision.answer)
+            CHAT_REQUESTS.inc(outcome=decision.route)
+            set_span_attributes(outcome=decision.route)
+            return decision.answer
+
         # Get conversation context
         conversation_context = conversation_service.get_context(session_id, max_turns=3)
-        
-        # Classify user intent
-        intent, confidence = intent_classifier.classify_intent(user_message)
-        logger.info(f"Intent classified: {intent} (confidence: {confidence:.2f})")
-        
-        # Get current date
-        current_date_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        # Retrieve documents using the enhanced retriever
-        retrieved_docs = get_retriever(user_message)
-        logger.info(f"Retrieved {len(retrieved_docs)} documents for the query.")
 
-        if not retrieved_docs:
-            logger.warning("No documents were retrieved.")
-            return "정확한 정보를 찾지 못했습니다. 😅\n\n다른 키워드로 다시 물어보시거나, 한성대학교 학생지원센터에 직접 문의해보세요!"
+        # Identical in-flight questions (same normalized text and chat history) share one retrieval + LLM call
+        if is_coalescing_enabled():
+            ai_response, shared = _in_flight.do(
+                _coalescing_key(user_message, chat_history),
+                lambda: _generate_answer(user_message, chat_history, intent, confidence))
         else:
-            for i, doc in enumerate(retrieved_docs[:3]):
-                logger.info(f"Retrieved Doc {i+1}: {doc.metadata.get('title', 'N/A')}")
-
-        # Create context from documents
-        context = "\n\n".join([doc.page_content for doc in retrieved_docs])
+            ai_response, shared = _generate_answer(user_message, chat_history, intent, confidence), False
+        if shared:
+            CHAT_COALESCED.inc()
+            set_span_attributes(coalesced=True)
+            logger.info(f"진행 중인 같은 질문의 응답을 함께 사용 - 세션: {session_id}")
 
-        # Create enhanced system prompt with intent-specific guidance
-        base_prompt = intent_classifier.get_intent_specific_prompt(intent, user_message)
-        
-        system_prompt = (
-            f"{base_prompt} "
-            "반드시 한성대학교 공식 공지사항의 URL을 포함해서, 학생이 바로 클릭할 수 있도록 안내해드리겠습니다. "
-            "\n\n"
-            "답변 형식을 다음과 같이 정확히 지켜서 답변해줘:\n"
-            "\n"
-            "여기 [질문 키워드]에 대한 공지사항이 있습니다!\n"
-            "\n"
-            "1. 공지사항 제목: [제목]\n"
-            "\n"
-            "2. 주요 내용 요약: [내용 요약]\n"
-            "\n"
-            "3. 중요 정보: [신청기간, 접수기간, 모집기간, 안내사항 등 공지사항에 포함된 중요 정보]\n"
-            "\n"
-            "4. 신청 방법: [신청/접수 방법이 있는 경우에만 포함]\n"
-            "\n"
-            "5. 공식 링크\n[링크 URL만 정확히 입력]\n"
-            "\n"
-            "[마무리 멘트]\n"
-            "\n"
-            "⚠️ 중요한 규칙: "
-            "• 마크다운 형식(**굵은 글씨**)을 사용하지 말고 일반 텍스트로 답변해줘. "
-            "• 줄바꿈을 적절히 사용해서 가독성을 높여줘. "
-            "• 공지사항에 신청기간이 없으면 '3. 중요 정보'에 다른 중요 정보를 포함해줘. "
-            "• 신청 방법이 없으면 해당 항목을 생략해줘. "
-            "• 검색된 문서 중에서 질문과 관련된 공지사항이 있으면 반드시 답변해줘! "
-            "• 제목에 정확히 일치하지 않아도 내용이 관련되면 답변해줘. "
-            "• 예를 들어 '트랙변경'을 물어보면 제목에 '트랙변경'이 포함된 공지사항을 찾아서 답변해줘. "
-            "• 5. 공식 링크에는 반드시 https://로 시작하는 완전한 URL만 입력해줘. "
-            "검색된 문서가 전혀 관련이 없을 때는 다음과 같이 답변해줘:\n"
-            "\n"
-            "정확한 정보를 찾지 못했습니다. 😅\n\n"
-            "[질문 내용]에 대한 공지사항은 현재 확인할 수 없습니다.\n\n"
-            "한성대학교 (☎760-4219)에 직접 문의하거나, "
-            "한성대학교 공식 홈페이지(https://www.hansung.ac.kr)에서 공지사항을 확인해보세요!\n\n"
-            "--- 검색된 관련 공지사항 ---\n"
-            "{context}"
-            "--- 끝 ---\n"
-        )
-        
-        qa_prompt = ChatPromptTemplate.from_messages(
-            [
-                ("system", system_prompt),
-                MessagesPlaceholder("chat_history"),
-                ("human", "{input}"),
-            ]
-        )
-        
-        # Call the LLM directly
-        response = llm.invoke(qa_prompt.format_messages(
-            input=user_message,
-            chat_history=chat_history,
-            context=context,
-            current_date=current_date_str
-        ))
-        
-        ai_response = response.content
+        if ai_response is None:
+            CHAT_REQUESTS.inc(outcome='no_documents')
+            set_span_attributes(outcome='no_documents')
+            return "정확한 정보를 찾지 못했습니다. 😅\n\n다른 키워드로 다시 물어보시거나, 한성대학교 학생지원센터에 직접 문의해보세요!"
 
         # 대화 히스토리에 추가
         conversation_service.add_to_history(session_id, user_message, ai_response)
         
         # 마크다운 형식 정리 (불필요한 ** 제거)
-        ai_response = _clean_markdown_format(ai_response)
+        with CHAT_STAGE_SECONDS.time(stage='markdown_cleanup'):
+            ai_response = _clean_markdown_format(ai_response)
 
         # Add messages to session history
         from langchain_core.messages import HumanMessage, AIMessage
@@ -160,11 +309,18 @@ def get_ai_response(user_message, session_id="default_session"):
 
         if not ai_response.strip():
             logger.warning("LLM response was empty.")
+            CHAT_REQUESTS.inc(outcome='empty')
+            set_span_attributes(outcome='empty')
             return "찾은 정보가 부족해서 정확한 답변을 드리기 어렵습니다. 😅\n\n다른 키워드로 다시 물어보시거나, 한성대학교 학생지원센터에 직접 문의해보세요!"
 
+        CHAT_REQUESTS.inc(outcome='answered')
+        set_span_attributes(outcome='answered')
         return ai_response
 
     except Exception as e:
+        CHAT_REQUESTS.inc(outcome='error')
+        set_span_attributes(outcome='error')
+        record_span_exception(e)
         logger.error(f"Error during AI response generation: {e}")
         logger.error(f"Error type: {type(e)}")
         import traceback
@@ -7,6 +7,22 @@ from typing import Dict, List, Tuple
 import re
 from core.logger import logger
 
+# 챗봇 소개 (모든 요청에 같은 문장 - 프롬프트의 고정 앞부분에 사용)
+PERSONA_PROMPT = "당신의 이름은 상상부기이고, 학생들에게 한성대학교 공지사항을 요약해주는 챗봇입니다."
+
+# 의도별 안내 문장 (채팅 프롬프트의 고정 앞부분에 모두 포함 - 바꾸면 프롬프트 캐시가 새로 만들어짐)
+INTENT_HINTS = {
+    "정보_조회": "학생이 정보를 조회하고 있습니다. 정확하고 구체적인 정보를 제공해주세요.",
+    "신청_절차": "학생이 신청 절차를 문의하고 있습니다. 단계별로 명확하게 안내해주세요.",
+    "일정_확인": "학생이 일정을 확인하고 있습니다. 날짜와 시간을 명확하게 안내해주세요.",
+    "문의": "학생이 일반적인 문의를 하고 있습니다. 친근하고 도움이 되는 답변을 제공해주세요.",
+    "장학금": "학생이 장학금 관련 문의를 하고 있습니다. 장학금 종류, 신청 조건, 혜택을 자세히 안내해주세요.",
+    "졸업": "학생이 졸업 관련 문의를 하고 있습니다. 졸업 요건, 절차, 일정을 상세히 안내해주세요.",
+    "수강신청": "학생이 수강신청 관련 문의를 하고 있습니다. 수강신청 방법, 기간, 주의사항을 자세히 안내해주세요.",
+    "계절학기": "학생이 계절학기 관련 문의를 하고 있습니다. 계절학기 수강신청, 일정, 수강료를 상세히 안내해주세요.",
+    "일반_질문": "학생의 질문에 친근하고 정확한 답변을 제공해주세요."
+}
+
 class IntentClassifier:
     def __init__(self):
         # 의도별 키워드 패턴 정의
@@ -144,6 +160,18 @@ class IntentClassifier:
         
         return "일반_질문", 0.5
     
+    def get_intent_hint(self, intent: str) -> str:
+        """
+        의도별 안내 문장을 반환합니다. (채팅 프롬프트에는 모든 의도의 안내가 고정 앞부분에 들어감)
+        
+        Args:
+            intent: 분류된 의도
+            
+        Returns:
+            의도별 안내 문장
+        """
+        return INTENT_HINTS.get(intent, INTENT_HINTS["일반_질문"])
+    
     def get_intent_specific_prompt(self, intent: str, query: str) -> str:
         """
         의도별 최적화된 프롬프트를 생성합니다.
@@ -155,21 +183,7 @@ class IntentClassifier:
         Returns:
             의도별 최적화된 프롬프트
         """
-        base_prompt = "오늘 날짜는 {current_date}입니다. 당신의 이름은 상상부기이고, 학생들에게 한성대학교 공지사항을 요약해주는 챗봇입니다."
-        
-        intent_prompts = {
-            "정보_조회": f"{base_prompt} 학생이 정보를 조회하고 있습니다. 정확하고 구체적인 정보를 제공해주세요.",
-            "신청_절차": f"{base_prompt} 학생이 신청 절차를 문의하고 있습니다. 단계별로 명확하게 안내해주세요.",
-            "일정_확인": f"{base_prompt} 학생이 일정을 확인하고 있습니다. 날짜와 시간을 명확하게 안내해주세요.",
-            "문의": f"{base_prompt} 학생이 일반적인 문의를 하고 있습니다. 친근하고 도움이 되는 답변을 제공해주세요.",
-            "장학금": f"{base_prompt} 학생이 장학금 관련 문의를 하고 있습니다. 장학금 종류, 신청 조건, 혜택을 자세히 안내해주세요.",
-            "졸업": f"{base_prompt} 학생이 졸업 관련 문의를 하고 있습니다. 졸업 요건, 절차, 일정을 상세히 안내해주세요.",
-            "수강신청": f"{base_prompt} 학생이 수강신청 관련 문의를 하고 있습니다. 수강신청 방법, 기간, 주의사항을 자세히 안내해주세요.",
-            "계절학기": f"{base_prompt} 학생이 계절학기 관련 문의를 하고 있습니다. 계절학기 수강신청, 일정, 수강료를 상세히 안내해주세요.",
-            "일반_질문": f"{base_prompt} 학생의 질문에 친근하고 정확한 답변을 제공해주세요."
-        }
-        
-        return intent_prompts.get(intent, intent_prompts["일반_질문"])
+        return f"오늘 날짜는 {{current_date}}입니다. {PERSONA_PROMPT} {self.get_intent_hint(intent)}"
     
     def get_intent_priority(self, intent: str) -> int:
         """
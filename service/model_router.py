@@ -0,0 +1,127 @@
+"""
+모델 라우팅 정책
+요청마다 의도, 분류 신뢰도, 검색 점수 차이, 컨텍스트 크기로 LLM 모델을 고름
+- small: 단순한 의도(기본 일정_확인, 정보_조회)이고, 신뢰도가 충분하고, 1위 문서가 2위보다 확실히 앞서고,
+         컨텍스트가 짧은 요청 -> 작고 빠른 모델
+- default: 그 밖의 모든 요청 -> 기존 모델 (gpt-4o)
+선택 결과는 llm_model_routes_total{tier, reason}, 모델별 소요 시간은 llm_seconds{model, tier},
+토큰 수는 llm_tokens{model, kind}로 기록해 기준값을 조정할 수 있도록 함
+
+설정 (환경변수)
+- LLM_MODEL_TIERS: 등급별 모델 (기본 "default=gpt-4o,small=gpt-4o-mini")
+- MODEL_ROUTING_ENABLED: false면 항상 default
+- MODEL_ROUTING_SIMPLE_INTENTS: small로 보낼 수 있는 의도 (쉼표 구분)
+- MODEL_ROUTING_MIN_CONFIDENCE: 의도 분류 최소 신뢰도 (기본 0.3)
+- MODEL_ROUTING_MIN_MARGIN: 재순위화 점수의 1, 2위 상대 차이 (1위-2위)/1위 최솟값 (기본 0.3)
+- MODEL_ROUTING_MAX_CONTEXT_CHARS: 컨텍스트 최대 글자 수 (기본 4000)
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from core.logger import logger
+from core.metrics import LLM_MODEL_ROUTES
+
+TIER_DEFAULT = 'default'
+TIER_SMALL = 'small'
+
+DEFAULT_MODEL_TIERS = "default=gpt-4o,small=gpt-4o-mini"
+DEFAULT_SIMPLE_INTENTS = "일정_확인,정보_조회"
+
+
+def parse_model_tiers(value: str) -> Dict[str, str]:
+    """'default=gpt-4o,small=gpt-4o-mini' 형식을 {등급: 모델}로 변환합니다."""
+    tiers = {}
+    for item in value.split(','):
+        if not item.strip():
+            continue
+        tier, sep, model = item.partition('=')
+        if not sep or not tier.strip() or not model.strip():
+            raise ValueError(f"LLM_MODEL_TIERS 항목은 '등급=모델' 형식이어야 합니다: '{item.strip()}'")
+        tiers[tier.strip()] = model.strip()
+    if TIER_DEFAULT not in tiers:
+        raise ValueError(f"LLM_MODEL_TIERS에 '{TIER_DEFAULT}' 등급이 필요합니다.")
+    return tiers
+
+
+def score_margin(docs: Sequence) -> float:
+    """
+    재순위화 점수(metadata['rerank_score'])의 1, 2위 상대 차이 (0~1)
+    문서가 하나뿐이면 1.0, 점수가 없으면 0.0
+    """
+    scores = [doc.metadata.get('rerank_score') for doc in docs[:2]]
+    if not scores or scores[0] is None:
+        return 0.0
+    if len(scores) < 2 or scores[1] is None:
+        return 1.0
+    if scores[0] <= 0:
+        return 0.0
+    return max(0.0, (scores[0] - scores[1]) / scores[0])
+
+
+@dataclass(frozen=True)
+class ModelChoice:
+    """선택된 모델과 이유 (reason: simple 또는 default로 보낸 첫 번째 기준)"""
+    tier: str
+    model: str
+    reason: str
+    margin: float
+    context_chars: int
+
+
+class ModelRouter:
+    """요청 특성으로 모델 등급을 고릅니다."""
+
+    def __init__(self, tiers: Dict[str, str], simple_intents: Sequence[str], enabled: bool = True,
+                 min_confidence: float = 0.3, min_margin: float = 0.3, max_context_chars: int = 4000):
+        self.tiers = tiers
+        self.simple_intents = set(simple_intents)
+        self.enabled = enabled and TIER_SMALL in tiers
+        self.min_confidence = min_confidence
+        self.min_margin = min_margin
+        self.max_context_chars = max_context_chars
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        return cls(
+            tiers=parse_model_tiers(os.getenv('LLM_MODEL_TIERS', DEFAULT_MODEL_TIERS)),
+            simple_intents=[i.strip() for i in os.getenv('MODEL_ROUTING_SIMPLE_INTENTS', DEFAULT_SIMPLE_INTENTS).split(',')
+                            if i.strip()],
+            enabled=os.getenv('MODEL_ROUTING_ENABLED', 'true').lower() not in ('0', 'false', 'no'),
+            min_confidence=float(os.getenv('MODEL_ROUTING_MIN_CONFIDENCE', '0.3')),
+            min_margin=float(os.getenv('MODEL_ROUTING_MIN_MARGIN', '0.3')),
+            max_context_chars=int(os.getenv('MODEL_ROUTING_MAX_CONTEXT_CHARS', '4000'))
+        )
+
+    def _reason(self, intent: str, confidence: float, margin: float, context_chars: int) -> str:
+        if not self.enabled:
+            return 'disabled'
+        if intent not in self.simple_intents:
+            return 'intent'
+        if confidence < self.min_confidence:
+            return 'confidence'
+        if margin < self.min_margin:
+            return 'margin'
+        if context_chars > self.max_context_chars:
+            return 'context'
+        return 'simple'
+
+    def choose(self, intent: str, confidence: float, docs: List, context: str) -> ModelChoice:
+        margin = score_margin(docs)
+        reason = self._reason(intent, confidence, margin, len(context))
+        tier = TIER_SMALL if reason == 'simple' else TIER_DEFAULT
+        LLM_MODEL_ROUTES.inc(tier=tier, reason=reason)
+        logger.info(f"모델 선택: {tier} ({self.tiers[tier]}) - {reason} "
+                    f"(의도 {intent} {confidence:.2f}, 점수 차이 {margin:.2f}, 컨텍스트 {len(context)}자)")
+        return ModelChoice(tier, self.tiers[tier], reason, round(margin, 3), len(context))
+
+# 전역 인스턴스
+_model_router: Optional[ModelRouter] = None
+
+def get_model_router() -> ModelRouter:
+    """모델 라우터 인스턴스를 반환합니다."""
+    global _model_router
+    if _model_router is None:
+        _model_router = ModelRouter.from_env()
+    return _model_router
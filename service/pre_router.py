@@ -0,0 +1,335 @@
+"""
+사전 라우터
+get_ai_response 앞에서 LLM이 필요 없는 메시지를 골라 바로 답변
+- smalltalk: 인사, 감사, 작별, 챗봇 소개/사용법 (의도가 일반_질문이고 공지사항 주제어가 없는 짧은 메시지) -> 템플릿 답변
+- faq: 자주 묻는 주제 + FAQ_PATTERNS의 질문어/관점어만으로 된 질문 (예: "수강신청 언제 해요?")
+       -> 검색 스냅샷 버전별로 미리 만들어 둔 (주제, 관점)별 답변 표 (수집 후 스냅샷이 바뀌면 백그라운드에서 다시 생성)
+          관점(일정, 대상, 서류, 방법)을 묻는 질문에는 공지사항 본문에서 그 관점의 문장을 골라 답하고,
+          해당 문장이 없거나 관점이 여러 개면 전체 파이프라인으로 처리
+- rag: 나머지 모든 질문 (기존 전체 파이프라인)
+"""
+
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from core.korean_tokenizer import get_tokenizer
+from core.logger import logger
+from core.metrics import CHAT_ROUTES
+from core.query_expansion.data import FAQ_PATTERNS
+from service.intent_classifier import get_intent_classifier
+
+ROUTE_SMALLTALK = 'smalltalk'
+ROUTE_FAQ = 'faq'
+ROUTE_RAG = 'rag'
+
+# 스몰토크로 볼 최대 길이 (공백, 문장부호 제외)
+SMALLTALK_MAX_LENGTH = 20
+
+
+def _smalltalk_pattern(*phrases: str) -> re.Pattern:
+    """메시지 전체가 phrases로만 이루어졌을 때 맞는 패턴 (다른 말이 남으면 FAQ/전체 파이프라인으로 처리)"""
+    return re.compile(r'^(?:' + '|'.join(phrases) + r')+[!~.?ㅎㅋ]*$')
+
+
+SMALLTALK_TEMPLATES = [
+    (_smalltalk_pattern('안녕', '안녕하세요', '안녕하십니까', '안뇽', '하이', 'hi', 'hello', '헬로',
+                        '반가워요?', '반갑습니다'),
+     "안녕하세요! 저는 한성대학교 공지사항을 알려드리는 상상부기예요. 🐢\n\n"
+     "수강신청, 장학금, 졸업, 계절학기처럼 궁금한 공지사항을 물어봐 주세요!"),
+    (_smalltalk_pattern('(?:정말|진짜|너무|매우)?(?:고마워요?|고맙습니다|감사합니다|감사해요)', '땡큐', 'thanks?(?:you)?'),
+     "도움이 되었다니 기뻐요! 😊\n\n또 궁금한 공지사항이 있으면 언제든 물어봐 주세요!"),
+    (_smalltalk_pattern('잘있어요?', '안녕히(?:계세요|가세요)', '바이바이', 'bye', '다음에봐요?',
+                        '수고하세요', '수고했어요?', '수고하셨습니다'),
+     "다음에 또 만나요! 👋\n\n궁금한 공지사항이 생기면 언제든 찾아주세요!"),
+    (_smalltalk_pattern('(?:너|넌|너는)?누구(?:야|세요|니)', '(?:너|네)?이름이뭐(?:야|예요|에요|니)?',
+                        '(?:너는|넌)뭐(?:야|니)?', '정체가뭐(?:야|니)?'),
+     "저는 한성대학교 공지사항을 요약해 드리는 챗봇 상상부기예요. 🐢\n\n"
+     "공지사항 제목, 주요 내용, 신청 방법과 공식 링크를 함께 안내해 드려요!"),
+    (_smalltalk_pattern('(?:너는|넌|너)?(?:뭐|무엇을|뭘)할수있(?:어|어요|니|나요|습니까)?', '사용법', '도움말',
+                        '어떻게써(?:요)?'),
+     "한성대학교 공지사항을 찾아 요약해 드릴 수 있어요!\n\n"
+     "예를 들어 '수강신청 기간 알려줘', '국가장학금 신청 방법', '졸업요건 확인'처럼 물어봐 주세요."),
+]
+
+
+@dataclass(frozen=True)
+class FaqEntry:
+    """자주 묻는 주제: keywords 중 하나가 있고, 나머지는 질문어/관점어뿐인 질문에 답변"""
+    key: str
+    label: str
+    keywords: tuple
+    query: str              # 답변할 공지사항을 찾을 검색어
+
+
+FAQ_ENTRIES = [
+    FaqEntry('course_registration', '수강신청', ('수강신청',), '수강신청 일정 안내'),
+    FaqEntry('national_scholarship', '국가장학금', ('국가장학금',), '국가장학금 신청 안내'),
+    FaqEntry('graduation_requirements', '졸업요건', ('졸업요건',), '졸업요건 확인 안내'),
+    FaqEntry('leave_of_absence', '휴학', ('휴학',), '휴학 신청 안내'),
+    FaqEntry('return_to_school', '복학', ('복학',), '복학 신청 안내'),
+    FaqEntry('seasonal_semester', '계절학기', ('계절학기',), '계절학기 수강신청 안내'),
+    FaqEntry('course_evaluation', '강의평가', ('강의평가',), '강의평가 실시 안내'),
+    FaqEntry('tuition', '등록금', ('등록금',), '등록금 납부 안내'),
+]
+
+
+
+@dataclass(frozen=True)
+class FaqAspect:
+    """질문의 관점: words 중 하나가 질문에 있으면 본문에서 pattern에 맞는 문장으로 답변"""
+    key: str
+    label: str
+    words: tuple
+    pattern: re.Pattern
+
+
+FAQ_ASPECTS = [
+    FaqAspect('schedule', '일정', ('언제', '일정', '기간', '날짜', '시기', '마감일', '마감'),
+              re.compile(r'일정|기간|마감|\d{1,2}\s*[./월]\s*\d{1,2}')),
+    FaqAspect('eligibility', '대상', ('누가', '대상', '자격', '조건', '신청자', '대상자'),
+              re.compile(r'대상|자격|조건|해당자|재학생|신입생|휴학생|졸업예정자')),
+    FaqAspect('documents', '서류', ('서류', '필요서류', '제출서류', '준비물'),
+              re.compile(r'서류|증명서|신청서|사본|첨부')),
+    FaqAspect('method', '방법', ('어떻게', '어디서', '어디', '방법', '절차', '과정', '순서', '신청방법', '장소', '위치'),
+              re.compile(r'방법|절차|접속|홈페이지|종합정보시스템|방문|경로|메뉴')),
+]
+
+# FAQ 질문에 주제어 외에 있어도 되는 말: FAQ_PATTERNS의 질문어와 관점어, 일반적인 서술어
+FAQ_ALLOWED_WORDS = (
+    set(FAQ_PATTERNS) | {word for words in FAQ_PATTERNS.values() for word in words}
+    | {word for aspect in FAQ_ASPECTS for word in aspect.words}
+    | {'신청', '안내', '공지', '공지사항', '하다', '되다', '있다', '알다', '알리다', '주다', '해주다', '어디',
+       '어떻다', '뭐', '무엇', '언제', '이번', '다음', '해요', '해줘', '알려줘', '알려주세요', '하나요', '인가요'}
+)
+
+
+def _is_allowed_word(word: str) -> bool:
+    """허용 단어이거나 허용 단어에 조사가 붙은 형태 (예: 신청은, 어디서)"""
+    return word in FAQ_ALLOWED_WORDS or any(len(a) > 1 and word.startswith(a) for a in FAQ_ALLOWED_WORDS)
+
+
+def is_pre_router_enabled() -> bool:
+    return os.getenv('PRE_ROUTER_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+
+
+def _compact(text: str) -> str:
+    """공백, 문장부호, 이모지, 반복 자음(ㅎㅎ, ㅋㅋ)을 뺀 소문자 문자열"""
+    text = re.sub(r'[ㄱ-ㅎㅏ-ㅣ]+', '', text.lower())
+    return re.sub(r'[^\w]', '', text)
+
+
+@dataclass
+class RouteDecision:
+    """사전 라우팅 결과 (answer가 있으면 LLM 없이 바로 응답)"""
+    route: str
+    intent: str
+    confidence: float
+    answer: Optional[str] = None
+    faq_key: Optional[str] = None
+
+
+@dataclass
+class FaqAnswer:
+    entry: FaqEntry
+    aspect: Optional[FaqAspect]
+    title: str
+    link: str
+    answer: str
+
+
+@dataclass
+class FaqAnswerTable:
+    """검색 스냅샷 한 버전에 대해 미리 만든 FAQ 답변 ((주제 key, 관점 key 또는 None) -> 답변)"""
+    version: Optional[int]
+    answers: Dict[Tuple[str, Optional[str]], FaqAnswer] = field(default_factory=dict)
+    built_at: datetime = field(default_factory=datetime.now)
+
+
+def _truncate(text: str, limit: int) -> str:
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text if len(text) <= limit else text[:limit].rstrip() + "..."
+
+
+def _content(page_content: str) -> str:
+    """업로드 문서 형식(Title/Link/Content)에서 본문만 반환"""
+    return page_content.split("Content:", 1)[-1].strip()
+
+
+def _summary(page_content: str, limit: int = 150) -> str:
+    """본문 앞부분을 요약 대신 사용"""
+    return _truncate(_content(page_content), limit)
+
+
+def _aspect_summary(page_content: str, aspect: FaqAspect, limit: int = 150) -> Optional[str]:
+    """본문을 문장(또는 항목) 단위로 나눠 관점에 맞는 문장만 이어 붙입니다. (없으면 None)"""
+    sentences = re.split(r'(?<=[가-힣A-Za-z)][.!?])\s+|\n+|\s*[※○●■▶□◦·]\s*', _content(page_content))
+    matched = [sentence for sentence in sentences if sentence.strip() and aspect.pattern.search(sentence)]
+    return _truncate(" ".join(matched), limit) if matched else None
+
+
+def build_faq_answer(entry: FaqEntry, docs, aspect: Optional[FaqAspect] = None) -> Optional[FaqAnswer]:
+    """
+    검색 결과(관련도, 최신순으로 정렬됨) 중 제목에 주제어가 있는 첫 공지사항으로 답변을 만듭니다.
+    aspect가 있으면 본문에서 그 관점의 문장으로 답합니다.
+    해당하는 공지사항(또는 관점의 문장)이 없으면 None (그 질문은 전체 파이프라인으로 처리)
+    """
+    doc = next((doc for doc in docs if any(keyword in doc.metadata.get('title', '') for keyword in entry.keywords)), None)
+    if doc is None:
+        return None
+    if aspect is None:
+        subject, summary = entry.label, f"주요 내용 요약: {_summary(doc.page_content)}"
+    else:
+        content = _aspect_summary(doc.page_content, aspect)
+        if content is None:
+            return None
+        subject, summary = f"{entry.label} {aspect.label}", f"{aspect.label} 관련 내용: {content}"
+    title, link = doc.metadata.get('title', ''), doc.metadata.get('link', '')
+    answer = (
+        f"여기 {subject}에 대한 공지사항이 있습니다!\n\n"
+        f"1. 공지사항 제목: {title}\n\n"
+        f"2. {summary}\n\n"
+        f"3. 공식 링크\n{link}\n\n"
+        "더 자세한 내용이 궁금하면 구체적으로 물어봐 주세요!"
+    )
+    return FaqAnswer(entry, aspect, title, link, answer)
+
+
+class PreRouter:
+    """
+    메시지를 smalltalk / faq / rag로 나눕니다.
+    FAQ 답변 표는 현재 검색 스냅샷 버전과 다르면 백그라운드에서 다시 만들고,
+    만드는 동안에는 이전 표를 사용합니다. (표가 아직 없으면 전체 파이프라인으로 처리)
+    """
+
+    def __init__(self, entries: Optional[List[FaqEntry]] = None):
+        self.entries = entries if entries is not None else FAQ_ENTRIES
+        self.intent_classifier = get_intent_classifier()
+        self._table: Optional[FaqAnswerTable] = None
+        self._building = False
+        self._lock = threading.Lock()
+        # 요청은 스레드 풀에서 동시에 처리되므로 경로별 처리 수는 잠금 안에서 갱신
+        self._counts_lock = threading.Lock()
+        self.counts = {ROUTE_SMALLTALK: 0, ROUTE_FAQ: 0, ROUTE_RAG: 0}
+
+    # Step 1: 스몰토크
+    def _smalltalk_answer(self, message: str, intent: str) -> Optional[str]:
+        compact = _compact(message)
+        if not compact or len(compact) > SMALLTALK_MAX_LENGTH or intent != "일반_질문":
+            return None
+        for pattern, answer in SMALLTALK_TEMPLATES:
+            if pattern.match(compact):
+                return answer
+        return None
+
+    # Step 2: FAQ
+    def match_faq(self, message: str) -> Optional[Tuple[FaqEntry, Optional[FaqAspect]]]:
+        """
+        주제어 하나와 질문어/관점어만으로 된 질문이면 (FAQ 항목, 관점)을 반환합니다.
+        관점어가 없으면 관점은 None, 관점이 여러 개면 FAQ로 답하지 않음
+        """
+        compact = _compact(message)
+        entry = next((e for e in self.entries if any(k in compact for k in e.keywords)), None)
+        if entry is None:
+            return None
+        keywords = set(get_tokenizer().extract_keywords(message))
+        rest = {word for word in keywords if not any(word in k or k in word for k in entry.keywords)}
+        if not all(_is_allowed_word(word) for word in rest):
+            return None
+        for keyword in entry.keywords:
+            compact = compact.replace(keyword, '')
+        aspects = [aspect for aspect in FAQ_ASPECTS if any(word in compact for word in aspect.words)]
+        if len(aspects) > 1:
+            return None
+        return entry, aspects[0] if aspects else None
+
+    def _faq_answer(self, entry: FaqEntry, aspect: Optional[FaqAspect]) -> Optional[str]:
+        table = self._current_table()
+        answer = table.answers.get((entry.key, aspect.key if aspect else None)) if table else None
+        return answer.answer if answer else None
+
+    def _current_table(self) -> Optional[FaqAnswerTable]:
+        from core.hybrid_search import get_search_snapshot
+        snapshot = get_search_snapshot()
+        version = snapshot.version if snapshot else None
+        table = self._table
+        if table is None or (version is not None and table.version != version):
+            self._refresh_async(version)
+        return table
+
+    def _refresh_async(self, version: Optional[int]):
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+        threading.Thread(target=self.refresh, args=(version,), name="faq-answer-table", daemon=True).start()
+
+    def refresh(self, version: Optional[int] = None) -> FaqAnswerTable:
+        """FAQ 항목마다 한 번 검색해 (주제, 관점)별 답변 표를 새로 만들고 교체합니다."""
+        from service.rag_service import get_retriever
+        try:
+            table = FaqAnswerTable(version)
+            for entry in self.entries:
+                try:
+                    docs = get_retriever(entry.query)
+                except Exception as e:
+                    logger.warning(f"FAQ 답변 생성 실패 ({entry.key}): {e}")
+                    continue
+                for aspect in [None] + FAQ_ASPECTS:
+                    answer = build_faq_answer(entry, docs, aspect)
+                    if answer is not None:
+                        table.answers[(entry.key, aspect.key if aspect else None)] = answer
+            self._table = table
+            logger.info(f"FAQ 답변 표 생성: {len(table.answers)}개 "
+                        f"(주제 {len(self.entries)}개 x 관점 {len(FAQ_ASPECTS) + 1}개, 검색 스냅샷 v{version})")
+            return table
+        finally:
+            with self._lock:
+                self._building = False
+
+    def route(self, message: str) -> RouteDecision:
+        intent, confidence = self.intent_classifier.classify_intent(message)
+        decision = RouteDecision(ROUTE_RAG, intent, confidence)
+        if is_pre_router_enabled():
+            answer = self._smalltalk_answer(message, intent)
+            if answer is not None:
+                decision.route, decision.answer = ROUTE_SMALLTALK, answer
+            else:
+                match = self.match_faq(message)
+                answer = self._faq_answer(*match) if match else None
+                if answer is not None:
+                    entry, aspect = match
+                    decision.route, decision.answer = ROUTE_FAQ, answer
+                    decision.faq_key = f"{entry.key}/{aspect.key}" if aspect else entry.key
+        with self._counts_lock:
+            self.counts[decision.route] += 1
+        CHAT_ROUTES.inc(route=decision.route)
+        return decision
+
+    def stats(self) -> dict:
+        """경로별 처리 수와 LLM 호출을 건너뛴 수"""
+        with self._counts_lock:
+            counts = dict(self.counts)
+        total = sum(counts.values())
+        avoided = counts[ROUTE_SMALLTALK] + counts[ROUTE_FAQ]
+        table = self._table
+        return {
+            **counts,
+            'llm_calls_avoided': avoided,
+            'avoided_ratio': round(avoided / total, 3) if total else 0.0,
+            'faq_table_version': table.version if table else None,
+            'faq_answers': len(table.answers) if table else 0,
+        }
+
+# 전역 인스턴스
+_pre_router = None
+
+def get_pre_router() -> PreRouter:
+    """사전 라우터 인스턴스를 반환합니다."""
+    global _pre_router
+    if _pre_router is None:
+        _pre_router = PreRouter()
+    return _pre_router
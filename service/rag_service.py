@@ -1,31 +1,34 @@
-from core.vectorstore import get_vectorstore
+from core.vectorstore import search_documents
 from core.hybrid_search import get_hybrid_search_engine
 from core.korean_tokenizer import get_tokenizer
 from core.query_expansion import get_query_expansion
 from core.logger import logger
+from core.metrics import RETRIEVAL_CANDIDATES, RETRIEVAL_STAGE_SECONDS
+from core.tracing import set_span_attributes, start_span, traced
 
+@traced('get_retriever')
 def get_retriever(user_message):
     """
     향상된 검색: 하이브리드 서치, 쿼리 확장, 재순위화를 통한 정확도 향상
+    단계별 소요 시간과 후보 수는 retrieval_stage_seconds / retrieval_candidates 지표로 기록
     """
     try:
         # 하이브리드 서치 사용 (벡터 + BM25)
         hybrid_engine = get_hybrid_search_engine()
-        hybrid_results = hybrid_engine.search(user_message, top_k=8, alpha=0.6)
+        with RETRIEVAL_STAGE_SECONDS.time(stage='hybrid_search'):
+            hybrid_results = hybrid_engine.search(user_message, top_k=8, alpha=0.6)
         
         # 쿼리 확장을 통한 추가 검색
         query_expansion = get_query_expansion()
-        expanded_queries = query_expansion.expand_query(user_message)
+        with RETRIEVAL_STAGE_SECONDS.time(stage='query_expansion'):
+            expanded_queries = query_expansion.expand_query(user_message)
         logger.info(f"쿼리 확장: '{user_message}' -> {expanded_queries}")
         
         # 확장된 쿼리로 추가 검색
-        vectorstore = get_vectorstore()
         additional_docs = []
-        for query in expanded_queries[:2]:  # 상위 2개 확장 쿼리만 사용
-            search_kwargs = {"k": 5}
-            retriever = vectorstore.as_retriever(search_kwargs=search_kwargs)
-            docs = retriever.invoke(query)
-            additional_docs.extend(docs)
+        with RETRIEVAL_STAGE_SECONDS.time(stage='expansion_search'):
+            for query in expanded_queries[:2]:  # 상위 2개 확장 쿼리만 사용
+                additional_docs.extend(search_documents(query, 5))
         
         # 하이브리드 결과를 LangChain Document 형식으로 변환
         from langchain_core.documents import Document
@@ -44,22 +47,32 @@ def get_retriever(user_message):
         unique_docs = _remove_duplicates(all_docs)
         
         # 향상된 재순위화
-        re_ranked_docs = _re_rank_by_keywords(unique_docs, user_message)
-        
+        with RETRIEVAL_STAGE_SECONDS.time(stage='rerank'):
+            re_ranked_docs = _re_rank_by_keywords(unique_docs, user_message)
+        
+        RETRIEVAL_CANDIDATES.observe(len(hybrid_results), source='hybrid')
+        RETRIEVAL_CANDIDATES.observe(len(additional_docs), source='expansion')
+        RETRIEVAL_CANDIDATES.observe(len(unique_docs), source='unique')
+        RETRIEVAL_CANDIDATES.observe(min(len(re_ranked_docs), 5), source='returned')
+        set_span_attributes(
+            hybrid_candidates=len(hybrid_results), expansion_candidates=len(additional_docs),
+            unique_candidates=len(unique_docs), returned=min(len(re_ranked_docs), 5)
+        )
         logger.info(f"하이브리드 검색 완료: {len(hybrid_results)}개 하이브리드 결과, {len(additional_docs)}개 추가 결과")
         
         return re_ranked_docs[:5]
         
     except Exception as e:
         logger.error(f"하이브리드 검색 실패, 벡터 검색으로 폴백: {e}")
+        set_span_attributes(fallback=True, error=str(e))
         # 실패 시 기존 벡터 검색 사용
-        return _fallback_vector_search(user_message)
+        with RETRIEVAL_STAGE_SECONDS.time(stage='fallback'):
+            return _fallback_vector_search(user_message)
 
 def _fallback_vector_search(user_message):
     """
     하이브리드 검색 실패 시 사용하는 벡터 검색 폴백
     """
-    vectorstore = get_vectorstore()
     query_expansion = get_query_expansion()
     
     # 쿼리 확장
@@ -68,10 +81,7 @@ def _fallback_vector_search(user_message):
     # 다중 쿼리 검색
     all_docs = []
     for query in expanded_queries[:3]:
-        search_kwargs = {"k": 8}
-        retriever = vectorstore.as_retriever(search_kwargs=search_kwargs)
-        docs = retriever.invoke(query)
-        all_docs.extend(docs)
+        all_docs.extend(search_documents(query, 8))
     
     # 중복 제거 및 재순위화
     unique_docs = _remove_duplicates(all_docs)
@@ -105,14 +115,10 @@ def _re_rank_by_keywords(docs, query):
     normalized_query = tokenizer.normalize_query(query)
     query_keywords = tokenizer.extract_keywords(normalized_query)
     
-    def calculate_enhanced_score(doc):
+    def calculate_enhanced_score(doc, title_keywords, content_keywords):
         title = doc.metadata.get('title', '')
         content = doc.page_content
         
-        # 제목과 내용에서 키워드 추출
-        title_keywords = tokenizer.extract_keywords(title)
-        content_keywords = tokenizer.extract_keywords(content)
-        
         # 1. 제목 키워드 매칭 점수 (가중치: 0.35)
         title_semantic_score = tokenizer.calculate_semantic_similarity(query_keywords, title_keywords) * 0.35
         
@@ -129,14 +135,26 @@ def _re_rank_by_keywords(docs, query):
         
         return total_score
     
+    with start_span('rerank', candidates=len(docs)):
+        # 제목과 내용에서 키워드 추출 (형태소 분석은 제목, 내용 각각 한 번의 배치로)
+        title_keywords = tokenizer.extract_keywords_batch([doc.metadata.get('title', '') for doc in docs])
+        content_keywords = tokenizer.extract_keywords_batch([doc.page_content for doc in docs])
+        scores = [
+            calculate_enhanced_score(doc, title_kw, content_kw)
+            for doc, title_kw, content_kw in zip(docs, title_keywords, content_keywords)
+        ]
+    
     # 향상된 점수로 정렬
-    re_ranked = sorted(docs, key=calculate_enhanced_score, reverse=True)
+    ranked = sorted(zip(scores, range(len(docs))), key=lambda item: item[0], reverse=True)
+    re_ranked = [docs[index] for _, index in ranked]
+    # 모델 라우팅(service.model_router)이 1, 2위 점수 차이를 볼 수 있도록 기록 (메타데이터는 요청별 복사본)
+    for score, index in ranked:
+        docs[index].metadata['rerank_score'] = round(score, 4)
     
     # 로그로 재순위화 결과 기록
     logger.info(f"검색 쿼리: '{query}' -> 정규화: '{normalized_query}' -> 키워드: {query_keywords}")
-    for i, doc in enumerate(re_ranked[:3], 1):
-        score = calculate_enhanced_score(doc)
-        title = doc.metadata.get('title', '제목 없음')
+    for i, (score, index) in enumerate(ranked[:3], 1):
+        title = docs[index].metadata.get('title', '제목 없음')
         logger.info(f"  {i}위: {title} (점수: {score:.3f})")
     
     return re_ranked
@@ -179,11 +197,7 @@ def get_retriever_for_chain():
     This function takes a query string and returns documents.
     """
     def retriever_function(query: str):
-        vectorstore = get_vectorstore()
-        search_kwargs = {"k": 10}
-        retriever = vectorstore.as_retriever(search_kwargs=search_kwargs)
-
-        docs = retriever.invoke(query)
+        docs = search_documents(query, 10)
         logger.info(f"Retrieved {len(docs)} documents for query: '{query}'")
 
         # Re-ranking
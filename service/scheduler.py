@@ -0,0 +1,270 @@
+"""
+작업 스케줄러
+- 일정: 고정 간격(IntervalSchedule) 또는 cron 식(CronSchedule, "분 시 일 월 요일")
+- 작업 큐: 작업 스레드 하나가 큐의 작업을 차례로 실행 (수집 파이프라인은 동시에 하나만 실행)
+- 작업(Job)은 id로 조회하며, 실행 중에는 진행 상황을 함께 제공
+대기는 모두 threading.Event로 하므로 stop()이 즉시 깨울 수 있음
+"""
+
+import queue
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, List, Optional, Set
+
+from core.logger import logger
+
+# 작업 상태
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_SUCCEEDED = 'succeeded'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+
+# 보관하는 최근 작업 수
+DEFAULT_JOB_HISTORY = 50
+
+
+class IntervalSchedule:
+    """initial_delay 뒤 첫 실행, 이후 interval마다 실행"""
+
+    def __init__(self, interval: timedelta, initial_delay: Optional[timedelta] = None):
+        self.interval = interval
+        self.initial_delay = interval if initial_delay is None else initial_delay
+
+    def next_run(self, now: datetime, last_run: Optional[datetime] = None) -> datetime:
+        if last_run is None:
+            return now + self.initial_delay
+        return max(now, last_run + self.interval)
+
+    def describe(self) -> str:
+        return f"every {self.interval.total_seconds() / 3600:g}h"
+
+
+class CronSchedule:
+    """
+    cron 식 일정 ("분 시 일 월 요일", 요일은 0/7=일요일)
+    각 필드는 *, */n, a-b, a-b/n, a,b,c 형식을 지원합니다.
+    """
+    _RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron 식은 5개 필드(분 시 일 월 요일)여야 합니다: {expression}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            self._parse_field(value, low, high) for value, (low, high) in zip(fields, self._RANGES)
+        )
+        self.weekdays = {day % 7 for day in weekdays}
+        # 일과 요일을 모두 지정하면 둘 중 하나만 맞아도 실행 (cron 규칙)
+        self._any_day = fields[2] == '*'
+        self._any_weekday = fields[4] == '*'
+
+    @staticmethod
+    def _parse_field(value: str, low: int, high: int) -> Set[int]:
+        result = set()
+        for part in value.split(','):
+            step = 1
+            if '/' in part:
+                part, step_text = part.split('/', 1)
+                step = int(step_text)
+            if part == '*':
+                start, end = low, high
+            elif '-' in part:
+                start, end = (int(v) for v in part.split('-', 1))
+            else:
+                start = end = int(part)
+            if start < low or end > high or start > end or step < 1:
+                raise ValueError(f"cron 필드 범위 오류: {value} ({low}-{high})")
+            result.update(range(start, end + 1, step))
+        return result
+
+    def _day_matches(self, day: datetime) -> bool:
+        in_days = day.day in self.days
+        in_weekdays = (day.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return in_days and in_weekdays
+        return in_days or in_weekdays
+
+    def next_run(self, now: datetime, last_run: Optional[datetime] = None) -> datetime:
+        t = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + timedelta(days=366 * 4)
+        while t < limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+            elif t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+            elif t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+            else:
+                return t
+        raise ValueError(f"cron 식에 해당하는 실행 시각이 없습니다: {self.expression}")
+
+    def describe(self) -> str:
+        return f"cron {self.expression}"
+
+
+@dataclass
+class Job:
+    """큐에 넣은 작업 한 건"""
+    name: str
+    trigger: str                                   # 'schedule' 또는 'manual'
+    target: Callable[["Job"], Any] = field(repr=False)
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    status: str = JOB_QUEUED
+    created_at: datetime = field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    result: Optional[dict] = None
+    # 실행 중 진행 상황을 돌려주는 함수 (작업이 실행되면서 설정)
+    progress: Optional[Callable[[], dict]] = field(default=None, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in (JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED)
+
+    @property
+    def seconds(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        return ((self.finished_at or datetime.now()) - self.started_at).total_seconds()
+
+    def to_dict(self) -> dict:
+        data = {
+            'id': self.id,
+            'name': self.name,
+            'trigger': self.trigger,
+            'status': self.status,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'seconds': round(self.seconds, 3) if self.seconds is not None else None,
+            'error': self.error,
+            'result': self.result,
+        }
+        if self.status == JOB_RUNNING and self.progress is not None:
+            try:
+                data['progress'] = self.progress()
+            except Exception as e:
+                data['progress'] = {'error': str(e)}
+        return data
+
+
+class JobQueue:
+    """
+    작업 스레드 하나로 작업을 차례로 실행하는 큐
+    - submit(): 같은 이름의 작업이 이미 대기 중이면 새로 넣지 않고 그 작업을 반환
+    - 최근 history개의 작업을 id로 조회할 수 있게 보관
+    """
+
+    def __init__(self, history: int = DEFAULT_JOB_HISTORY):
+        self.history = history
+        self._queue: "queue.Queue[Job]" = queue.Queue()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self.current: Optional[Job] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        # 멈추는 중이던 작업 스레드가 아직 작업을 실행 중이면 그 스레드를 계속 사용
+        self._stopping.clear()
+        if self.is_running:
+            return
+        self._thread = threading.Thread(target=self._worker, name="job-queue", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> bool:
+        """
+        대기 중인 작업을 취소하고 작업 스레드를 멈춥니다.
+        실행 중인 작업은 timeout초까지 끝나기를 기다리며, 작업 스레드가 끝났으면 True를 반환합니다.
+        """
+        with self._lock:
+            for job in self._jobs.values():
+                if job.status == JOB_QUEUED:
+                    job.status = JOB_CANCELLED
+                    job.finished_at = datetime.now()
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            if self._thread.is_alive():
+                logger.warning(f"실행 중인 작업이 {timeout:g}초 안에 끝나지 않아 작업 스레드를 기다리지 않고 중지합니다.")
+                return False
+        return True
+
+    def submit(self, name: str, target: Callable[[Job], Any], trigger: str = 'manual') -> Job:
+        with self._lock:
+            for job in self._jobs.values():
+                if job.name == name and job.status == JOB_QUEUED:
+                    return job
+            job = Job(name, trigger, target)
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.history:
+                oldest = next(iter(self._jobs.values()))
+                if not oldest.done:
+                    break
+                self._jobs.popitem(last=False)
+        self._queue.put(job)
+        logger.info(f"작업 등록: {name} ({job.id}, {trigger})")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def _worker(self):
+        while not self._stopping.is_set():
+            try:
+                job = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            with self._lock:
+                if job.status != JOB_QUEUED:
+                    continue
+                self.current = job
+                job.status = JOB_RUNNING
+                job.started_at = datetime.now()
+            try:
+                job.target(job)
+                if job.status == JOB_RUNNING:
+                    job.status = JOB_SUCCEEDED
+            except Exception as e:
+                job.status = JOB_FAILED
+                job.error = str(e)
+                logger.error(f"작업 실패: {job.name} ({job.id}): {e}")
+            finally:
+                job.finished_at = datetime.now()
+                job.progress = None
+                self.current = None
+
+
+def parse_schedule(expression: str, initial_delay: Optional[timedelta] = None):
+    """
+    일정 문자열을 해석합니다.
+    - "0 */6 * * *" 처럼 필드 5개이면 cron 식
+    - "6h", "30m", "90s" 또는 숫자(시간)이면 고정 간격
+    """
+    expression = expression.strip()
+    if len(expression.split()) == 5:
+        return CronSchedule(expression)
+    units = {'h': 'hours', 'm': 'minutes', 's': 'seconds'}
+    if expression[-1:].lower() in units:
+        interval = timedelta(**{units[expression[-1].lower()]: float(expression[:-1])})
+    else:
+        interval = timedelta(hours=float(expression))
+    return IntervalSchedule(interval, initial_delay)
+
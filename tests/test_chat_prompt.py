@@ -0,0 +1,20 @@
+import pytest
+
+from service.chat_service import PROMPT_CACHE_MIN_TOKENS, STATIC_SYSTEM_PROMPT
+from service.model_router import DEFAULT_MODEL_TIERS, parse_model_tiers
+
+tiktoken = pytest.importorskip('tiktoken')
+
+
+@pytest.mark.parametrize('model', sorted(set(parse_model_tiers(DEFAULT_MODEL_TIERS).values())))
+def test_static_prefix_is_long_enough_for_prompt_caching(model):
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except Exception as e:
+        pytest.skip(f"{model} 토크나이저를 불러올 수 없습니다: {e}")
+    assert len(encoding.encode(STATIC_SYSTEM_PROMPT)) >= PROMPT_CACHE_MIN_TOKENS
+
+
+def test_static_prefix_has_no_request_placeholders():
+    # 요청마다 바뀌는 값이 고정 앞부분에 들어가면 캐시가 적중하지 않음
+    assert '{' not in STATIC_SYSTEM_PROMPT
@@ -0,0 +1,36 @@
+import pytest
+
+from service.pre_router import ROUTE_RAG, ROUTE_SMALLTALK, PreRouter
+
+
+@pytest.fixture
+def router(monkeypatch):
+    router = PreRouter()
+    # FAQ 답변 표 없이 (검색/백그라운드 생성 없이) 라우팅만 확인
+    monkeypatch.setattr(router, '_current_table', lambda: None)
+    return router
+
+
+@pytest.mark.parametrize('message', [
+    "안녕하세요!",
+    "안녕 ㅎㅎ",
+    "고마워",
+    "정말 감사합니다~",
+    "바이바이",
+    "수고하세요",
+    "너 누구야?",
+    "뭐 할 수 있어?",
+])
+def test_smalltalk(router, message):
+    assert router.route(message).route == ROUTE_SMALLTALK
+
+
+@pytest.mark.parametrize('message', [
+    "고마워 그럼 휴학은?",
+    "감사합니다 복학 신청 언제?",
+    "감사원 공지 있어?",
+    "바이트 단위로 뭐야",
+    "하이브리드 수업 공지",
+])
+def test_smalltalk_with_question_goes_to_rag(router, message):
+    assert router.route(message).route == ROUTE_RAG
@@ -1,25 +1,30 @@
-import mysql.connector
-import time
+#!/usr/bin/env python3
+"""
+한성대학교 챗봇 전체 벡터 DB 업로드 스크립트
+swpre 전체를 확인하되, 본문 해시가 벡터와 함께 저장된 해시와 같고 벡터스토어에 실제로 있는 공지사항은 임베딩/업로드를 건너뜀
+벡터 id는 swpre.id로 고정되어 재실행해도 벡터가 중복되지 않음
+
+실행: python upload.py [--force]
+      python upload.py --bulk [--batch-size 64] [--workers 4] [--restart]   # 대량 백필
+"""
+
+import argparse
+import os
 from datetime import datetime
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_pinecone import PineconeVectorStore
 from dotenv import load_dotenv
-import os
 from pinecone import Pinecone, ServerlessSpec
-from langchain_core.embeddings import Embeddings
+from core.db import connect_db
+from core.schema import EMPTY_CONTENT_SQL, ensure_schema
+from core.ingestion import NoticeRecord, EmbedStage, UpsertStage
+from core.ingestion.bulk import BulkUploader, UploadCheckpoint, DEFAULT_BATCH_SIZE, DEFAULT_UPSERT_WORKERS
+from core.vectorstore import find_stored_ids, get_vectorstore_backend, get_pinecone_index_name
 
 load_dotenv()
 
-class Document:
-    def __init__(self, page_content, metadata=None, id=None):
-        self.page_content = page_content
-        self.metadata = metadata if metadata is not None else {}
-        self.id = id
-
 # Pinecone 초기화 및 인덱스 생성
 def create_pinecone_index(index_name, dimension=1024):
     pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
-    
+
     # 인덱스가 존재하지 않으면 생성
     if index_name not in pc.list_indexes().names():
         pc.create_index(
@@ -35,61 +40,105 @@ def create_pinecone_index(index_name, dimension=1024):
     else:
         print(f"기존 Pinecone 인덱스 '{index_name}'를 사용합니다.")
 
-# Step 1: MySQL에 연결
-db = mysql.connector.connect(
-    host="localhost",        
-    user="root",            
-    password="dnjswnsdud1.",    
-    database="swpre6"      
-)
+# Step 1: 테이블에서 업로드할 공지사항과 저장된 본문 해시를 가져옴
+# 해시가 같아도 벡터스토어에 없는 id(스토어가 비었거나 삭제된 경우)는 다시 업로드
+def crawled_data_to_records(cursor, force=False):
+    cursor.execute(
+        "SELECT id, title, link, content, image, date, content_hash FROM swpre "
+        f"WHERE NOT {EMPTY_CONTENT_SQL} ORDER BY id"
+    )
+    rows = cursor.fetchall()
+    stored_ids = set() if force else find_stored_ids([row[0] for row in rows])
+    return [
+        NoticeRecord(id, title, link, content, image, pub_date,
+                     stored_hash=stored_hash if str(id) in stored_ids else None)
+        for id, title, link, content, image, pub_date, stored_hash in rows
+    ]
 
-cursor = db.cursor()
+# Step 2: 새로 추가되었거나 변경된 공지사항만 임베딩하여 swpre.id를 벡터 id로 upsert
+def store_records_to_vector_db(records):
+    embed, upsert = EmbedStage(), UpsertStage()
+    uploaded = list(upsert.stream(embed.stream(records)))
+    return embed.result, upsert.result, uploaded
 
-# Step 2: 테이블에서 데이터를 배열로 변환
-def crawled_data_to_array():
-    fetch_query = "SELECT id, title, link, content, date FROM swpre"
-    cursor.execute(fetch_query)
-    rows = cursor.fetchall()
-    return rows
-
-# Step 3: 메타데이터와 함께 임베딩 생성 및 저장
-def store_array_to_vector_db():
-    # 기존 1024 차원 Pinecone 인덱스 사용
-    index_name = 'swpre10'
-    print(f"기존 Pinecone 인덱스 '{index_name}' (차원: 1024)를 사용합니다.")
-    
-    # 1024 차원을 생성하는 HuggingFace 임베딩 모델 사용
-    embedding = HuggingFaceEmbeddings(
-        model_name="intfloat/e5-large-v2",
-        model_kwargs={'device': 'cpu'},
-        encode_kwargs={'normalize_embeddings': True}
-    )
+# 대량 업로드: 행을 메모리에 모두 올리지 않고 배치 단위로 임베딩/병렬 upsert, 중단 시 체크포인트부터 재개
+def run_bulk(args):
+    checkpoint = UploadCheckpoint.load()
+    if args.restart:
+        checkpoint.clear()
+
+    db = connect_db()
+    try:
+        ensure_schema(db)
+    finally:
+        db.close()
+
+    backend = get_vectorstore_backend()
+    if backend != 'local':
+        create_pinecone_index(get_pinecone_index_name())
+
+    uploader = BulkUploader(batch_size=args.batch_size, upsert_workers=args.workers,
+                            checkpoint=checkpoint, force=args.force)
+    result = uploader.run()
+
+    print(f"\n{'='*60}")
+    print(f"대량 벡터 DB 업로드 {'완료' if not result.errors else '중단'} ({backend})")
+    print(f"{'='*60}")
+    if result.resumed_from:
+        print(f"이어서 시작한 위치: swpre.id > {result.resumed_from}")
+    print(f"확인한 공지사항: {result.checked}개")
+    print(f"변경 없음 (건너뜀): {result.skipped}개")
+    print(f"임베딩: {result.embedded}개 ({result.embed_seconds:.2f}초)")
+    print(f"업로드: {result.uploaded}개")
+    print(f"오류: {result.errors}개")
+    print(f"처리량: {result.docs_per_second:.1f} docs/s (임베딩 {result.embedded_per_second:.1f} docs/s), "
+          f"{result.seconds:.2f}초")
+    if result.errors:
+        print(f"다시 실행하면 swpre.id > {uploader.checkpoint.last_id} 부터 이어서 업로드합니다.")
+    return not result.errors
+
+def main():
+    parser = argparse.ArgumentParser(description="전체 벡터 DB 업로드 (변경된 공지사항만 임베딩)")
+    parser.add_argument("--force", action="store_true",
+                        help="저장된 해시를 무시하고 모두 다시 임베딩 (벡터스토어에 없는 공지사항은 --force 없이도 다시 업로드)")
+    parser.add_argument("--bulk", action="store_true",
+                        help="대량 업로드: id 기준 페이지 읽기 + 배치 임베딩 + 병렬 upsert + 체크포인트")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="임베딩 배치 크기 (--bulk)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_UPSERT_WORKERS, help="동시 upsert 요청 수 (--bulk)")
+    parser.add_argument("--restart", action="store_true", help="체크포인트를 무시하고 처음부터 시작 (--bulk)")
+    args = parser.parse_args()
+
+    if args.bulk:
+        return run_bulk(args)
+
+    print("한성대학교 챗봇 전체 벡터 DB 업로드 시작")
+    print(f"실행 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    db = connect_db()
+    try:
+        ensure_schema(db)
+        with db.cursor() as cursor:
+            records = crawled_data_to_records(cursor, force=args.force)
+    finally:
+        db.close()
+    print(f"처리할 데이터: {len(records)}개")
+
+    backend = get_vectorstore_backend()
+    if backend != 'local':
+        create_pinecone_index(get_pinecone_index_name())
+
+    embedded, upserted, uploaded = store_records_to_vector_db(records)
+
+    # 결과 요약
+    print(f"\n{'='*60}")
+    print(f"전체 벡터 DB 업로드 완료 ({backend})")
+    print(f"{'='*60}")
+    print(f"확인한 공지사항: {embedded.input}개")
+    print(f"변경 없음 (건너뜀): {embedded.skipped}개")
+    print(f"임베딩: {embedded.output}개 ({embedded.seconds:.2f}초)")
+    print(f"업로드: {len(uploaded)}개 ({upserted.seconds:.2f}초)")
+    print(f"오류: 임베딩 {embedded.errors}개, 업로드 {upserted.errors}개")
+    return not (embedded.errors or upserted.errors)
 
-    rows = crawled_data_to_array()
-    documents = []
-    print(f"처리할 데이터: {len(rows)}개")
-    
-    for id, title, link, content, pub_date in rows:
-        # 날짜를 UNIX 타임스탬프로 변환
-        date_object = datetime.strptime(str(pub_date), "%Y-%m-%d %H:%M:%S")
-        unix_timestamp = int(time.mktime(date_object.replace(hour=0, minute=0, second=0, microsecond=0).timetuple()))
-        
-        # 문서 내용 생성
-        combined_content = f"Title: {title}\nLink: {link}\nContent: {content}"
-        metadata = {
-            'title': title,
-            'link': link,
-            'expiry_date': unix_timestamp  # UNIX 타임스탬프 저장
-        }
-        documents.append(Document(combined_content, metadata, id=str(id)))
-
-    # 문서를 Pinecone에 저장
-    database = PineconeVectorStore.from_documents(documents, embedding, index_name=index_name)
-
-    print(f"{len(documents)}개의 문서가 Pinecone 인덱스 '{index_name}'에 업로드되었습니다.")
-    print(f"임베딩 차원: 1024")
-
-store_array_to_vector_db()
-
-cursor.close()
-db.close()
+if __name__ == "__main__":
+    exit(0 if main() else 1)